@@ -1,74 +1,446 @@
-import time
+"""
+Long-running CFBD poller for scoreboards, live plays and betting lines.
+
+One pooled aiohttp session (CFBDClient) is shared by every request. The
+scoreboard, each in-progress game's live plays and each in-progress game's
+betting lines are polled concurrently, each on its own AdaptiveSchedule:
+polls come quickly while a game is on and its data keeps changing, back off
+while responses come back unchanged, and drop to a slow idle rate when no
+game is in progress. Changed plays and lines responses are appended to
+NDJSON logs in out_dir. Scoreboards go through SnapshotStore, which keeps
+only the per-game fields that changed, in compressed hourly partitions
+written as the poller goes; ScoreboardHistory reads them back and answers
+"state of game X at time T".
+
+fake_cfbd.py in this folder serves a replay of Data/live_scores.json with
+the same endpoints, for running the poller without an API key.
+"""
+
+import asyncio
+import bisect
+import glob
+import gzip
+import hashlib
+import json
 import os
-import cfbd
-from cfbd.models.betting_game import BettingGame
-from cfbd.models.season_type import SeasonType
-from cfbd.models.advanced_box_score import AdvancedBoxScore
-from cfbd.rest import ApiException
-from pprint import pprint
-import pandas as pd
-from datetime import datetime
-import math
-from cfbd.models.division_classification import DivisionClassification
-from cfbd.models.scoreboard_game import ScoreboardGame
-
-### Get_baselines ####
-def get_score():   
-    # Defining the host is optional and defaults to https://api.collegefootballdata.com
-    # See configuration.py for a list of all supported configuration parameters.
-    configuration = cfbd.Configuration(
-        host = "https://api.collegefootballdata.com"
-    )
-
-    # The client must configure the authentication and authorization parameters
-    # in accordance with the API server security policy.
-    # Examples for each auth method are provided below, use the example that
-    # satisfies your auth use case.
-
-    # Configure Bearer authorization: apiKey
-    configuration = cfbd.Configuration(
-        access_token = os.environ["BEARER_TOKEN"]
-    )
-
-    # Enter a context with an instance of the API client
-    with cfbd.ApiClient(configuration) as api_client:
-        # Create an instance of the API class
-        api_instance = cfbd.GamesApi(api_client)
-        classification = "fbs" # DivisionClassification | Optional division classification filter, defaults to fbs (optional)
+import re
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+import aiohttp
+
+CFBD_API = "https://api.collegefootballdata.com"
+
+
+class CFBDClient:
+    """
+    Pooled aiohttp session for the CFBD API.
+
+    Use as `async with CFBDClient(token) as client:`; every poll loop shares
+    the one connection pool, and max_concurrency caps requests in flight.
+    """
+
+    def __init__(self, access_token, base_url=CFBD_API, max_concurrency=4, timeout=30.0):
+        self.headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/json"
+        }
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = None
+        self.requests_made = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def get(self, path, params=None, retries=3):
+        for attempt in range(retries + 1):
+            async with self.semaphore:
+                async with self.session.get(self.base_url + path, params=params) as resp:
+                    self.requests_made += 1
+                    if (resp.status != 429 and resp.status < 500) or attempt == retries:
+                        resp.raise_for_status()
+                        return await resp.json()
+            # rate limited or server error: back off and retry
+            await asyncio.sleep(2 ** attempt)
+
+
+async def get_score(client, classification="fbs"):
+    return await client.get("/scoreboard", {"classification": classification})
+
+async def get_live_plays(client, game_id):
+    return await client.get("/live/plays", {"gameId": game_id})
+
+async def get_lines(client, game_id):
+    return await client.get("/lines", {"gameId": game_id})
+
+
+class AdaptiveSchedule:
+    """
+    Poll interval for one endpoint.
+
+    While games are live, a changed response resets the interval to `live`
+    and every unchanged one stretches it by `backoff`, up to `max_live`.
+    With no game live the interval is `idle`.
+    """
+
+    def __init__(self, live, max_live, idle, backoff=1.5):
+        self.live = live
+        self.max_live = max_live
+        self.idle = idle
+        self.backoff = backoff
+        self.interval = live
+
+    def next(self, changed, live=True):
+        if not live:
+            self.interval = self.idle
+        elif changed:
+            self.interval = self.live
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_live)
+        return self.interval
+
+
+# seconds: (live, max while live but unchanged, idle)
+SCHEDULES = {
+    "scoreboard": (15.0, 60.0, 300.0),
+    "plays": (10.0, 60.0, 300.0),
+    "lines": (60.0, 300.0, 900.0),
+}
+
+
+def response_digest(data):
+    return hashlib.blake2b(json.dumps(data, sort_keys=True).encode("utf-8"), digest_size=16).digest()
+
+
+# per-game scoreboard fields worth keeping a history of
+TRACKED_FIELDS = ("status", "period", "clock", "possession", "home_points", "away_points", "spread", "over_under")
+
+
+def scoreboard_row(game):
+    """The tracked fields of one scoreboard game, flattened."""
+    betting = game.get("betting") or {}
+    return {
+        "status": game.get("status"),
+        "period": game.get("period"),
+        "clock": game.get("clock"),
+        "possession": game.get("possession"),
+        "home_points": (game.get("homeTeam") or {}).get("points"),
+        "away_points": (game.get("awayTeam") or {}).get("points"),
+        "spread": betting.get("spread"),
+        "over_under": betting.get("overUnder"),
+    }
+
+
+def partition_name(ts, segment):
+    hour = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d-%H")
+    return f"scoreboard-{hour}-{segment:04d}.ndjson.gz"
+
+
+def partition_key(path):
+    """(hour, segment) of a partition file, the order partitions were written in."""
+    match = re.match(r"scoreboard-(\d{8}-\d{2})(?:-(\d+))?\.ndjson\.gz$", os.path.basename(path))
+    return (match.group(1), int(match.group(2) or 0)) if match else ("", 0)
+
+
+def partition_paths(out_dir):
+    return sorted(glob.glob(os.path.join(out_dir, "scoreboard-*.ndjson.gz")), key=partition_key)
+
+
+class SnapshotStore:
+    """
+    Change-only scoreboard storage.
+
+    Every scoreboard is diffed game by game against the previous one, and
+    only games whose tracked fields changed are written, with only the
+    fields that changed (all of them the first time a game is seen). Each
+    record() call appends one gzip member to the current hour's partition,
+    so everything up to the last poll is on disk and a crash can at most
+    truncate the member being written. Every store writes its own segment
+    of each hour, so a member truncated by a crash is only ever the last
+    one in its file and never hides the rows a restarted poller writes
+    after it. Reopening a store picks up the last known state of every
+    game, so a restarted poller keeps writing diffs.
+
+    Args:
+        out_dir: Directory holding the scoreboard-YYYYMMDD-HH-SSSS.ndjson.gz partitions
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.last = ScoreboardHistory(out_dir).latest()
+        self.segment = max((partition_key(path)[1] for path in partition_paths(out_dir)), default=0) + 1
+        self.rows_written = 0
+
+    def record(self, games, ts=None):
+        """
+        Persist what changed in one scoreboard.
+
+        Args:
+            games: Scoreboard response (list of game dictionaries)
+            ts: Epoch seconds of the snapshot (default now)
+
+        Returns:
+            Number of change rows written
+        """
+        ts = time.time() if ts is None else ts
+        rows = []
+        for game in games:
+            row = scoreboard_row(game)
+            previous = self.last.get(game["id"])
+            changes = row if previous is None else {k: v for k, v in row.items() if previous.get(k) != v}
+            if changes:
+                rows.append(dict(changes, ts=ts, game=game["id"]))
+                self.last[game["id"]] = row
+        if rows:
+            text = "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+            with gzip.open(os.path.join(self.out_dir, partition_name(ts, self.segment)), "at", encoding="utf-8") as f:
+                f.write(text)
+            self.rows_written += len(rows)
+        return len(rows)
+
+
+def iter_partition_rows(path):
+    """Rows of one partition, stopping quietly at a member truncated by a crash."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        return
+
+
+class ScoreboardHistory:
+    """
+    Scoreboard history rebuilt from SnapshotStore partitions.
+
+    Change rows are folded into the full state of every game after every
+    change once, at load time; state_at is then a binary search.
+
+    Args:
+        out_dir: Directory holding the partitions
+    """
+
+    def __init__(self, out_dir):
+        self.times = {}
+        self.states = {}
+        for path in partition_paths(out_dir):
+            for row in iter_partition_rows(path):
+                game_id, ts = row.pop("game"), row.pop("ts")
+                times = self.times.setdefault(game_id, [])
+                states = self.states.setdefault(game_id, [])
+                state = dict(states[-1] if states else {}, **row)
+                if times and ts == times[-1]:
+                    states[-1] = state
+                else:
+                    times.append(ts)
+                    states.append(state)
+
+    def games(self):
+        return sorted(self.times)
+
+    def latest(self):
+        """Last known state of every game."""
+        return {game_id: dict(states[-1]) for game_id, states in self.states.items()}
+
+    def state_at(self, game_id, when):
+        """
+        State of a game as of a moment.
+
+        Args:
+            game_id: CFBD game id
+            when: Epoch seconds, datetime or ISO string
+
+        Returns:
+            Dictionary of the tracked fields plus "as_of" (when the state was
+            recorded), or None if the game hadn't been seen yet
+        """
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when.replace("Z", "+00:00"))
+        if isinstance(when, datetime):
+            when = when.timestamp()
+        times = self.times.get(game_id, [])
+        i = bisect.bisect_right(times, when) - 1
+        if i < 0:
+            return None
+        return dict(self.states[game_id][i], as_of=times[i])
+
+    def changes(self, game_id):
+        """(epoch seconds, full state) after every recorded change of a game."""
+        return list(zip(self.times.get(game_id, []), self.states.get(game_id, [])))
+
+
+class Poller:
+    """
+    Polls the scoreboard, plus live plays and lines for every in-progress game.
+
+    The scoreboard loop decides which games are in progress and starts or
+    stops a plays loop and a lines loop for each of them. Every loop keeps
+    the digest of its last response, so unchanged responses are neither
+    logged nor allowed to keep the poll rate up.
+
+    Args:
+        client: Open CFBDClient shared by every loop
+        out_dir: Where the scoreboard partitions (see SnapshotStore) and
+                 plays.ndjson and lines.ndjson are written
+        classification: Scoreboard division filter
+        schedules: Overrides for SCHEDULES (same keys, (live, max_live, idle) tuples)
+        time_scale: Divides every interval; the fake server's replay runs faster than real time
+        on_plays: Called with every successful live plays response, changed
+                  or not, instead of logging changed ones to plays.ndjson
+                  (e.g. live_plays.LiveIngest, which skips plays it has seen,
+                  so a response it failed on is picked up again next poll)
+    """
+
+    def __init__(self, client, out_dir="cfbd_logs", classification="fbs", schedules=None, time_scale=1.0,
+                 on_plays=None):
+        self.client = client
+        self.out_dir = out_dir
+        self.classification = classification
+        self.schedules = dict(SCHEDULES, **(schedules or {}))
+        self.time_scale = time_scale
+        self.on_plays = on_plays
+        self.live_games = set()
+        self.scoreboard = []
+        self.game_tasks = {}
+        self.stats = {endpoint: {"polls": 0, "changed": 0, "errors": 0} for endpoint in self.schedules}
+        os.makedirs(out_dir, exist_ok=True)
+        self.snapshots = SnapshotStore(out_dir)
+
+    def _log(self, endpoint, params, data):
+        record = {"time_stamp": datetime.now().isoformat(), "endpoint": endpoint, "params": params, "data": data}
+        with open(os.path.join(self.out_dir, f"{endpoint}.ndjson"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _schedule(self, endpoint):
+        return AdaptiveSchedule(*(seconds / self.time_scale for seconds in self.schedules[endpoint]))
+
+    async def _loop(self, endpoint, fetch, params, on_data=None, live=lambda: True, log=True):
+        """
+        Poll one endpoint until cancelled or, for per-game loops, until live() turns False.
+
+        Changed responses are logged (when log is set); on_data gets every
+        successful response, changed or not.
+        """
+        schedule = self._schedule(endpoint)
+        stats = self.stats[endpoint]
+        last = None
+        while True:
+            changed = False
+            try:
+                data = await fetch()
+                stats["polls"] += 1
+                digest = response_digest(data)
+                changed = digest != last
+                last = digest
+                if changed:
+                    stats["changed"] += 1
+                    if log:
+                        self._log(endpoint, params, data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                stats["errors"] += 1
+                print(f"Error polling {endpoint} {params}: {e}")
+            else:
+                if on_data:
+                    # a bad response or a failing handler shouldn't stop the loop for the rest of the game
+                    try:
+                        on_data(data)
+                    except Exception as e:
+                        stats["errors"] += 1
+                        print(f"Error handling {endpoint} {params}: {type(e).__name__}: {e}")
+            if not live():
+                return
+            await asyncio.sleep(schedule.next(changed, bool(self.live_games)))
+
+    def _update_games(self, games):
+        self.scoreboard = games
+        self.snapshots.record(games)
+        self.live_games = {game["id"] for game in games if game.get("status") == "in_progress"}
+        for game_id in self.live_games:
+            if game_id not in self.game_tasks:
+                is_live = lambda game_id=game_id: game_id in self.live_games
+                params = {"gameId": game_id}
+                self.game_tasks[game_id] = [
+                    asyncio.create_task(self._loop("plays", lambda game_id=game_id: get_live_plays(self.client, game_id), params,
+                                                   on_data=self.on_plays, live=is_live, log=self.on_plays is None)),
+                    asyncio.create_task(self._loop("lines", lambda game_id=game_id: get_lines(self.client, game_id), params, live=is_live)),
+                ]
+        # loops of finished games poll once more, see they're over and return
+        for game_id in [g for g in self.game_tasks if g not in self.live_games]:
+            if all(task.done() for task in self.game_tasks[game_id]):
+                del self.game_tasks[game_id]
+
+    async def run(self, duration=None):
+        """Poll until duration seconds have passed (forever if None)."""
+        scoreboard = asyncio.create_task(self._loop(
+            "scoreboard", lambda: get_score(self.client, self.classification),
+            {"classification": self.classification}, on_data=self._update_games, log=False))
         try:
-            api_response = api_instance.get_scoreboard(classification=classification)
-            print("The response of GamesApi->get_scoreboard:\n")
-            #pprint(api_response)
-        except Exception as e:
-            print("Exception when calling GamesApi->get_scoreboard: %s\n" % e)
-        return api_response
-    
-def run_score_for_duration(duration_hours=3.5, sleep_time = 15, big_filename="scores_3:30.csv"):
-    start_time = time.time()
-    all_dfs = []
-    iterations = math.ceil((duration_hours * 60) / sleep_time)
-    
-    for _ in range(iterations):
-        print(f"Iteration #{_}")
-        api_response = get_score()
-        df = pd.DataFrame([bet.to_dict() for bet in api_response])
-        df['time_stamp'] = current_datetime = datetime.now()
-        all_dfs.append(df)
-        
-        
-        # Wait for 15 minutes unless time is up
-        if (time.time() - start_time) >= duration_hours * 3600: 
-            break
-        time.sleep(sleep_time * 60)
-    
-    # Concatenate all DataFrames and save to a big CSV
-    big_df = pd.concat(all_dfs, ignore_index=True)
-    # big_filename = "betlines_full.csv"
-    big_df.to_csv(big_filename, index=False)
+            if duration is None:
+                await scoreboard
+            else:
+                await asyncio.sleep(duration)
+        finally:
+            scoreboard.cancel()
+            for tasks in self.game_tasks.values():
+                for task in tasks:
+                    task.cancel()
+            await asyncio.gather(scoreboard, *(t for tasks in self.game_tasks.values() for t in tasks),
+                                 return_exceptions=True)
+
+    def report(self):
+        for endpoint, stats in self.stats.items():
+            print(f"  {endpoint:<10} {stats['polls']:>5} polls, {stats['changed']:>5} changed, {stats['errors']} errors")
+        print(f"  {self.snapshots.rows_written} scoreboard change rows written")
+        print(f"  {self.client.requests_made} requests in total")
+
+
+def save_scoreboard_csv(out_dir, big_filename):
+    import pandas as pd
+
+    # one row per game per change, with the game's full state at that moment
+    history = ScoreboardHistory(out_dir)
+    rows = [dict(state, id=game_id, time_stamp=datetime.fromtimestamp(ts).isoformat())
+            for game_id in history.games() for ts, state in history.changes(game_id)]
+    df = pd.DataFrame(rows, columns=["time_stamp", "id", *TRACKED_FIELDS])
+    df.sort_values(["time_stamp", "id"]).to_csv(big_filename, index=False)
     print(f"Saved all data to {big_filename}")
 
+
+async def poll_for_duration(duration_hours=3.5, out_dir="cfbd_logs", base_url=CFBD_API, token=None, time_scale=1.0,
+                            on_plays=None):
+    async with CFBDClient(token or os.environ["BEARER_TOKEN"], base_url=base_url) as client:
+        poller = Poller(client, out_dir, time_scale=time_scale, on_plays=on_plays)
+        start = time.time()
+        await poller.run(duration_hours * 3600)
+        print(f"Polled for {time.time() - start:.0f}s:")
+        poller.report()
+        return poller
+
+def run_score_for_duration(duration_hours=3.5, big_filename="scores_3:30.csv", out_dir="cfbd_logs"):
+    asyncio.run(poll_for_duration(duration_hours, out_dir))
+    # Expand the change-only history into one big CSV
+    save_scoreboard_csv(out_dir, big_filename)
+
 def main():
-    run_score_for_duration(duration_hours=4, sleep_time=15, big_filename="scores_4_hours.csv")
+    if len(sys.argv) >= 4 and sys.argv[1] == "state":
+        # python Scores.py state <game_id> <time> [out_dir]
+        history = ScoreboardHistory(sys.argv[4] if len(sys.argv) > 4 else "cfbd_logs")
+        when = float(sys.argv[3]) if sys.argv[3].replace(".", "", 1).isdigit() else sys.argv[3]
+        print(history.state_at(int(sys.argv[2]), when))
+        return
+    run_score_for_duration(duration_hours=4, big_filename="scores_4_hours.csv")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,233 @@
+"""
+Local stand-in for the CFBD endpoints Scores.py polls.
+
+Replays the finished games in Data/live_scores.json as if they were being
+played now, `speed` times faster than real time, with kickoffs `stagger`
+game-seconds apart. A game's plays show up in /live/plays as their
+wallClock passes, /scoreboard reports each game as scheduled, in_progress
+or completed with the score so far, and /lines moves the spread whenever
+the score changes. Requests need a Bearer token, like the real API.
+
+Running this file starts the server and runs Scores.Poller against it twice,
+with adaptive schedules and with fixed ones, and compares the request counts.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from aiohttp import web
+
+import Scores
+
+LIVE_SCORES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Data", "live_scores.json")
+
+
+def parse_wall_clock(wall_clock):
+    if not wall_clock:
+        return None
+    return datetime.fromisoformat(wall_clock.replace("Z", "+00:00")).timestamp()
+
+
+class ReplayGame:
+    """One finished game, replayed from kickoff at `start` seconds of replay time."""
+
+    def __init__(self, game, start):
+        self.game = game
+        self.start = start
+        self.home = next(t for t in game["teams"] if t["homeAway"] == "home")
+        self.away = next(t for t in game["teams"] if t["homeAway"] == "away")
+
+        self.plays = []
+        self.offsets = []
+        kickoff = last = None
+        for drive_index, drive in enumerate(game["drives"]):
+            for play in drive["plays"]:
+                # plays with no wallClock happen when the play before them did
+                stamp = parse_wall_clock(play.get("wallClock")) or last
+                if stamp is None:
+                    continue
+                kickoff = stamp if kickoff is None else kickoff
+                last = stamp
+                self.plays.append((drive_index, play))
+                self.offsets.append(max(stamp - kickoff, self.offsets[-1] if self.offsets else 0.0))
+        self.length = self.offsets[-1] if self.offsets else 0.0
+
+    def revealed(self, now):
+        """Number of plays that have happened by replay time `now`."""
+        return bisect.bisect_right(self.offsets, now - self.start)
+
+    def status(self, now):
+        if now < self.start:
+            return "scheduled"
+        return "in_progress" if now - self.start <= self.length else "completed"
+
+    def score(self, now):
+        n = self.revealed(now)
+        if not n:
+            return 0, 0, None
+        play = self.plays[n - 1][1]
+        return play["homeScore"], play["awayScore"], play
+
+    def scoreboard_entry(self, now):
+        home_points, away_points, play = self.score(now)
+        status = self.status(now)
+        return {
+            "id": self.game["id"],
+            "status": status,
+            "period": play["period"] if play and status == "in_progress" else None,
+            "clock": play["clock"] if play and status == "in_progress" else None,
+            "possession": play.get("team") if play and status == "in_progress" else None,
+            "lastPlay": play.get("playText") if play else None,
+            "homeTeam": {"id": self.home["teamId"], "name": self.home["team"], "points": home_points},
+            "awayTeam": {"id": self.away["teamId"], "name": self.away["team"], "points": away_points},
+            "betting": self.betting(now),
+        }
+
+    def live_plays(self, now):
+        drives = []
+        for drive_index, play in self.plays[:self.revealed(now)]:
+            if not drives or drives[-1]["_index"] != drive_index:
+                drive = {k: v for k, v in self.game["drives"][drive_index].items() if k != "plays"}
+                drives.append(dict(drive, _index=drive_index, plays=[]))
+            drives[-1]["plays"].append(play)
+        for drive in drives:
+            del drive["_index"]
+        home_points, away_points, play = self.score(now)
+        return {
+            "id": self.game["id"],
+            "status": self.status(now),
+            "period": play["period"] if play else None,
+            "clock": play["clock"] if play else None,
+            "teams": [{"teamId": self.home["teamId"], "team": self.home["team"], "homeAway": "home", "points": home_points},
+                      {"teamId": self.away["teamId"], "team": self.away["team"], "homeAway": "away", "points": away_points}],
+            "drives": drives,
+        }
+
+    def betting(self, now):
+        # a live line that follows the score
+        home_points, away_points, _ = self.score(now)
+        spread = -3.5 - (home_points - away_points) / 2
+        return {"spread": spread, "overUnder": 52.5 + (home_points + away_points) / 4}
+
+    def lines(self, now):
+        return [{
+            "id": self.game["id"],
+            "homeTeam": self.home["team"],
+            "awayTeam": self.away["team"],
+            "lines": [dict(self.betting(now), provider="consensus", formattedSpread=f"{self.home['team']} {self.betting(now)['spread']:+g}")],
+        }]
+
+
+class FakeSeason:
+    """Replay clock plus the games being replayed."""
+
+    def __init__(self, games, speed=600.0, stagger=1800.0):
+        self.speed = speed
+        self.games = {game["id"]: ReplayGame(game, i * stagger) for i, game in enumerate(games)}
+        self.started = time.monotonic()
+
+    @property
+    def now(self):
+        return (time.monotonic() - self.started) * self.speed
+
+    @property
+    def length(self):
+        return max(game.start + game.length for game in self.games.values())
+
+
+def make_app(season, latency=0.01):
+    """Build the aiohttp application serving `season`."""
+    app = web.Application()
+    app["stats"] = {"scoreboard": 0, "plays": 0, "lines": 0, "unauthorized": 0}
+
+    def authorized(request):
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            app["stats"]["unauthorized"] += 1
+            return False
+        return True
+
+    def game_for(request):
+        try:
+            return season.games[int(request.query.get("gameId", ""))]
+        except (KeyError, ValueError):
+            raise web.HTTPNotFound(text="Unknown gameId")
+
+    async def scoreboard(request):
+        if not authorized(request):
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        app["stats"]["scoreboard"] += 1
+        await asyncio.sleep(latency)
+        now = season.now
+        return web.json_response([game.scoreboard_entry(now) for game in season.games.values()])
+
+    async def live_plays(request):
+        if not authorized(request):
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        app["stats"]["plays"] += 1
+        await asyncio.sleep(latency)
+        return web.json_response(game_for(request).live_plays(season.now))
+
+    async def lines(request):
+        if not authorized(request):
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        app["stats"]["lines"] += 1
+        await asyncio.sleep(latency)
+        return web.json_response(game_for(request).lines(season.now))
+
+    app.router.add_get("/scoreboard", scoreboard)
+    app.router.add_get("/live/plays", live_plays)
+    app.router.add_get("/lines", lines)
+    return app
+
+
+async def benchmark(games, speed, stagger, port=8767, fixed=False):
+    """Replay `games` and poll them with Scores.Poller until the last one ends."""
+    season = FakeSeason(games, speed, stagger)
+    runner = web.AppRunner(make_app(season))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    # fixed: every endpoint at its live interval all the time, the old sleep-and-repeat approach
+    schedules = {name: (live, live, live) for name, (live, _, _) in Scores.SCHEDULES.items()} if fixed else None
+    out_dir = tempfile.mkdtemp()
+    try:
+        async with Scores.CFBDClient("fake-token", base_url=f"http://127.0.0.1:{port}") as client:
+            poller = Scores.Poller(client, out_dir, schedules=schedules, time_scale=speed)
+            # run until every game is over, plus a couple of idle polls
+            duration = (season.length + 2 * Scores.SCHEDULES["scoreboard"][0]) / speed
+            await poller.run(duration)
+    finally:
+        await runner.cleanup()
+        shutil.rmtree(out_dir)
+
+    print(f"{'Fixed' if fixed else 'Adaptive'} schedules, {len(games)} games replayed in {duration:.1f}s:")
+    poller.report()
+    return poller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Scores.Poller against a local replay of Data/live_scores.json")
+    parser.add_argument("--games", type=int, default=3, help="games to replay")
+    parser.add_argument("--speed", type=float, default=600.0, help="replay seconds per real second")
+    parser.add_argument("--stagger", type=float, default=1800.0, help="replay seconds between kickoffs")
+    parser.add_argument("--file", default=LIVE_SCORES, help="CFBD live plays dump to replay")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        games = json.load(f)[:args.games]
+    adaptive = asyncio.run(benchmark(games, args.speed, args.stagger))
+    fixed = asyncio.run(benchmark(games, args.speed, args.stagger, fixed=True))
+    saved = 1 - adaptive.client.requests_made / fixed.client.requests_made
+    print(f"✅ Adaptive polling made {saved:.0%} fewer requests "
+          f"({adaptive.client.requests_made} vs {fixed.client.requests_made})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Compact game payloads for the React Native app.
+
+reactiveNativeApp/assets/exports/*.json used to be pretty-printed copies of
+exports/*.json: thousands of full-precision floats, most of them repeats
+(every comment in the same minute shares its time). The app averages
+duplicate times on load anyway, so this stage does that ahead of time,
+downsamples long series with Largest-Triangle-Three-Buckets (LTTB),
+quantizes, and delta-encodes:
+
+    {"v": 1, "ts": 60, "vs": 1000,
+     "t": [...],   # game time in 1/ts minutes (whole seconds), delta-encoded
+     "a": [...],   # sentiment in 1/vs units, clamped to [0, 1], delta-encoded
+     "worst15": [[comment, sentiment, time], ...],
+     "best5": [[comment, sentiment, time], ...]}
+
+written as minified JSON. decode_payload here and decodeGamePayload in
+reactiveNativeApp/src/utils/gamePayload.ts turn it back into times/avgs.
+"""
+
+import argparse
+import glob
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+PAYLOAD_VERSION = 1
+TIME_SCALE = 60       # store game minutes as whole seconds
+VALUE_SCALE = 1000    # store sentiment to 3 decimals
+MAX_POINTS = 400      # more than a phone chart has pixels for
+APP_EXPORTS_DIR = os.path.join("reactiveNativeApp", "assets", "exports")
+
+
+def aggregate_by_time(times: Sequence[float], avgs: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average the values that share a (whole-second) time.
+
+    Args:
+        times: Game minutes, any order, with repeats
+        avgs: Values aligned with times
+
+    Returns:
+        Tuple of (sorted unique times in seconds as int64, mean value per time)
+    """
+    seconds = np.rint(np.asarray(times, dtype=np.float64) * TIME_SCALE).astype(np.int64)
+    unique, inverse = np.unique(seconds, return_inverse=True)
+    sums = np.bincount(inverse, weights=np.asarray(avgs, dtype=np.float64), minlength=len(unique))
+    counts = np.bincount(inverse, minlength=len(unique))
+    return unique, sums / np.maximum(counts, 1)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of n_out - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket, so peaks and
+    dips survive where plain striding would drop them.
+
+    Args:
+        x: Sorted x values
+        y: Values aligned with x
+        n_out: Points to keep
+
+    Returns:
+        Indices of the kept points, ascending
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # bucket i covers rows edges[i]:edges[i + 1]; the first and last rows are their own buckets
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def delta_encode(values: np.ndarray) -> List[int]:
+    """First value followed by successive differences."""
+    return np.diff(values, prepend=0).tolist()
+
+
+def delta_decode(deltas: Sequence[int]) -> np.ndarray:
+    """Inverse of delta_encode."""
+    return np.cumsum(np.asarray(deltas, dtype=np.int64))
+
+
+def compact_comments(comments: Optional[List], limit: int) -> List[List[Any]]:
+    """Keep the first limit [comment, sentiment, time] entries, with the numbers rounded."""
+    return [[text, round(float(sentiment), 3), round(float(time), 2)]
+            for text, sentiment, time in (comments or [])[:limit]]
+
+
+def build_payload(export: Dict[str, Any], max_points: int = MAX_POINTS) -> Dict[str, Any]:
+    """
+    Build the compact payload of one game export.
+
+    Args:
+        export: exports/*.json contents ({"times", "avgs", "worst15", "best5"})
+        max_points: Points kept after averaging duplicate times
+
+    Returns:
+        Payload dictionary, see the module docstring
+    """
+    length = min(len(export.get("times", [])), len(export.get("avgs", [])))
+    seconds, means = aggregate_by_time(export["times"][:length], export["avgs"][:length])
+    keep = lttb(seconds, means, max_points)
+    values = np.rint(np.clip(means[keep], 0, 1) * VALUE_SCALE).astype(np.int64)
+
+    return {
+        "v": PAYLOAD_VERSION,
+        "ts": TIME_SCALE,
+        "vs": VALUE_SCALE,
+        "t": delta_encode(seconds[keep]),
+        "a": delta_encode(values),
+        # the app only ever shows this many of each
+        "worst15": compact_comments(export.get("worst15"), 15),
+        "best5": compact_comments(export.get("best5"), 5),
+    }
+
+
+def decode_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Expand a compact payload back into the export layout.
+
+    Returns:
+        Dictionary with "times" (minutes), "avgs", "worst15" and "best5"
+    """
+    return {
+        "times": (delta_decode(payload["t"]) / payload["ts"]).tolist(),
+        "avgs": (delta_decode(payload["a"]) / payload["vs"]).tolist(),
+        "worst15": payload.get("worst15", []),
+        "best5": payload.get("best5", []),
+    }
+
+
+def is_export(data: Any) -> bool:
+    """True for a full exports/*.json game (not an already compact payload or raw comments)."""
+    return isinstance(data, dict) and "times" in data and "avgs" in data
+
+
+def write_payload(payload: Dict[str, Any], path: str) -> int:
+    """Write a payload as minified JSON. Returns the size in bytes."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return len(text.encode("utf-8"))
+
+
+def main():
+    """Compact every game export into the app's assets."""
+    parser = argparse.ArgumentParser(description="Build compact sentiment payloads for the React Native app")
+    parser.add_argument("files", nargs="*",
+                        help=f"export JSON files (default: exports/*.json plus anything already in {APP_EXPORTS_DIR})")
+    parser.add_argument("--out-dir", default=APP_EXPORTS_DIR, help="where the payloads are written")
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS, help="points kept per game after LTTB")
+    args = parser.parse_args()
+
+    if args.files:
+        sources = args.files
+    else:
+        # prefer the full export; fall back to the app's own copy for games with no export
+        names = {os.path.basename(f) for f in glob.glob(os.path.join("exports", "*.json"))}
+        names |= {os.path.basename(f) for f in glob.glob(os.path.join(args.out_dir, "*.json"))}
+        sources = [os.path.join("exports", name) if os.path.exists(os.path.join("exports", name))
+                   else os.path.join(args.out_dir, name) for name in sorted(names)]
+
+    total_before = total_after = 0
+    for source in sources:
+        with open(source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        destination = os.path.join(args.out_dir, os.path.basename(source))
+        if not is_export(data):
+            print(f"Skipping {source}: not a sentiment export (no times/avgs)")
+            continue
+
+        before = os.path.getsize(destination) if os.path.exists(destination) else os.path.getsize(source)
+        payload = build_payload(data, args.max_points)
+        after = write_payload(payload, destination)
+        total_before += before
+        total_after += after
+        print(f"{os.path.basename(source):<30} {len(data['times']):>5} -> {len(payload['t']):>4} points, "
+              f"{before / 1024:>7.1f} KB -> {after / 1024:>5.1f} KB")
+
+    if total_after:
+        print(f"✅ Wrote compact payloads to {args.out_dir}: {total_before / 1024:.1f} KB -> "
+              f"{total_after / 1024:.1f} KB ({total_before / total_after:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+CPU inference backends for the fine-tuned BERT regressor.
+
+bert_scoring.score_texts runs the full-precision PyTorch model by default.
+This module builds drop-in `predict` callables for the same batches:
+
+    torch        full-precision PyTorch (the reference)
+    int8         PyTorch with dynamic int8 quantization of every nn.Linear
+    onnx         ONNX Runtime session over an exported model.onnx
+    onnx-int8    ONNX Runtime over a dynamically int8-quantized export
+
+The ONNX backends need the optional `onnx` and `onnxruntime` packages;
+export once with `python bert_runtime.py export`, then compare the backends
+for accuracy (MSE against the labels in fineTuning3.csv, and against the
+PyTorch outputs) and speed with `python bert_runtime.py compare`.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch import nn
+
+from bert_scoring import MODEL_DIR, SCORE_SCALE, load_model, score_texts
+
+
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+
+
+def quantize_model(model: nn.Module) -> nn.Module:
+    """
+    Apply dynamic int8 quantization to every nn.Linear of a model.
+
+    Weights are stored as int8 and activations are quantized on the fly per
+    batch, so no calibration data is needed. The embeddings and LayerNorms
+    stay in float32.
+
+    Args:
+        model: BertForRegression in eval mode (left unchanged)
+
+    Returns:
+        Quantized copy of the model
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def export_onnx(model: nn.Module, tokenizer, path: str, quantize: bool = False, opset: int = 17) -> str:
+    """
+    Export the regressor to ONNX with dynamic batch and sequence axes.
+
+    Args:
+        model: BertForRegression in eval mode
+        tokenizer: Matching tokenizer, used to build the example input
+        path: Destination .onnx file
+        quantize: Also write a dynamically int8-quantized copy next to it
+        opset: ONNX opset version
+
+    Returns:
+        Path of the exported model (the int8 copy when quantize is True)
+    """
+    example = tokenizer(["an example comment", "and a second, somewhat longer example comment"],
+                        padding=True, return_tensors="pt", return_token_type_ids=False)
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (example["input_ids"], example["attention_mask"]),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["prediction"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "prediction": {0: "batch"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+    print(f"✅ Exported ONNX model to {path}")
+
+    if not quantize:
+        return path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = os.path.join(os.path.dirname(path), ONNX_INT8_FILE)
+    quantize_dynamic(path, int8_path, weight_type=QuantType.QInt8)
+    print(f"✅ Wrote int8-quantized ONNX model to {int8_path}")
+    return int8_path
+
+
+class OnnxPredictor:
+    """
+    predict callable for bert_scoring.score_texts backed by an ONNX Runtime session.
+
+    Args:
+        path: Exported .onnx model
+        num_threads: Intra-op threads; None keeps onnxruntime's default
+    """
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        outputs = self.session.run(["prediction"], {
+            "input_ids": input_ids.numpy(),
+            "attention_mask": attention_mask.numpy(),
+        })
+        return torch.from_numpy(outputs[0])
+
+
+def load_backend(backend: str, model_dir: str = MODEL_DIR, num_threads: Optional[int] = None,
+                 onnx_dir: Optional[str] = None) -> Tuple[Optional[nn.Module], object, Optional[Callable]]:
+    """
+    Load the tokenizer and a model/predict pair for one backend.
+
+    Args:
+        backend: One of BACKENDS
+        model_dir: Fine-tuned model directory
+        num_threads: Intra-op threads for torch or onnxruntime
+        onnx_dir: Directory holding model.onnx / model.int8.onnx (default model_dir)
+
+    Returns:
+        Tuple of (model, tokenizer, predict), ready to pass to score_texts.
+        model is None for the ONNX backends and predict is None for torch.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+    model, tokenizer = load_model(model_dir, num_threads)
+    if backend == "torch":
+        return model, tokenizer, None
+    if backend == "int8":
+        return quantize_model(model), tokenizer, None
+
+    onnx_file = ONNX_FILE if backend == "onnx" else ONNX_INT8_FILE
+    path = os.path.join(onnx_dir or model_dir, onnx_file)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' not found; run `python bert_runtime.py export"
+                                f"{' --quantize' if backend == 'onnx-int8' else ''}` first")
+    return None, tokenizer, OnnxPredictor(path, num_threads)
+
+
+def load_labeled(csv_file: str, limit: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Read the fine-tuning CSV (text,label columns) used for the parity check.
+
+    Args:
+        csv_file: e.g. fineTuning3.csv
+        limit: Only use the first limit rows
+
+    Returns:
+        Tuple of (texts, labels)
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_file).dropna(subset=["text", "label"])
+    if limit:
+        df = df.head(limit)
+    return df["text"].astype(str).tolist(), df["label"].to_numpy(dtype=np.float64)
+
+
+def benchmark_latency(texts: Sequence[str], model, tokenizer, predict=None, runs: int = 50) -> Dict[str, float]:
+    """
+    Time single-comment requests, as the live path scores them.
+
+    Returns:
+        Dictionary with p50 and p95 latency in milliseconds
+    """
+    samples = []
+    for i in range(runs):
+        text = texts[i % len(texts)]
+        start = time.perf_counter()
+        score_texts([text], model, tokenizer, batch_size=1, predict=predict)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def compare(csv_file: str, backends: Sequence[str], model_dir: str = MODEL_DIR, onnx_dir: Optional[str] = None,
+            num_threads: Optional[int] = None, batch_size: int = 64, limit: Optional[int] = None,
+            latency_runs: int = 50) -> Dict[str, Dict[str, float]]:
+    """
+    Check every backend's accuracy against the PyTorch path and measure its speed.
+
+    Predictions are compared in the model's label units (0-8), the same scale
+    the notebook's cross-validation MSE is reported in.
+
+    Args:
+        csv_file: Labeled comments (text,label)
+        backends: Backends to compare; "torch" is always included as the reference
+        model_dir: Fine-tuned model directory
+        onnx_dir: Directory holding the ONNX exports (default model_dir)
+        num_threads: Intra-op threads for every backend
+        batch_size: Comments per forward pass for the throughput run
+        limit: Only use the first limit rows of the CSV
+        latency_runs: Single-comment requests timed per backend
+
+    Returns:
+        Dictionary of backend to its metrics
+    """
+    texts, labels = load_labeled(csv_file, limit)
+    print(f"Comparing {', '.join(backends)} on {len(texts)} labeled comments from {csv_file}\n")
+
+    results = {}
+    reference = None
+    for backend in ["torch"] + [b for b in backends if b != "torch"]:
+        model, tokenizer, predict = load_backend(backend, model_dir, num_threads, onnx_dir)
+        # warm up allocators and the onnxruntime graph before timing
+        score_texts(texts[:batch_size], model, tokenizer, batch_size=batch_size, predict=predict)
+
+        start = time.perf_counter()
+        predictions = np.asarray(score_texts(texts, model, tokenizer, batch_size=batch_size, predict=predict)) * SCORE_SCALE
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = predictions
+
+        metrics = {
+            "mse": float(np.mean((predictions - labels) ** 2)),
+            "mse_vs_torch": float(np.mean((predictions - reference) ** 2)),
+            "max_abs_diff": float(np.max(np.abs(predictions - reference))),
+            "comments_per_s": len(texts) / elapsed,
+        }
+        metrics.update(benchmark_latency(texts, model, tokenizer, predict, latency_runs))
+        metrics["mse_delta"] = metrics["mse"] - results["torch"]["mse"] if results else 0.0
+        results[backend] = metrics
+
+    base = results["torch"]
+    print(f"{'backend':<10} {'MSE':>8} {'ΔMSE':>9} {'MSE vs torch':>13} {'max |Δ|':>9} "
+          f"{'comments/s':>11} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for backend, m in results.items():
+        print(f"{backend:<10} {m['mse']:>8.4f} {m['mse_delta']:>+9.4f} {m['mse_vs_torch']:>13.6f} "
+              f"{m['max_abs_diff']:>9.4f} {m['comments_per_s']:>11.1f} "
+              f"{m['comments_per_s'] / base['comments_per_s']:>7.2f}x {m['p50_ms']:>8.1f} {m['p95_ms']:>8.1f}")
+    return results
+
+
+def main():
+    """Export the ONNX models or compare backends."""
+    parser = argparse.ArgumentParser(description="Quantized / ONNX Runtime backends for the BERT regressor")
+    parser.add_argument("--model", default=MODEL_DIR, help="fine-tuned model directory")
+    parser.add_argument("--onnx-dir", default=None, help="where the ONNX exports live (default: the model directory)")
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="export model.onnx (and model.int8.onnx with --quantize)")
+    export.add_argument("--quantize", action="store_true", help="also write a dynamically int8-quantized copy")
+    export.add_argument("--opset", type=int, default=17)
+
+    check = commands.add_parser("compare", help="accuracy parity and latency/throughput benchmark")
+    check.add_argument("--csv", default="fineTuning3.csv", help="labeled comments (text,label)")
+    check.add_argument("--backends", default="torch,int8", help=f"comma-separated, from: {', '.join(BACKENDS)}")
+    check.add_argument("--batch-size", type=int, default=64)
+    check.add_argument("--limit", type=int, default=None, help="only use the first N rows")
+    check.add_argument("--latency-runs", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        model, tokenizer = load_model(args.model, args.threads)
+        onnx_dir = args.onnx_dir or args.model
+        os.makedirs(onnx_dir, exist_ok=True)
+        export_onnx(model, tokenizer, os.path.join(onnx_dir, ONNX_FILE), quantize=args.quantize, opset=args.opset)
+    else:
+        backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+        compare(args.csv, backends, args.model, args.onnx_dir, args.threads, args.batch_size, args.limit, args.latency_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Batched BERT inference for scoring comments.
+
+Replaces the one-comment-at-a-time loop from bertFineTuning.ipynb. Comments are
+read from the comment store in chunks, tokenized in one call per chunk,
+grouped into batches of similar token length so each batch is only padded to
+its own longest comment, and run through BertForRegression under
+torch.inference_mode. A DataLoader pads and tensorizes the next batches while
+the current one runs. Results are written in input order as
+{"text", "prediction", "timestamp"} records, the shape plotsliding.py and
+scored_dataset.py read from jsons/<game>P.*.
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import torch
+from torch import nn
+from torch.utils.data import DataLoader
+from transformers import BertModel, BertPreTrainedModel, BertTokenizerFast
+
+from comment_store import NDJSON_EXT, RecordWriter, find_records, iter_records
+from prediction_cache import CACHE_PATH, PredictionCache, file_fingerprint
+
+
+MODEL_DIR = "BERT"
+MAX_LENGTH = 128
+# the regressor was trained on 0-8 labels; predictions are scaled down to 0-1
+SCORE_SCALE = 8
+
+
+class BertForRegression(BertPreTrainedModel):
+    def __init__(self, config):
+        super().__init__(config)
+        self.bert = BertModel(config)
+        self.regressor = nn.Linear(config.hidden_size, 1)
+        self.init_weights()
+
+    def forward(self, input_ids, attention_mask):
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        pooled_output = outputs.pooler_output
+        return self.regressor(pooled_output).squeeze(-1)
+
+
+def load_model(model_dir: str = MODEL_DIR, num_threads: Optional[int] = None):
+    """
+    Load the fine-tuned regressor and its tokenizer for CPU inference.
+
+    Args:
+        model_dir: Directory written by save_pretrained (config, weights, vocab)
+        num_threads: torch intra-op threads; None keeps torch's default
+
+    Returns:
+        Tuple of (model, tokenizer)
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    tokenizer = BertTokenizerFast.from_pretrained(model_dir)
+    model = BertForRegression.from_pretrained(model_dir)
+    model.eval()
+    return model, tokenizer
+
+
+def model_version(model_dir: str = MODEL_DIR, backend: str = "torch") -> str:
+    """
+    Cache key prefix for one model: its backend plus a hash of its config and weights.
+
+    Args:
+        model_dir: Fine-tuned model directory
+        backend: Inference backend (quantized backends give slightly different scores)
+
+    Returns:
+        Version string such as "bert:torch:3f9a0c1d2e4b"
+    """
+    files = [os.path.join(model_dir, name) for name in ("config.json", "model.safetensors", "pytorch_model.bin")]
+    return f"bert:{backend}:{file_fingerprint(files)}"
+
+
+def length_buckets(lengths: Sequence[int], batch_size: int) -> List[List[int]]:
+    """
+    Group row indices into batches of similar length, longest first.
+
+    Args:
+        lengths: Token count of every row
+        batch_size: Rows per batch
+
+    Returns:
+        List of batches, each a list of row indices
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+class _PadBatch:
+    """DataLoader collate_fn: pad one bucket of token ids to its longest row."""
+
+    def __init__(self, input_ids: List[List[int]], pad_token_id: int):
+        self.input_ids = input_ids
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, batch: List[int]):
+        width = max(len(self.input_ids[i]) for i in batch)
+        input_ids = torch.full((len(batch), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+        for row, i in enumerate(batch):
+            ids = self.input_ids[i]
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+        return batch, input_ids, attention_mask
+
+
+def score_texts(texts: Sequence[str], model, tokenizer, batch_size: int = 64, max_length: int = MAX_LENGTH,
+                num_workers: int = 0, prefetch: int = 2, predict=None) -> List[float]:
+    """
+    Score a list of texts with length-bucketed, dynamically padded batches.
+
+    Args:
+        texts: Comment texts
+        model: BertForRegression in eval mode, on any device (ignored when predict is given)
+        tokenizer: Matching tokenizer
+        batch_size: Comments per forward pass
+        max_length: Truncation length in tokens
+        num_workers: DataLoader worker processes preparing batches ahead (0 = in-process)
+        prefetch: Batches each worker prepares ahead
+        predict: Optional callable(input_ids, attention_mask) -> tensor of raw
+                 outputs, for alternative backends
+
+    Returns:
+        Predictions in the same order as texts, scaled to 0-1
+    """
+    if not texts:
+        return []
+
+    input_ids = tokenizer(list(texts), truncation=True, max_length=max_length,
+                          return_attention_mask=False, return_token_type_ids=False)["input_ids"]
+    batches = length_buckets([len(ids) for ids in input_ids], batch_size)
+
+    loader = DataLoader(batches, batch_size=None, collate_fn=_PadBatch(input_ids, tokenizer.pad_token_id),
+                        num_workers=num_workers, prefetch_factor=prefetch if num_workers else None)
+    if predict is None:
+        device = next(model.parameters()).device
+        predict = lambda ids, mask: model(input_ids=ids.to(device), attention_mask=mask.to(device))
+
+    scores = [0.0] * len(texts)
+    with torch.inference_mode():
+        for rows, batch_ids, batch_mask in loader:
+            outputs = predict(batch_ids, batch_mask)
+            for i, value in zip(rows, (outputs / SCORE_SCALE).tolist()):
+                scores[i] = value
+    return scores
+
+
+def score_records(records: Iterable[Dict[str, Any]], model, tokenizer, chunk_size: int = 4096,
+                  cache: Optional[PredictionCache] = None, version: Optional[str] = None,
+                  **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Score scraped comments chunk by chunk.
+
+    Args:
+        records: {"body_html", "created_utc"} comments, e.g. from comment_store.iter_records
+        model: BertForRegression in eval mode
+        tokenizer: Matching tokenizer
+        chunk_size: Comments held in memory (and bucketed together) at a time
+        cache: Optional PredictionCache; only texts it doesn't hold are run through the model
+        version: Cache key prefix for this model (see model_version)
+        **kwargs: Passed to score_texts
+
+    Returns:
+        Iterator of {"text", "prediction", "timestamp"} records in input order
+    """
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield from _score_chunk(chunk, model, tokenizer, cache, version, **kwargs)
+            chunk = []
+    if chunk:
+        yield from _score_chunk(chunk, model, tokenizer, cache, version, **kwargs)
+
+
+def _score_chunk(chunk: List[Dict[str, Any]], model, tokenizer, cache, version, **kwargs) -> Iterator[Dict[str, Any]]:
+    texts = [entry["body_html"] for entry in chunk]
+    if cache is None:
+        predictions = score_texts(texts, model, tokenizer, **kwargs)
+    else:
+        predictions = cache.cached(version or model_version(), texts,
+                                   lambda todo: score_texts(todo, model, tokenizer, **kwargs))
+    for entry, text, prediction in zip(chunk, texts, predictions):
+        yield {
+            "text": text,
+            "prediction": prediction,
+            "timestamp": entry["created_utc"]
+        }
+
+
+def score_file(input_file: str, output_file: str, model, tokenizer, **kwargs) -> int:
+    """
+    Score every comment in a comment-store file and write the results as NDJSON.
+
+    Args:
+        input_file: .ndjson log or legacy .json array of scraped comments
+        output_file: Destination for {"text", "prediction", "timestamp"} records
+        model: BertForRegression in eval mode
+        tokenizer: Matching tokenizer
+        **kwargs: Passed to score_records / score_texts
+
+    Returns:
+        Number of comments scored
+    """
+    start = time.perf_counter()
+    with RecordWriter(output_file, mode="w") as writer:
+        count = writer.write_many(score_records(iter_records(input_file), model, tokenizer, **kwargs))
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Scored {count} comments from {input_file} into {output_file} "
+          f"in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.1f} comments/s)")
+    if kwargs.get("cache") is not None:
+        print(f"   {kwargs['cache'].summary()}")
+    return count
+
+
+def main():
+    """Main function to score one or more games."""
+    parser = argparse.ArgumentParser(description="Score scraped game comments with the fine-tuned BERT regressor")
+    parser.add_argument("games", nargs="+", help="game names, e.g. fsuvsvirginia (reads <data-dir>/<game>.ndjson or .json)")
+    parser.add_argument("--data-dir", default="jsons", help="directory holding the scraped comments and the output")
+    parser.add_argument("--model", default=MODEL_DIR, help="fine-tuned model directory")
+    parser.add_argument("--batch-size", type=int, default=64, help="comments per forward pass")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader workers preparing batches ahead")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="comments bucketed together at a time")
+    parser.add_argument("--backend", default="torch", help="torch, int8, onnx or onnx-int8 (see bert_runtime.py)")
+    parser.add_argument("--cache", default=CACHE_PATH, help="prediction cache file")
+    parser.add_argument("--no-cache", action="store_true", help="score every comment, ignoring the cache")
+    args = parser.parse_args()
+
+    from bert_runtime import load_backend
+    model, tokenizer, predict = load_backend(args.backend, args.model, args.threads)
+    cache = None if args.no_cache else PredictionCache(args.cache)
+    version = model_version(args.model, args.backend)
+
+    for game in args.games:
+        input_file = find_records(os.path.join(args.data_dir, game))
+        if input_file is None:
+            print(f"Error: no comments found for '{game}' in {args.data_dir}/")
+            continue
+        output_file = os.path.join(args.data_dir, f"{game}P{NDJSON_EXT}")
+        score_file(input_file, output_file, model, tokenizer, batch_size=args.batch_size,
+                   num_workers=args.workers, chunk_size=args.chunk_size, predict=predict,
+                   cache=cache, version=version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Chat spike detection for stream chat logs (Clip_rater.ipynb).
+
+A chat log is a CSV of "timestamp","Author","Comment" rows, timestamps as
+video offsets ("2:33:40", "6:06"). Timestamps are parsed as one character
+matrix in NumPy (rows the fast path can't read fall back to
+parse_timestamp, the notebook's regex parser), binned into a per-second
+histogram, and every window's count comes from the histogram's prefix
+sum, so a 3-hour, 100k-message log is scored in a few vectorized passes.
+
+Each window's rate is compared with a baseline:
+
+    mean      comments per minute over the whole log (the notebook's)
+    ewma      exponentially weighted mean of the preceding windows' rates
+    median    rolling median of the preceding windows' rates
+
+The local baselines only look at windows that end before the current one
+starts, so a burst doesn't raise its own bar. Spike windows that overlap or
+touch are merged into intervals, which are ranked by how many comments
+they have above the baseline.
+"""
+
+import argparse
+import re
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+CHAT_CSV = "Data/USCvsNois_video.csv"
+BASELINES = ("mean", "ewma", "median")
+
+
+class Spikes(NamedTuple):
+    """Spike intervals, best first; first/last index the rows of the sorted chat (see load_chat)."""
+    start: np.ndarray           # seconds
+    end: np.ndarray             # seconds
+    count: np.ndarray           # comments in [start, end)
+    peak_rate: np.ndarray       # comments per minute in the busiest window
+    baseline_rate: np.ndarray   # baseline of that window
+    ratio: np.ndarray           # peak_rate / baseline_rate
+    excess: np.ndarray          # comments above the baseline over the interval
+    first: np.ndarray
+    last: np.ndarray
+
+
+def parse_timestamp(val) -> float:
+    """One timestamp to seconds: hh:mm:ss, mm:ss (minutes can exceed 59), plain seconds or a time of day."""
+    s = str(val).strip()
+    if not s or s.lower() in {"nan", "nat"}:
+        return np.nan
+
+    s = re.sub(r"\s+", "", s)
+    s = re.sub(r"(?i)\b(am|pm)\b", "", s)
+
+    m = re.match(r"^(?:(?P<h>\d+):(?P<m>\d{1,2})|(?P<mm>\d+)):(?P<s>\d{1,2}(?:\.\d+)?)$", s)
+    if m:
+        if m.group("h") is not None:
+            return int(m.group("h")) * 3600 + int(m.group("m")) * 60 + float(m.group("s"))
+        return int(m.group("mm")) * 60 + float(m.group("s"))
+    if re.match(r"^\d+(?:\.\d+)?$", s):
+        return float(s)
+
+    try:
+        dt = pd.to_datetime(s, errors="raise")
+        return dt.hour * 3600 + dt.minute * 60 + dt.second + dt.microsecond / 1e6
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def parse_timestamps(values) -> np.ndarray:
+    """
+    Parse a column of timestamps to seconds.
+
+    The common forms (h:mm:ss, m:ss or seconds, optional fractional
+    seconds) are read column by column from a fixed-width character
+    matrix: each colon multiplies what came before by 60. Anything else,
+    including malformed times like "12:" or "1:2:3:4", goes through
+    parse_timestamp.
+
+    Args:
+        values: Sequence of timestamps (strings, numbers or NaN)
+
+    Returns:
+        float64 seconds, NaN where a timestamp couldn't be parsed
+    """
+    text = np.asarray(pd.Series(values, dtype=object).fillna("").astype(str).to_numpy(), dtype=str)
+    n = len(text)
+    if n == 0:
+        return np.empty(0)
+    chars = text.view(np.uint32).reshape(n, -1)
+
+    done = np.zeros(n)      # finished fields, in seconds
+    field = np.zeros(n)     # the field being read
+    scale = np.zeros(n)     # place value of the next fractional digit, 0 before a '.'
+    digits = np.zeros(n, dtype=np.int64)        # whole-number digits in the field being read
+    fraction = np.zeros(n, dtype=np.int64)      # digits after its '.'
+    colons = np.zeros(n, dtype=np.int64)
+    valid = text != ""
+    for col in chars.T:
+        digit = (col >= 48) & (col <= 57)
+        colon = col == 58
+        dot = col == 46
+        value = col.astype(np.float64) - 48
+        field = np.where(digit & (scale == 0), field * 10 + value, field)
+        field = np.where(digit & (scale > 0), field + value * scale, field)
+        fraction += digit & (scale > 0)
+        digits += digit & (scale == 0)
+        scale = np.where(digit & (scale > 0), scale / 10, scale)
+        valid &= digit | colon | dot | (col == 0)
+        # a '.' needs digits before it and only goes in the last field, once
+        valid &= ~(dot & ((scale > 0) | (digits == 0)))
+        # a colon closes a field that has digits (at most two after the first field)
+        valid &= ~(colon & ((scale > 0) | (digits == 0) | ((colons > 0) & (digits > 2))))
+        scale = np.where(dot, 0.1, scale)
+        done = np.where(colon, (done + field) * 60, done)
+        field = np.where(colon, 0, field)
+        colons += colon
+        digits = np.where(colon, 0, digits)
+    # the same rules for the last field, plus digits after any '.', and at most h:m:s
+    valid &= (digits > 0) & ((colons == 0) | (digits <= 2)) & ((scale == 0) | (fraction > 0)) & (colons <= 2)
+    seconds = np.where(valid, done + field, np.nan)
+
+    slow = np.flatnonzero(~valid & (text != ""))
+    if len(slow):
+        seconds[slow] = [parse_timestamp(val) for val in text[slow]]
+    return seconds
+
+
+def load_chat(csv_file: str, column: str = "timestamp") -> pd.DataFrame:
+    """
+    Read a chat log and add a "seconds" column.
+
+    Returns:
+        DataFrame sorted by time with unparseable rows dropped and a fresh
+        RangeIndex, so Spikes.first/last slice it directly
+    """
+    df = pd.read_csv(csv_file)
+    df["seconds"] = parse_timestamps(df[column])
+    dropped = int(df["seconds"].isna().sum())
+    if dropped:
+        print(f"Warning: {dropped} timestamp(s) could not be parsed. Showing up to 10 examples:")
+        print(df.loc[df["seconds"].isna(), column].head(10).to_string(index=False))
+    df = df.dropna(subset=["seconds"]).sort_values("seconds", kind="stable").reset_index(drop=True)
+    if df.empty:
+        raise ValueError("No valid timestamps left after parsing. Please inspect the CSV format.")
+    return df
+
+
+def window_counts(seconds: np.ndarray, window_seconds: float, slide_seconds: float,
+                  resolution: float = 1.0):
+    """
+    Comment counts of windows [start, start + window_seconds) every slide_seconds.
+
+    Counts come from a histogram with `resolution`-second bins, so window
+    edges snap to the bin grid (exact for whole-second timestamps).
+
+    Returns:
+        Tuple of (window starts in seconds, counts)
+    """
+    t0, t1 = seconds.min(), seconds.max()
+    if t1 - t0 < window_seconds:
+        starts = np.array([t0], dtype=np.float64)
+    else:
+        starts = np.arange(t0, t1 - window_seconds + 1, slide_seconds, dtype=np.float64)
+
+    bins = ((seconds - t0) // resolution).astype(np.int64)
+    cumulative = np.concatenate(([0], np.cumsum(np.bincount(bins))))
+    edge = lambda x: np.clip(np.ceil((x - t0) / resolution).astype(np.int64), 0, len(cumulative) - 1)
+    return starts, cumulative[edge(starts + window_seconds)] - cumulative[edge(starts)]
+
+
+def baseline_rates(rates: np.ndarray, mean_rate: float, baseline: str, lookback: int, lag: int) -> np.ndarray:
+    """Baseline per window, from the windows at least `lag` steps back (the mean for the first ones)."""
+    if baseline == "mean":
+        return np.full(len(rates), mean_rate)
+    series = pd.Series(rates)
+    if baseline == "ewma":
+        local = series.ewm(span=lookback, adjust=False).mean()
+    elif baseline == "median":
+        local = series.rolling(lookback, min_periods=1).median()
+    else:
+        raise ValueError(f"Unknown baseline {baseline!r}, expected one of {', '.join(BASELINES)}")
+    return local.shift(lag).fillna(mean_rate).to_numpy()
+
+
+def detect_spikes(seconds: np.ndarray, window_minutes: float = 2, slide_seconds: float = 30,
+                  threshold_multiplier: float = 2.0, baseline: str = "median",
+                  baseline_minutes: float = 15, min_baseline: float = 1.0,
+                  assume_sorted: bool = False) -> Spikes:
+    """
+    Find the intervals where chat runs well above its baseline.
+
+    Args:
+        seconds: Comment times in seconds
+        window_minutes: Window length
+        slide_seconds: Seconds between window starts
+        threshold_multiplier: A window spikes when its rate exceeds this times the baseline
+        baseline: "mean", "ewma" or "median" (see the module docstring)
+        baseline_minutes: Span of the ewma / median lookback
+        min_baseline: Floor on the baseline in comments per minute, so a
+                      quiet stretch doesn't make a handful of comments a spike
+        assume_sorted: Skip the sort when seconds are already ascending
+
+    Returns:
+        Spikes ranked by excess comments
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    seconds = seconds[~np.isnan(seconds)]
+    if not assume_sorted:
+        seconds = np.sort(seconds, kind="stable")
+    if len(seconds) == 0:
+        return Spikes(*(np.empty(0) for _ in Spikes._fields))
+
+    window_seconds = window_minutes * 60
+    elapsed = (seconds[-1] - seconds[0]) / 60
+    if elapsed <= 0:
+        raise ValueError("Non-positive elapsed time computed. Are all timestamps the same?")
+    mean_rate = len(seconds) / elapsed
+
+    starts, counts = window_counts(seconds, window_seconds, slide_seconds)
+    rates = counts / window_minutes
+    lag = int(np.ceil(window_seconds / slide_seconds))
+    lookback = max(int(round(baseline_minutes * 60 / slide_seconds)), 1)
+    base = np.maximum(baseline_rates(rates, mean_rate, baseline, lookback, lag), min_baseline)
+
+    hot = np.flatnonzero(rates > base * threshold_multiplier)
+    if len(hot) == 0:
+        return Spikes(*(np.empty(0) for _ in Spikes._fields))
+
+    # overlapping or touching spike windows form one interval
+    breaks = np.flatnonzero(np.diff(starts[hot]) > window_seconds) + 1
+    group_first = np.concatenate(([0], breaks))
+    group_last = np.concatenate((breaks, [len(hot)])) - 1
+    start = starts[hot[group_first]]
+    end = starts[hot[group_last]] + window_seconds
+
+    ratio = rates[hot] / base[hot]
+    peak = np.maximum.reduceat(ratio, group_first)
+    peak_at = hot[group_first + np.array([np.argmax(ratio[a:b + 1]) for a, b in zip(group_first, group_last)],
+                                         dtype=np.int64)]
+    first = np.searchsorted(seconds, start, side="left")
+    last = np.searchsorted(seconds, end, side="left")
+    count = last - first
+    # baseline comments expected over the interval, every window step from
+    # start to end, including the quieter ones between hot windows
+    steps = np.concatenate(([0], np.cumsum(base)))
+    expected = (steps[hot[group_last] + 1] - steps[hot[group_first]]) * (slide_seconds / 60)
+    expected += base[hot[group_last]] * (window_seconds - slide_seconds) / 60
+    excess = count - expected
+
+    order = np.argsort(-excess, kind="stable")
+    return Spikes(start[order], end[order], count[order], rates[peak_at][order], base[peak_at][order],
+                  peak[order], excess[order], first[order], last[order])
+
+
+def format_seconds(seconds: float) -> str:
+    """Seconds as h:mm:ss, the chat log's own format."""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def spikes_frame(spikes: Spikes) -> pd.DataFrame:
+    """Spikes as a DataFrame, one row per interval, with h:mm:ss columns added."""
+    df = pd.DataFrame(spikes._asdict())
+    df.insert(0, "rank", np.arange(1, len(df) + 1))
+    df["start_time"] = [format_seconds(s) for s in df["start"]]
+    df["end_time"] = [format_seconds(s) for s in df["end"]]
+    return df
+
+
+def synthetic_chat(messages: int = 100_000, hours: float = 3.0, bursts: int = 12, seed: int = 0) -> pd.Series:
+    """A chat log's timestamp column: steady chat plus `bursts` two-minute bursts."""
+    rng = np.random.default_rng(seed)
+    background = rng.uniform(0, hours * 3600, int(messages * 0.8))
+    centers = rng.uniform(600, hours * 3600 - 600, bursts)
+    burst = (np.repeat(centers, (messages - len(background)) // bursts)
+             + rng.normal(0, 30, (messages - len(background)) // bursts * bursts))
+    seconds = np.clip(np.concatenate((background, burst)), 0, None).astype(np.int64)
+    return pd.Series([format_seconds(s) for s in seconds])
+
+
+def benchmark(messages: int, args):
+    timestamps = synthetic_chat(messages)
+    start = time.perf_counter()
+    seconds = parse_timestamps(timestamps)
+    parsed = time.perf_counter()
+    spikes = detect_spikes(seconds, args.window_minutes, args.slide_seconds, args.threshold,
+                           args.baseline, args.baseline_minutes)
+    done = time.perf_counter()
+    print(f"{messages} messages: parse {(parsed - start) * 1000:.1f} ms, "
+          f"detect {(done - parsed) * 1000:.1f} ms, {len(spikes.start)} spike intervals")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank chat spikes in a stream chat log")
+    parser.add_argument("csv_file", nargs="?", default=CHAT_CSV, help="chat log CSV (default: %(default)s)")
+    parser.add_argument("--window-minutes", type=float, default=2)
+    parser.add_argument("--slide-seconds", type=float, default=30)
+    parser.add_argument("--threshold", type=float, default=2.0, help="spike = this times the baseline")
+    parser.add_argument("--baseline", choices=BASELINES, default="median")
+    parser.add_argument("--baseline-minutes", type=float, default=15, help="ewma / median lookback")
+    parser.add_argument("--top", type=int, default=10, help="intervals to print")
+    parser.add_argument("--out", help="write every interval to this CSV")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="time a synthetic 3-hour log of N messages instead")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args)
+        return
+
+    df = load_chat(args.csv_file)
+    spikes = detect_spikes(df["seconds"].to_numpy(), args.window_minutes, args.slide_seconds, args.threshold,
+                           args.baseline, args.baseline_minutes, assume_sorted=True)
+    table = spikes_frame(spikes)
+    print(f"Parsed {len(df)} comments, average {len(df) / ((df['seconds'].iloc[-1] - df['seconds'].iloc[0]) / 60):.2f} per minute")
+    print(f"Top spikes ({args.baseline} baseline):")
+    for row in table.head(args.top).itertuples():
+        print(f"  {row.rank:>2}. {row.start_time} - {row.end_time}: {row.count} comments, "
+              f"peak {row.peak_rate:.1f}/min ({row.ratio:.1f}x baseline), +{row.excess:.0f}")
+        for comment in df["Comment"].iloc[row.first:row.last].head(2):
+            print(f"        {str(comment)[:100]}")
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"✅ Saved {len(table)} spike intervals to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
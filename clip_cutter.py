@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Cut highlight clips out of a game video with ffmpeg.
+
+Takes spike intervals (from chat_spikes.py, a CSV of start/end times, or
+given on the command line), merges the ones that overlap, splits the
+merged intervals into clips of at most --max-seconds (the captioning step
+in Clip_rater.ipynb needs short clips), and cuts every clip with stream
+copy from a bounded pool of concurrent ffmpeg processes.
+
+Stream copy can only start a clip on a keyframe. Each clip's start is
+snapped to the last keyframe at or before it (found with a short ffprobe
+read around that point), and its duration is extended to match, so the
+clip always covers the requested interval and ffmpeg is never left to
+pick the keyframe itself.
+
+Clips are named after their time range (USC_NOIS_002043-002143.mp4), written
+to a .part file and renamed when ffmpeg finishes, so a rerun skips every
+clip that already exists and an interrupted run leaves no half-written clips.
+`--self-test` builds a small synthetic video and cuts it twice.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from chat_spikes import detect_spikes, format_seconds, load_chat, parse_timestamps
+
+
+MAX_CLIP_SECONDS = 60
+MIN_CLIP_SECONDS = 1        # shorter tails are folded into the clip before them
+KEYFRAME_LOOKBACK = 20      # seconds probed before a clip's start for its keyframe
+
+
+def merge_intervals(intervals, pad_before: float = 0, pad_after: float = 0, gap: float = 0) -> np.ndarray:
+    """
+    Pad, sort and merge overlapping intervals.
+
+    Args:
+        intervals: (start, end) pairs in seconds
+        pad_before: Seconds added before every start (clamped at 0)
+        pad_after: Seconds added after every end
+        gap: Intervals less than this far apart are merged too
+
+    Returns:
+        (k, 2) array of disjoint intervals, ascending
+
+    Raises:
+        ValueError: If an interval doesn't end after it starts
+    """
+    spans = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+    if len(spans) == 0:
+        return spans
+    backwards = np.flatnonzero(~(spans[:, 1] > spans[:, 0]))
+    if len(backwards):
+        start, end = spans[backwards[0]]
+        raise ValueError(f"{len(backwards)} interval(s) don't end after they start, "
+                         f"e.g. {format_seconds(start)} - {format_seconds(end)}")
+    spans = spans[np.argsort(spans[:, 0], kind="stable")]
+    starts = np.maximum(spans[:, 0] - pad_before, 0)
+    ends = np.maximum.accumulate(spans[:, 1] + pad_after)
+    # a new interval begins where the start is past every earlier end
+    new = np.concatenate(([True], starts[1:] > ends[:-1] + gap))
+    groups = np.flatnonzero(new)
+    return np.column_stack((starts[groups], ends[np.concatenate((groups[1:], [len(spans)])) - 1]))
+
+
+def split_intervals(intervals: np.ndarray, max_seconds: Optional[float] = MAX_CLIP_SECONDS) -> np.ndarray:
+    """
+    Split every interval into consecutive pieces of at most max_seconds (None keeps them whole).
+
+    A tail shorter than MIN_CLIP_SECONDS is added to the piece before it
+    rather than cut as a sliver clip of its own.
+    """
+    if not max_seconds or len(intervals) == 0:
+        return intervals
+    pieces = []
+    for start, end in intervals:
+        cuts = np.append(np.arange(start, end, max_seconds), end)
+        if len(cuts) > 2 and cuts[-1] - cuts[-2] < MIN_CLIP_SECONDS:
+            cuts = np.delete(cuts, -2)
+        pieces.append(np.column_stack((cuts[:-1], cuts[1:])))
+    return np.concatenate(pieces)
+
+
+def clip_name(video: str, start: float, end: float) -> str:
+    """Output file name of a clip, e.g. USC_NOIS_002043-002143.mp4."""
+    stem, ext = os.path.splitext(os.path.basename(video))
+    stamp = lambda s: format_seconds(s).replace(":", "").zfill(6)
+    return f"{stem}_{stamp(start)}-{stamp(end)}{ext or '.mp4'}"
+
+
+def keyframe_before(video: str, t: float, ffprobe: str = "ffprobe") -> float:
+    """
+    Time of the last video keyframe at or before t.
+
+    Only the packets of the KEYFRAME_LOOKBACK seconds before t are read;
+    if none of them is a keyframe, t is returned unchanged.
+    """
+    if t <= 0:
+        return 0.0
+    command = [ffprobe, "-v", "error", "-select_streams", "v:0",
+               "-read_intervals", f"{max(t - KEYFRAME_LOOKBACK, 0):.3f}%{t + 0.001:.3f}",
+               "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    keyframes = []
+    for line in output.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A") and float(pts_time) <= t:
+            keyframes.append(float(pts_time))
+    return max(keyframes) if keyframes else t
+
+
+def cut_clip(video: str, start: float, end: float, output: str, ffmpeg: str = "ffmpeg",
+             ffprobe: Optional[str] = "ffprobe") -> Dict[str, Any]:
+    """
+    Cut one clip with stream copy.
+
+    Args:
+        video: Source video
+        start: Requested start in seconds
+        end: Requested end in seconds
+        output: Clip path; written as <name>.part<ext> first
+        ffmpeg: ffmpeg executable
+        ffprobe: ffprobe executable for keyframe snapping (None to seek to start as is)
+
+    Returns:
+        Dictionary with "file", "start", "end", "seek" (the keyframe the clip
+        starts on), "elapsed" and "error" (None on success)
+    """
+    began = time.perf_counter()
+    base, ext = os.path.splitext(output)
+    partial = base + ".part" + ext
+    result = {"file": output, "start": start, "end": end, "seek": None, "elapsed": 0.0, "error": None}
+    try:
+        seek = keyframe_before(video, start, ffprobe) if ffprobe else start
+        command = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+                   "-ss", f"{seek:.3f}", "-i", video, "-t", f"{end - seek:.3f}",
+                   "-map", "0", "-c", "copy", "-avoid_negative_ts", "make_zero", partial]
+        subprocess.run(command, capture_output=True, text=True, check=True)
+        os.replace(partial, output)
+        result["seek"] = seek
+    except subprocess.CalledProcessError as e:
+        lines = (e.stderr or "").strip().splitlines()
+        result["error"] = lines[-1] if lines else f"exit status {e.returncode}"
+    except OSError as e:
+        result["error"] = str(e)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    result["elapsed"] = time.perf_counter() - began
+    return result
+
+
+def cut_all(video: str, intervals, output_dir: str, jobs: int = 4, max_seconds: Optional[float] = MAX_CLIP_SECONDS,
+            pad_before: float = 0, pad_after: float = 0, force: bool = False,
+            ffmpeg: str = "ffmpeg", ffprobe: Optional[str] = "ffprobe") -> List[Dict[str, Any]]:
+    """
+    Merge the intervals, split them into clips and cut the missing ones in parallel.
+
+    Args:
+        video: Source video
+        intervals: (start, end) pairs in seconds, in any order, overlapping or not
+        output_dir: Where the clips go
+        jobs: ffmpeg processes at a time
+        max_seconds: Longest clip (None for one clip per merged interval)
+        pad_before: Seconds added before every interval
+        pad_after: Seconds added after every interval
+        force: Re-cut clips that already exist
+
+    Returns:
+        One result dictionary per clip (see cut_clip) in clip order, with a
+        "status" of "cut", "skipped" or "error"
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    clips = split_intervals(merge_intervals(intervals, pad_before, pad_after), max_seconds)
+
+    results = []
+    todo = []
+    for start, end in clips:
+        output = os.path.join(output_dir, clip_name(video, start, end))
+        if not force and os.path.exists(output) and os.path.getsize(output) > 0:
+            results.append({"file": output, "start": start, "end": end, "seek": None, "elapsed": 0.0,
+                            "error": None, "status": "skipped"})
+        else:
+            todo.append((start, end, output))
+
+    if todo:
+        # stream copy is I/O bound, so threads waiting on ffmpeg processes are enough
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            futures = [pool.submit(cut_clip, video, start, end, output, ffmpeg, ffprobe) for start, end, output in todo]
+            for future in as_completed(futures):
+                result = future.result()
+                result["status"] = "error" if result["error"] else "cut"
+                results.append(result)
+
+    return sorted(results, key=lambda r: r["start"])
+
+
+def print_clip_report(results: List[Dict[str, Any]], wall_time: float):
+    """
+    Print a per-clip table for a batch run.
+
+    Args:
+        results: Results from cut_all
+        wall_time: Elapsed seconds for the whole batch
+    """
+    print("\n=== Clip report ===")
+    print(f"{'clip':<36} {'status':<8} {'seconds':>8}")
+    for result in results:
+        print(f"{os.path.basename(result['file']):<36} {result['status']:<8} {result['elapsed']:>8.2f}")
+        if result["error"]:
+            print(f"    Error: {result['error']}")
+
+    cut_time = sum(r["elapsed"] for r in results)
+    counts = {status: sum(r["status"] == status for r in results) for status in ("cut", "skipped", "error")}
+    print(f"\nCut: {counts['cut']}, skipped (already there): {counts['skipped']}, errors: {counts['error']}")
+    print(f"Wall time {wall_time:.2f}s for {cut_time:.2f}s of ffmpeg"
+          + (f" ({cut_time / wall_time:.1f}x parallel speedup)" if wall_time > 0 and cut_time > 0 else ""))
+
+
+def load_intervals(path: str) -> np.ndarray:
+    """
+    Read (start, end) pairs from a CSV with start/end columns, in seconds or
+    h:mm:ss (chat_spikes.py --out writes one).
+    """
+    df = pd.read_csv(path)
+    return np.column_stack((parse_timestamps(df["start"]), parse_timestamps(df["end"])))
+
+
+def make_test_video(path: str, seconds: int = 300, gop: int = 60, ffmpeg: str = "ffmpeg"):
+    """A small synthetic video: test pattern plus a tone, a keyframe every gop frames at 30 fps."""
+    subprocess.run([ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+                    "-f", "lavfi", "-i", f"testsrc=size=320x180:rate=30:duration={seconds}",
+                    "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                    "-c:v", "libx264", "-preset", "ultrafast", "-g", str(gop), "-keyint_min", str(gop),
+                    "-c:a", "aac", "-shortest", path], check=True)
+
+
+def clip_duration(path: str, ffprobe: str = "ffprobe") -> float:
+    output = subprocess.run([ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip())
+
+
+def self_test(jobs: int, ffmpeg: str, ffprobe: str) -> bool:
+    """Cut a synthetic video twice: every clip should cover its interval, and the rerun should skip them all."""
+    work = tempfile.mkdtemp(prefix="clip_cutter_")
+    try:
+        video = os.path.join(work, "synthetic.mp4")
+        make_test_video(video, ffmpeg=ffmpeg)
+        # two overlapping spikes, one touching them, one on its own
+        intervals = [(20, 70), (50, 110), (110, 125), (200, 230)]
+        output_dir = os.path.join(work, "clips")
+
+        start = time.perf_counter()
+        first = cut_all(video, intervals, output_dir, jobs, ffmpeg=ffmpeg, ffprobe=ffprobe)
+        print_clip_report(first, time.perf_counter() - start)
+        start = time.perf_counter()
+        second = cut_all(video, intervals, output_dir, jobs, ffmpeg=ffmpeg, ffprobe=ffprobe)
+        print_clip_report(second, time.perf_counter() - start)
+
+        ok = [r["status"] for r in first] == ["cut"] * 3 and all(r["status"] == "skipped" for r in second)
+        for result in first:
+            if result["status"] == "cut":
+                covered = clip_duration(result["file"], ffprobe) + 0.1 >= result["end"] - result["seek"]
+                ok &= covered
+                if not covered:
+                    print(f"Error: {os.path.basename(result['file'])} is shorter than its interval")
+        if ok:
+            print("✅ Self-test passed: 3 clips from 2 merged intervals, all skipped on the rerun")
+        return ok
+    finally:
+        shutil.rmtree(work)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cut highlight clips for spike intervals with parallel ffmpeg")
+    parser.add_argument("video", nargs="?", help="source video, e.g. USC_NOIS.mp4")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--chat", help="chat log CSV to detect spikes in (see chat_spikes.py)")
+    source.add_argument("--intervals", help="CSV with start/end columns, e.g. from chat_spikes.py --out")
+    source.add_argument("--interval", nargs=2, action="append", metavar=("START", "END"),
+                        help="one interval in h:mm:ss or seconds (repeatable)")
+    parser.add_argument("--top", type=int, help="only the top N chat spikes")
+    parser.add_argument("--output-dir", help="where clips go (default: <video name>_CLIPS)")
+    parser.add_argument("--jobs", type=int, default=4, help="ffmpeg processes at a time")
+    parser.add_argument("--max-seconds", type=float, default=MAX_CLIP_SECONDS,
+                        help="longest clip; 0 keeps merged intervals whole")
+    parser.add_argument("--pad-before", type=float, default=0, help="seconds added before every interval")
+    parser.add_argument("--pad-after", type=float, default=0, help="seconds added after every interval")
+    parser.add_argument("--force", action="store_true", help="re-cut clips that already exist")
+    parser.add_argument("--no-keyframe-snap", action="store_true", help="seek to the requested start without ffprobe")
+    parser.add_argument("--ffmpeg", default="ffmpeg")
+    parser.add_argument("--ffprobe", default="ffprobe")
+    parser.add_argument("--self-test", action="store_true", help="cut a small synthetic video instead")
+    args = parser.parse_args()
+
+    missing = [tool for tool in (args.ffmpeg, args.ffprobe) if shutil.which(tool) is None]
+    if args.ffmpeg in missing or (missing and (args.self_test or not args.no_keyframe_snap)):
+        parser.error(f"{' and '.join(missing)} not found; install ffmpeg or pass --ffmpeg/--ffprobe")
+    if args.self_test:
+        raise SystemExit(0 if self_test(args.jobs, args.ffmpeg, args.ffprobe) else 1)
+    if not args.video:
+        parser.error("a video is required (or --self-test)")
+
+    if args.chat:
+        df = load_chat(args.chat)
+        spikes = detect_spikes(df["seconds"].to_numpy(), assume_sorted=True)
+        intervals = np.column_stack((spikes.start, spikes.end))[:args.top]
+    elif args.intervals:
+        intervals = load_intervals(args.intervals)[:args.top]
+    elif args.interval:
+        intervals = np.array([parse_timestamps(pair) for pair in args.interval])
+    else:
+        parser.error("give --chat, --intervals or --interval")
+    if np.isnan(intervals).any():
+        parser.error("could not parse every interval time")
+    try:
+        merge_intervals(intervals)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output_dir = args.output_dir or os.path.splitext(os.path.basename(args.video))[0] + "_CLIPS"
+    start = time.perf_counter()
+    results = cut_all(args.video, intervals, output_dir, args.jobs, args.max_seconds or None,
+                      args.pad_before, args.pad_after, args.force, args.ffmpeg,
+                      None if args.no_keyframe_snap else args.ffprobe)
+    print_clip_report(results, time.perf_counter() - start)
+    if not any(r["error"] for r in results):
+        print(f"✅ {len(results)} clip(s) in {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
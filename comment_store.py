@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Append-only record storage shared by the scraping and scoring scripts.
+
+Records are stored as NDJSON: one JSON object per line. Producers append
+records as they go, and consumers stream them back one at a time, so neither
+side ever holds a whole game's comments in memory. iter_records also reads
+the older pretty-printed JSON arrays (jsons/*P.json, *Results.json)
+incrementally, so existing data keeps working without conversion.
+"""
+
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+NDJSON_EXT = ".ndjson"
+
+_WHITESPACE = re.compile(r"[\s,]*")
+
+
+class RecordWriter:
+    """
+    Append records to an NDJSON file.
+
+    Use as a context manager:
+
+        with RecordWriter("jsons/game.ndjson") as writer:
+            writer.write({"body_html": "...", "created_utc": 1758941766.0})
+
+    Args:
+        path: File to write; parent directories are created if needed
+        mode: "a" to append to an existing log (default) or "w" to start over
+    """
+
+    def __init__(self, path: str, mode: str = "a"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._file = open(path, mode, encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        """Append a single record."""
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append every record from an iterable and flush. Returns how many were written."""
+        n = 0
+        for record in records:
+            self.write(record)
+            n += 1
+        self.flush()
+        return n
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def append_records(path: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Append records to an NDJSON file in one call.
+
+    Args:
+        path: NDJSON file to append to
+        records: Iterable of JSON-serializable dictionaries
+
+    Returns:
+        Number of records written
+    """
+    with RecordWriter(path) as writer:
+        return writer.write_many(records)
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory,
+    so large pretty-printed arrays can be processed without json.load.
+
+    Args:
+        path: Path to a file containing a single JSON array
+        chunk_size: Characters to read per refill
+
+    Returns:
+        Iterator over the array elements
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(chunk_size)
+        eof = not buf
+        start = buf.find("[")
+        while start == -1 and not eof:
+            more = f.read(chunk_size)
+            eof = not more
+            buf += more
+            start = buf.find("[")
+        if start == -1:
+            raise ValueError(f"'{path}' does not contain a JSON array")
+        pos = start + 1
+        read_size = chunk_size
+
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) and buf[pos] == "]":
+                return
+
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+                # a number at the very end of the buffer may be cut short
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+
+            if complete:
+                yield element
+                pos = end
+                read_size = chunk_size
+                continue
+
+            if eof:
+                raise ValueError(f"Unexpected end of JSON array in '{path}'")
+            # drop what has been consumed, then read more; double the read
+            # size so a single huge element doesn't get re-parsed many times
+            more = f.read(read_size)
+            eof = len(more) < read_size
+            buf = buf[pos:] + more
+            pos = 0
+            read_size *= 2
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from an NDJSON log or a legacy JSON array file.
+
+    Args:
+        path: Path to a .ndjson file or a .json file holding a list of records
+
+    Returns:
+        Iterator over the records in file order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = ""
+        while True:
+            c = f.read(1)
+            if not c or not c.isspace():
+                first = c
+                break
+
+    if first == "[":
+        yield from iter_json_array(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def find_records(stem: str) -> Optional[str]:
+    """
+    Resolve a record file by name, preferring the NDJSON log.
+
+    Args:
+        stem: Path without extension, e.g. "jsons/fsuvsvirginiaP"
+
+    Returns:
+        "<stem>.ndjson" if it exists, else "<stem>.json" if it exists, else None
+    """
+    for ext in (NDJSON_EXT, ".json"):
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return None
+
+
+def main():
+    """Convert a JSON array file to NDJSON without loading it into memory."""
+    if len(sys.argv) != 3:
+        print("Usage: python comment_store.py <input.json> <output.ndjson>")
+        return
+
+    input_file, output_file = sys.argv[1], sys.argv[2]
+    with RecordWriter(output_file, mode="w") as writer:
+        count = writer.write_many(iter_records(input_file))
+    print(f"✅ Wrote {count} records to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,185 +2,163 @@
 """
 Extract scoring plays from college football game data.
 
-This script processes a JSON file containing game data and extracts the last play
-from each drive that had a scoring opportunity. For each scoring play, it returns
-a tuple of (playType, playText, clock).
+Games are streamed one at a time from the JSON array (see
+comment_store.iter_json_array), so a full-season CFBD dump is processed in
+bounded memory. Scoring plays come from each game's play index (see
+play_index.PlayIndex.scoring_events): a play scores if its playTypeId is a
+scoring type, or if it pushes either team's running score above its previous
+high. For each scoring play, it returns a tuple of
+(playType, playText, gameTime, utcTime, homeScore, awayScore).
 """
 
 import json
 import sys
-from typing import List, Tuple, Any, Dict
+from typing import List, Tuple, Any, Dict, Iterator, Optional
 
+from comment_store import iter_json_array
+from play_index import PlayIndex
 
-def extract_scoring_plays(json_file_path: str) -> List[Dict[str, Any]]:
+
+PERIOD_NAMES = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th", 5: "OT"}
+
+
+def format_game_time(clock: str, period: int) -> str:
+    """Game clock with its period, e.g. "11:01 1st"."""
+    period_str = PERIOD_NAMES.get(period, f"{period}OT" if period > 4 else "1st")
+    return f"{clock} {period_str}"
+
+
+def format_utc_time(wall_clock: Optional[str]) -> Optional[str]:
+    """Time-of-day part of an ISO wallClock, e.g. "16:17:15+00:00 UTC"."""
+    if wall_clock and wall_clock != 'Unknown' and 'T' in wall_clock:
+        # Extract just the time portion and remove milliseconds
+        return f"{wall_clock.split('T')[1].split('.')[0]} UTC"
+    return wall_clock
+
+
+def scoring_play_tuple(play: Dict[str, Any], home_score: int = None, away_score: int = None) -> Tuple:
+    """Build the (playType, playText, gameTime, utcTime, homeScore, awayScore) tuple for a play."""
+    return (
+        play.get('playType', 'Unknown'),
+        play.get('playText', 'Unknown'),
+        format_game_time(play.get('clock', 'Unknown'), play.get('period', 1)),
+        format_utc_time(play.get('wallClock', 'Unknown')),
+        play.get('homeScore', 0) if home_score is None else home_score,
+        play.get('awayScore', 0) if away_score is None else away_score,
+    )
+
+
+def find_scoring_plays(plays: List[Dict[str, Any]]) -> List[Tuple]:
     """
-    Extract scoring plays from each game in the JSON file.
-    
+    Find the scoring plays of one game from its play index.
+
+    See PlayIndex.scoring_events for how scoring plays are detected.
+
+    Args:
+        plays: The game's plays in game order
+
+    Returns:
+        List of scoring play tuples
+    """
+    index = PlayIndex(plays)
+    events = index.scoring_events()
+    return [
+        scoring_play_tuple(index.plays[row], int(home), int(away))
+        for row, home, away in zip(events.rows, events.home_score, events.away_score)
+    ]
+
+
+def get_teams(game: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Return (home_team, away_team) for a game, None where it can't be determined."""
+    home_team = None
+    away_team = None
+
+    for team in game.get('teams', []):
+        if not isinstance(team, dict):
+            continue
+        home_away = team.get('homeAway', '')
+        team_name = team.get('team', 'Unknown')
+
+        if home_away == 'home':
+            home_team = team_name
+        elif home_away == 'away':
+            away_team = team_name
+
+    return home_team, away_team
+
+
+def iter_scoring_plays(json_file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream each game's scoring plays from the JSON file, one game at a time.
+
     Args:
         json_file_path: Path to the JSON file containing game data
-        
+
     Returns:
-        List where each element represents a game dictionary containing:
+        Iterator of game dictionaries containing:
+        - game_number: 1-based position of the game in the file
         - home_team: name of home team
-        - away_team: name of away team  
+        - away_team: name of away team
         - scoring_plays: list of tuples with (playType, playText, gameTime, utcTime, homeScore, awayScore)
     """
-    try:
-        with open(json_file_path, 'r', encoding='utf-8') as file:
-            games_data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File '{json_file_path}' not found.")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in file '{json_file_path}': {e}")
-        return []
-    
-    all_games_scoring_plays = []
-    
-    # Process each game
-    for game_index, game in enumerate(games_data):
+    for game_index, game in enumerate(iter_json_array(json_file_path)):
         if not isinstance(game, dict):
             print(f"Warning: Game {game_index + 1} is not a dictionary, skipping...")
             continue
-            
-        game_scoring_plays = []
-        
-        # Extract team information
+
         teams = game.get('teams', [])
         if not isinstance(teams, list) or len(teams) != 2:
             print(f"Warning: Game {game_index + 1} teams is not a valid list, skipping...")
             continue
-            
-        home_team = None
-        away_team = None
-        
-        for team in teams:
-            if not isinstance(team, dict):
-                continue
-            home_away = team.get('homeAway', '')
-            team_name = team.get('team', 'Unknown')
-            
-            if home_away == 'home':
-                home_team = team_name
-            elif home_away == 'away':
-                away_team = team_name
-        
+
+        home_team, away_team = get_teams(game)
         if home_team is None or away_team is None:
             print(f"Warning: Game {game_index + 1} could not determine home/away teams, skipping...")
             continue
-        
-        # Get drives from the game
+
         drives = game.get('drives', [])
         if not isinstance(drives, list):
             print(f"Warning: Game {game_index + 1} drives is not a list, skipping...")
             continue
-        
-        # Process each drive
+
+        plays = []
         for drive_index, drive in enumerate(drives):
-            if not isinstance(drive, dict):
-                print(f"Warning: Game {game_index + 1}, Drive {drive_index + 1} is not a dictionary, skipping...")
+            drive_plays = drive.get('plays', []) if isinstance(drive, dict) else None
+            if not isinstance(drive_plays, list):
+                print(f"Warning: Game {game_index + 1}, Drive {drive_index + 1} has no valid plays list, skipping...")
                 continue
-            
-            # Check if this drive resulted in a scoring play based on result field
-            result = drive.get('result', '')
-            
-            # Check if result contains any scoring keywords
-            scoring_keywords = ["Touchdown", "Field Goal Good", "Safety"]
-            is_scoring_play = any(keyword in result for keyword in scoring_keywords)
-            
-            if is_scoring_play:
-                # Get the plays list
-                plays = drive.get('plays', [])
-                
-                if not isinstance(plays, list):
-                    print(f"Warning: Game {game_index + 1}, Drive {drive_index + 1} plays is not a list, skipping...")
-                    continue
-                
-                if len(plays) == 0:
-                    print(f"Warning: Game {game_index + 1}, Drive {drive_index + 1} has scoring result but no plays, skipping...")
-                    continue
-                
-                # Find the actual scoring play (may not be the last play)
-                scoring_play = None
-                
-                # Administrative play types that are not actual scoring plays
-                administrative_plays = ["End of Game", "End of Half", "End of Quarter", "Timeout", "Kickoff", "Penalty"]
-                
-                # Work backwards through plays to find the actual scoring play
-                for play in reversed(plays):
-                    if not isinstance(play, dict):
-                        continue
-                    
-                    play_type = play.get('playType', '')
-                    play_text = play.get('playText', '')
-                    
-                    # Skip administrative plays
-                    is_administrative = any(admin_type in play_type for admin_type in administrative_plays)
-                    is_administrative = is_administrative or any(admin_type in play_text for admin_type in administrative_plays)
-                    
-                    if not is_administrative:
-                        # Check if this play is actually a scoring play
-                        scoring_play_types = ["Touchdown", "Field Goal Good", "Safety", "FG"]
-                        is_actual_scoring_play = any(scoring_type in play_type for scoring_type in scoring_play_types)
-                        is_actual_scoring_play = is_actual_scoring_play or any(scoring_type in play_text for scoring_type in scoring_play_types)
-                        
-                        if is_actual_scoring_play:
-                            scoring_play = play
-                            break
-                        # If it's not administrative and not clearly a scoring play, 
-                        # but the drive result indicates scoring, use this play
-                        elif scoring_play is None:
-                            scoring_play = play
-                
-                # If we couldn't find a better play, use the last play
-                if scoring_play is None:
-                    scoring_play = plays[-1]
-                
-                if not isinstance(scoring_play, dict):
-                    print(f"Warning: Game {game_index + 1}, Drive {drive_index + 1} scoring play is not a dictionary, skipping...")
-                    continue
-                
-                # Extract the required fields
-                play_type = scoring_play.get('playType', 'Unknown')
-                play_text = scoring_play.get('playText', 'Unknown')
-                clock = scoring_play.get('clock', 'Unknown')
-                period = scoring_play.get('period', 1)
-                wall_clock = scoring_play.get('wallClock', 'Unknown')
-                home_score = scoring_play.get('homeScore', 0)
-                away_score = scoring_play.get('awayScore', 0)
-                
-                # Format game time with period
-                period_names = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th", 5: "OT"}
-                period_str = period_names.get(period, f"{period}OT" if period > 4 else "1st")
-                game_time = f"{clock} {period_str}"
-                
-                # Format wall clock time (convert from UTC ISO format to readable format)
-                utc_time = wall_clock
-                if wall_clock and wall_clock != 'Unknown' and 'T' in wall_clock:
-                    try:
-                        # Extract just the time portion and remove milliseconds/timezone
-                        time_part = wall_clock.split('T')[1].split('.')[0]
-                        utc_time = f"{time_part} UTC"
-                    except:
-                        utc_time = wall_clock
-                
-                # Create tuple with both times and add to game's scoring plays
-                scoring_play_tuple = (play_type, play_text, game_time, utc_time, home_score, away_score)
-                game_scoring_plays.append(scoring_play_tuple)
-        
-        # Create game data with team information
-        game_data = {
+            plays.extend(drive_plays)
+
+        game_scoring_plays = find_scoring_plays(plays)
+        print(f"Game {game_index + 1} ({away_team} @ {home_team}): Found {len(game_scoring_plays)} scoring plays")
+
+        yield {
             'game_number': game_index + 1,
             'home_team': home_team,
             'away_team': away_team,
             'scoring_plays': game_scoring_plays
         }
-        
-        # Add this game's data to the overall list
-        all_games_scoring_plays.append(game_data)
-        print(f"Game {game_index + 1} ({away_team} @ {home_team}): Found {len(game_scoring_plays)} scoring plays")
-    
-    return all_games_scoring_plays
+
+
+def extract_scoring_plays(json_file_path: str) -> List[Dict[str, Any]]:
+    """
+    Extract scoring plays from each game in the JSON file.
+
+    Args:
+        json_file_path: Path to the JSON file containing game data
+
+    Returns:
+        List of game dictionaries as yielded by iter_scoring_plays
+    """
+    try:
+        return list(iter_scoring_plays(json_file_path))
+    except FileNotFoundError:
+        print(f"Error: File '{json_file_path}' not found.")
+        return []
+    except ValueError as e:
+        # json.JSONDecodeError is a ValueError, as are truncated or non-array files
+        print(f"Error: Invalid JSON in file '{json_file_path}': {e}")
+        return []
 
 
 def print_scoring_plays(all_games_scoring_plays: List[Dict[str, Any]]):
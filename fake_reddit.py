@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the Reddit API that redditAPI.py uses.
+
+Serves a synthetic game thread from /comments/<post_id> and
+/api/morechildren, with a fixed per-request latency and a rate-limit window
+reported through the same X-Ratelimit-* headers Reddit sends. Running this
+file starts the server, crawls the thread with redditAPI.extract_comments and
+reports how many comments per second were fetched; --live instead polls a
+growing thread with redditAPI.LiveThread and reports the cost of each poll.
+Either way it exits non-zero if any comment of the thread was missed.
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any
+
+from aiohttp import web
+
+import redditAPI
+
+
+def base36(n: int) -> str:
+    """Encode an int the way Reddit encodes comment ids."""
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if n == 0:
+            return out
+
+
+class FakeThread:
+    """
+    Synthetic comment tree with `size` comments.
+
+    Comments 0..top-1 are top-level; comment i's replies are the next
+    `fanout` ids after top + i*fanout, so expanding the whole thread needs
+    several rounds of /api/morechildren calls.
+    """
+
+    def __init__(self, size: int = 6000, top: int = 200, fanout: int = 3, inline: int = 20, start_utc: float = 1758941000.0):
+        self.size = size
+        self.top = min(top, size)
+        self.fanout = fanout
+        self.inline = min(inline, self.top)
+        self.start_utc = start_utc
+
+    def children_of(self, i: int) -> List[int]:
+        first = self.top + i * self.fanout
+        return list(range(first, min(first + self.fanout, self.size)))
+
+    def comment(self, i: int) -> Dict[str, Any]:
+        return {
+            "kind": "t1",
+            "data": {
+                "id": base36(i),
+                "name": f"t1_{base36(i)}",
+                "body_html": f"&lt;div class=\"md\"&gt;&lt;p&gt;comment {i}&lt;/p&gt;&lt;/div&gt;",
+                "created_utc": self.start_utc + i,
+                "replies": ""
+            }
+        }
+
+    def more(self, ids: List[int]) -> Dict[str, Any]:
+        return {"kind": "more", "data": {"count": len(ids), "children": [base36(i) for i in ids]}}
+
+    def grow(self, n: int):
+        """Add `n` newer comments, as a live thread would between polls."""
+        self.size += n
+
+    def listing(self, sort: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+        if sort == "new":
+            # newest `limit` comments first, the rest behind a single "more"
+            newest = list(range(self.size - 1, max(self.size - 1 - limit, -1), -1))
+            things = [self.comment(i) for i in newest]
+            if self.size > limit:
+                things.append(self.more(list(range(self.size - 1 - limit, -1, -1))))
+            return [{"kind": "Listing", "data": {"children": []}},
+                    {"kind": "Listing", "data": {"children": things}}]
+
+        things = []
+        for i in range(self.inline):
+            things.append(self.comment(i))
+            if self.children_of(i):
+                things.append(self.more(self.children_of(i)))
+        if self.inline < self.top:
+            things.append(self.more(list(range(self.inline, self.top))))
+        return [{"kind": "Listing", "data": {"children": []}},
+                {"kind": "Listing", "data": {"children": things}}]
+
+    def expand(self, ids: List[str]) -> List[Dict[str, Any]]:
+        things = []
+        for cid in ids:
+            i = int(cid, 36)
+            if i >= self.size:
+                continue
+            things.append(self.comment(i))
+            if self.children_of(i):
+                things.append(self.more(self.children_of(i)))
+        return things
+
+
+class RateWindow:
+    """Fixed request budget per window, reported like Reddit's headers."""
+
+    def __init__(self, budget: int, period: float):
+        self.budget = budget
+        self.period = period
+        self.window_start = time.monotonic()
+        self.used = 0
+
+    def hit(self) -> Dict[str, str]:
+        now = time.monotonic()
+        if now - self.window_start >= self.period:
+            self.window_start = now
+            self.used = 0
+        self.used += 1
+        reset = self.period - (now - self.window_start)
+        return {
+            "X-Ratelimit-Used": str(self.used),
+            "X-Ratelimit-Remaining": str(max(self.budget - self.used, 0)),
+            "X-Ratelimit-Reset": str(int(reset + 0.999))
+        }
+
+    @property
+    def exceeded(self) -> bool:
+        return self.used > self.budget
+
+
+def make_app(thread: FakeThread, latency: float = 0.05, budget: int = 1000, period: float = 600.0) -> web.Application:
+    """Build the aiohttp application serving `thread` under a `budget`-per-`period` rate limit."""
+    window = RateWindow(budget, period)
+    app = web.Application()
+    app["stats"] = {"requests": 0, "throttled": 0}
+
+    async def comments(request: web.Request) -> web.Response:
+        headers = window.hit()
+        app["stats"]["requests"] += 1
+        if window.exceeded:
+            app["stats"]["throttled"] += 1
+            return web.json_response({"error": 429}, status=429, headers=headers)
+        await asyncio.sleep(latency)
+        listing = thread.listing(request.query.get("sort", ""), int(request.query.get("limit", 100)))
+        return web.json_response(listing, headers=headers)
+
+    async def morechildren(request: web.Request) -> web.Response:
+        headers = window.hit()
+        app["stats"]["requests"] += 1
+        if window.exceeded:
+            app["stats"]["throttled"] += 1
+            return web.json_response({"error": 429}, status=429, headers=headers)
+        await asyncio.sleep(latency)
+        ids = [c for c in request.query.get("children", "").split(",") if c]
+        return web.json_response({"json": {"errors": [], "data": {"things": thread.expand(ids)}}}, headers=headers)
+
+    app.router.add_get("/comments/{post_id}", comments)
+    app.router.add_get("/api/morechildren", morechildren)
+    return app
+
+
+async def benchmark(size: int, fanout: int, latency: float, concurrency: int, batch_size: int,
+                    budget: int = 600, period: float = 60.0, threads: int = 1, port: int = 8765):
+    """Serve a fake thread locally and crawl `threads` copies of it at once through one client."""
+    thread = FakeThread(size=size, fanout=fanout)
+    app = make_app(thread, latency=latency, budget=budget, period=period)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+
+    try:
+        # generous starting budget; the headers take over after the first response
+        limiter = redditAPI.RateLimiter(rate=100.0, capacity=concurrency)
+        async with redditAPI.RedditClient("fake-token", "fanalytics-bench/0.1", base_url=f"http://127.0.0.1:{port}",
+                                          max_concurrency=concurrency, limiter=limiter) as client:
+
+            async def crawl(post_id: str) -> int:
+                raw = await redditAPI.fetch_comments(client, post_id)
+                comments = await redditAPI.extract_comments(raw, post_id, client, max_more_calls=size, batch_size=batch_size)
+                return len(comments)
+
+            start = time.perf_counter()
+            counts = await asyncio.gather(*(crawl(f"fake{n}") for n in range(threads)))
+            elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    print(f"Fetched {sum(counts)}/{size * threads} comments from {threads} thread(s) in {elapsed:.2f}s "
+          f"({sum(counts) / elapsed:.0f} comments/s, {app['stats']['requests']} requests, "
+          f"{app['stats']['throttled']} throttled)")
+    if sum(counts) != size * threads:
+        print(f"Error: crawled {sum(counts)} comments, the fake thread(s) hold {size * threads}")
+    return counts
+
+
+async def live_benchmark(size: int, growth: int, polls: int, latency: float, concurrency: int,
+                         port: int = 8765) -> bool:
+    """
+    Poll a growing fake thread with redditAPI.LiveThread and report the cost of each poll.
+
+    Returns:
+        True if every poll had seen the whole thread
+    """
+    thread = FakeThread(size=size)
+    app = make_app(thread, latency=latency, budget=100000)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+
+    log_dir = tempfile.mkdtemp()
+    complete = True
+    try:
+        limiter = redditAPI.RateLimiter(rate=100.0, capacity=concurrency)
+        async with redditAPI.RedditClient("fake-token", "fanalytics-bench/0.1", base_url=f"http://127.0.0.1:{port}",
+                                          max_concurrency=concurrency, limiter=limiter) as client:
+            live = redditAPI.LiveThread("fake", "fake", out_dir=log_dir)
+            for n in range(polls):
+                requests_before = client.requests_made
+                start = time.perf_counter()
+                new = await live.poll(client)
+                elapsed = time.perf_counter() - start
+                print(f"Poll #{n + 1}: +{new} new comments, {client.requests_made - requests_before} requests, "
+                      f"{elapsed * 1000:.0f} ms ({len(live.seen)} seen)")
+                if len(live.seen) != thread.size:
+                    print(f"Error: poll #{n + 1} has seen {len(live.seen)} comments, the thread holds {thread.size}")
+                    complete = False
+                thread.grow(growth)
+    finally:
+        await runner.cleanup()
+        shutil.rmtree(log_dir)
+    return complete
+
+
+def main():
+    """Main function to run the crawler benchmark against the fake API."""
+    parser = argparse.ArgumentParser(description="Benchmark redditAPI.extract_comments against a local fake Reddit API")
+    parser.add_argument("--size", type=int, default=6000, help="number of comments in the fake thread")
+    parser.add_argument("--fanout", type=int, default=3, help="replies per comment")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of latency per request")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent morechildren requests")
+    parser.add_argument("--batch-size", type=int, default=100, help="children per morechildren request")
+    parser.add_argument("--budget", type=int, default=600, help="requests allowed per rate-limit window")
+    parser.add_argument("--period", type=float, default=60.0, help="rate-limit window length in seconds")
+    parser.add_argument("--threads", type=int, default=1, help="game threads to crawl at the same time")
+    parser.add_argument("--live", type=int, metavar="POLLS", default=0,
+                        help="instead of one crawl, poll a growing thread POLLS times with LiveThread")
+    parser.add_argument("--growth", type=int, default=50, help="new comments between live polls")
+    args = parser.parse_args()
+
+    if args.live:
+        if not asyncio.run(live_benchmark(args.size, args.growth, args.live, args.latency, args.concurrency)):
+            sys.exit(1)
+        return
+
+    counts = asyncio.run(benchmark(args.size, args.fanout, args.latency, args.concurrency, args.batch_size,
+                                   args.budget, args.period, args.threads))
+    if sum(counts) != args.size * args.threads:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
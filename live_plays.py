@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Incremental ingestion of CFBD live plays.
+
+/live/plays (and Data/live_scores.json) returns the whole game on every
+poll: drives with every play so far nested inside. Instead of re-walking
+and re-scoring the full game each time, GamePlays remembers which play ids
+it has seen and picks the new plays off the end of the feed. Ids aren't
+in feed order (a late play can carry a lower id than the one before it),
+so a play is new when its id is unseen, not when it's above a high-water
+mark. New plays are appended to a per-game play table
+(plays-<game_id>.ndjson in out_dir) and to the game's ScoringTracker,
+which extends a PlayIndex with them and reports scoring plays from
+PlayIndex.scoring_events as soon as they show up.
+
+The feed grows at the end, so the scan walks backwards from the last play
+and stops at the first one already seen. CFBD occasionally slots a play in
+out of order; when the feed holds more plays than the scan accounts for,
+every play is checked against the seen ids instead.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from extract_scoring_plays import find_scoring_plays, scoring_play_tuple
+from play_index import SCORING_PLAY_TYPES, PlayIndex
+
+LIVE_SCORES = os.path.join("Data", "live_scores.json")
+
+
+class ScoringEvent(NamedTuple):
+    """A scoring play, as soon as it's ingested."""
+    game_id: Any
+    play_id: str
+    row: int                # position of the play in the game's play table
+    scoring_play: Tuple     # (playType, playText, gameTime, utcTime, homeScore, awayScore)
+    correction: bool        # True when this re-reports an earlier event with its points added
+
+
+class ScoringTracker:
+    """
+    PlayIndex.scoring_events over a play table that grows at the end.
+
+    Plays are appended to a PlayIndex as they arrive and the scoring plays
+    are re-derived from it by the same rule find_scoring_plays uses, so the
+    two can't disagree; each call reports the events that are new or whose
+    score changed. The last play so far is held back until the next one
+    arrives unless it's a scoring-type play, since a scoring-type play right
+    after it would claim its score change.
+
+    Args:
+        game_id: CFBD game id the events are tagged with
+    """
+
+    def __init__(self, game_id: Any = None):
+        self.game_id = game_id
+        self.index = PlayIndex([])
+        self.pending: List[Dict[str, Any]] = []
+        self.events: Dict[int, ScoringEvent] = {}
+
+    def add(self, plays: List[Dict[str, Any]]) -> List[ScoringEvent]:
+        """Feed the next plays. Returns the new or corrected events, in play order."""
+        plays = self.pending + list(plays)
+        ready = len(plays) - (1 if plays and (plays[-1].get("playTypeId") or -1) not in SCORING_PLAY_TYPES else 0)
+        self.pending = plays[ready:]
+        if not ready:
+            return []
+
+        self.index.extend(plays[:ready])
+        found = self.index.scoring_events()
+        changed = []
+        for row, home, away in zip(found.rows.tolist(), found.home_score.tolist(), found.away_score.tolist()):
+            previous = self.events.get(row)
+            if previous and previous.scoring_play[4:] == (home, away):
+                continue
+            play = self.index.plays[row]
+            event = ScoringEvent(self.game_id, str(play.get("id")), row, scoring_play_tuple(play, home, away),
+                                 previous is not None)
+            self.events[row] = event
+            changed.append(event)
+        return changed
+
+    def scoring_plays(self) -> List[Tuple]:
+        """Scoring play tuples reported so far, as find_scoring_plays would return them."""
+        return [self.events[row].scoring_play for row in sorted(self.events)]
+
+
+class GamePlays:
+    """
+    Append-only play table of one game.
+
+    Args:
+        game_id: CFBD game id
+        path: NDJSON file the table is appended to (None keeps it in memory);
+              plays already in it are loaded, so a restarted poller resumes
+    """
+
+    def __init__(self, game_id: Any, path: Optional[str] = None):
+        self.game_id = game_id
+        self.path = path
+        self.plays: List[Dict[str, Any]] = []
+        self.seen = set()
+        self.tracker = ScoringTracker(game_id)
+        if path and os.path.exists(path):
+            self._append(self._load(path))
+
+    @staticmethod
+    def _load(path: str) -> List[Dict[str, Any]]:
+        """
+        Plays in a table file. A line left half-written by a crash is cut
+        off the file, so the next append starts on a fresh line; lines that
+        don't parse are skipped.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(complete)
+
+        plays = []
+        for number, line in enumerate(data[:complete].splitlines(), 1):
+            try:
+                plays.append(json.loads(line))
+            except ValueError:
+                print(f"Warning: skipping unreadable line {number} of {path}")
+        return plays
+
+    def _append(self, plays: List[Dict[str, Any]]) -> List[ScoringEvent]:
+        self.seen.update(str(play.get("id")) for play in plays)
+        self.plays.extend(plays)
+        return self.tracker.add(plays)
+
+    def new_plays(self, live_game: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Plays of a live game response that aren't in the table yet, in feed order."""
+        drives = [drive.get("plays") or [] for drive in live_game.get("drives") or [] if isinstance(drive, dict)]
+        fresh = []
+        for plays in reversed(drives):
+            for play in reversed(plays):
+                if str(play.get("id")) in self.seen:
+                    break
+                fresh.append(play)
+            else:
+                continue
+            break
+        fresh.reverse()
+
+        if len(self.seen) + len(fresh) < sum(len(plays) for plays in drives):
+            # a play turned up behind one we've already seen
+            fresh = [play for plays in drives for play in plays if str(play.get("id")) not in self.seen]
+        return fresh
+
+    def ingest(self, live_game: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[ScoringEvent]]:
+        """
+        Add the new plays of a live game response to the table.
+
+        Returns:
+            Tuple of (new plays, scoring events they produced)
+        """
+        fresh = self.new_plays(live_game)
+        if not fresh:
+            return [], []
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(play, ensure_ascii=False) + "\n" for play in fresh))
+        return fresh, self._append(fresh)
+
+
+def print_event(event: ScoringEvent):
+    play_type, play_text, game_time, utc_time, home_score, away_score = event.scoring_play
+    label = "Updated score" if event.correction else play_type
+    print(f"[{event.game_id}] {game_time}: {label} - {home_score}-{away_score} - {play_text}")
+
+
+class LiveIngest:
+    """
+    GamePlays for every game in a live feed; call it with each /live/plays response.
+
+    Args:
+        out_dir: Where the per-game play tables go (None keeps them in memory)
+        on_scoring: Called with every ScoringEvent as it's found
+    """
+
+    def __init__(self, out_dir: Optional[str] = "cfbd_logs",
+                 on_scoring: Optional[Callable[[ScoringEvent], None]] = print_event):
+        self.out_dir = out_dir
+        self.on_scoring = on_scoring
+        self.games: Dict[Any, GamePlays] = {}
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+    def game(self, game_id: Any) -> GamePlays:
+        if game_id not in self.games:
+            path = os.path.join(self.out_dir, f"plays-{game_id}.ndjson") if self.out_dir else None
+            self.games[game_id] = GamePlays(game_id, path)
+        return self.games[game_id]
+
+    def __call__(self, live_game: Dict[str, Any]) -> List[ScoringEvent]:
+        _, events = self.game(live_game["id"]).ingest(live_game)
+        if self.on_scoring:
+            for event in events:
+                self.on_scoring(event)
+        return events
+
+
+def truncate_game(game: Dict[str, Any], n: int) -> Dict[str, Any]:
+    """The game as a live feed would have shown it after its first n plays."""
+    drives, left = [], n
+    for drive in game.get("drives") or []:
+        if left <= 0:
+            break
+        plays = (drive.get("plays") or [])[:left]
+        left -= len(plays)
+        drives.append(dict(drive, plays=plays))
+    return dict(game, drives=drives)
+
+
+def replay(games: List[Dict[str, Any]], plays_per_poll: int = 1):
+    """
+    Feed each game to LiveIngest as a sequence of growing live responses and
+    check the incremental scoring plays against find_scoring_plays on the
+    whole game; times both against re-scoring the whole game every poll.
+    """
+    polls = [truncate_game(game, n)
+             for game in games
+             for n in range(plays_per_poll, sum(len(d.get("plays") or []) for d in game["drives"]) + plays_per_poll,
+                            plays_per_poll)]
+
+    ingest = LiveIngest(out_dir=None, on_scoring=None)
+    start = time.perf_counter()
+    for poll in polls:
+        ingest(poll)
+    incremental = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for poll in polls:
+        find_scoring_plays([play for drive in poll["drives"] for play in drive["plays"]])
+    rescan = time.perf_counter() - start
+
+    mismatched = 0
+    for game in games:
+        expected = find_scoring_plays([play for drive in game["drives"] for play in drive["plays"]])
+        if ingest.games[game["id"]].tracker.scoring_plays() != expected:
+            mismatched += 1
+            print(f"Error: game {game['id']} scoring plays differ from find_scoring_plays")
+
+    print(f"{len(polls)} polls of {len(games)} games: incremental {incremental * 1000:.1f} ms, "
+          f"re-scoring every poll {rescan * 1000:.1f} ms")
+    if not mismatched:
+        print(f"✅ Incremental scoring plays match find_scoring_plays for all {len(games)} games")
+    return ingest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest CFBD live plays incrementally")
+    parser.add_argument("file", nargs="?", default=LIVE_SCORES,
+                        help="live plays dump to replay poll by poll (default: %(default)s)")
+    parser.add_argument("--plays-per-poll", type=int, default=1, help="plays added between replayed polls")
+    parser.add_argument("--poll-hours", type=float,
+                        help="poll the CFBD API for this long instead (needs BEARER_TOKEN)")
+    parser.add_argument("--out-dir", default="cfbd_logs", help="where polled play tables are written")
+    args = parser.parse_args()
+
+    if args.poll_hours:
+        import asyncio
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CFDB Scraping"))
+        import Scores
+        asyncio.run(Scores.poll_for_duration(args.poll_hours, args.out_dir, on_plays=LiveIngest(args.out_dir)))
+        return
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        games = json.load(f)
+    replay(games, args.plays_per_poll)
+
+
+if __name__ == "__main__":
+    main()
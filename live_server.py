@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Live game data server for the React Native app.
+
+Serves every game in exports/ as one JSON document: the compact sentiment
+curve and best/worst comments from app_payload.build_payload, plus the
+game's scoring plays from Data/scoring_plays.json. The files are re-read
+whenever the pipeline rewrites them, and clients are kept current with
+deltas instead of whole documents:
+
+    GET /games                     game list with current versions
+    GET /games/{game}              snapshot; ETag / If-None-Match, gzip
+    GET /games/{game}/events       Server-Sent Events stream of deltas
+    GET /games/{game}/ws           the same stream over a WebSocket
+
+A stream starts with a snapshot message (or, when the client passes the
+version it already has with ?since= or Last-Event-ID, just the deltas it
+missed) and then sends one delta per new version:
+
+    {"type": "delta", "game": "lsuvolemiss", "version": 8, "base": 7,
+     "ops": [{"op": "splice", "path": "t", "index": 161, "value": [...]}]}
+
+A splice truncates the list at index and appends value, which covers both
+new points at the end of the curve and a change to the last bucket; other
+changed keys are sent with "set". Every version's snapshot, gzip body,
+ETag and delta message are serialized once and shared by all clients.
+
+Running this file with --loadtest starts the server, replays a game into it
+and measures delivery to thousands of simulated clients.
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import os
+import statistics
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, WSMsgType, web
+
+from app_payload import build_payload
+from plot_game_analysis import extract_team_names, find_matching_game, parse_game_time
+
+
+# more seconds than any game lasts, so live curves are never downsampled and grow by appending
+LIVE_MAX_POINTS = 10_000
+HISTORY = 256            # deltas kept per game for clients resuming with ?since=
+KEEPALIVE = 15.0         # seconds between SSE keep-alive comments
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def build_document(game_id: str, export: Dict[str, Any], scoring_game: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the document served for one game.
+
+    Args:
+        game_id: Export file name without .json
+        export: exports/*.json contents
+        scoring_game: The game's entry in scoring_plays.json, if any
+
+    Returns:
+        Compact payload (see app_payload) plus game, away_team, home_team and scoring_plays
+    """
+    away_team, home_team = extract_team_names(f"{game_id}.json")
+    document = build_payload(export, LIVE_MAX_POINTS)
+    document.update({
+        "game": game_id,
+        "away_team": away_team,
+        "home_team": home_team,
+        "scoring_plays": (scoring_game or {}).get("scoring_plays", []),
+    })
+    return document
+
+
+def diff_documents(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Operations that turn old into new.
+
+    Returns:
+        List of {"op": "splice", "path", "index", "value"} for lists and
+        {"op": "set", "path", "value"} for anything else; empty if equal
+    """
+    ops = []
+    for key, value in new.items():
+        before = old.get(key)
+        if before == value:
+            continue
+        if isinstance(before, list) and isinstance(value, list):
+            index = 0
+            for a, b in zip(before, value):
+                if a != b:
+                    break
+                index += 1
+            ops.append({"op": "splice", "path": key, "index": index, "value": value[index:]})
+        else:
+            ops.append({"op": "set", "path": key, "value": value})
+    return ops
+
+
+def apply_delta(document: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply diff_documents operations to a document, in place. Returns the document."""
+    for op in ops:
+        if op["op"] == "splice":
+            document[op["path"]] = document.get(op["path"], [])[:op["index"]] + op["value"]
+        else:
+            document[op["path"]] = op["value"]
+    return document
+
+
+class GameFeed:
+    """
+    Current document of one game, its recent deltas, and change notification.
+
+    Args:
+        game_id: Game identifier used in URLs
+        document: Initial document
+        history: Deltas kept for resuming clients
+    """
+
+    def __init__(self, game_id: str, document: Dict[str, Any], history: int = HISTORY):
+        self.game_id = game_id
+        self.document = document
+        self.version = 1
+        self.deltas = deque(maxlen=history)
+        self.published = {}     # version -> perf_counter() when published, for the versions in deltas
+        self.closed = False
+        self._changed = asyncio.Event()
+        self._cache = {}
+
+    def update(self, document: Dict[str, Any]) -> bool:
+        """
+        Replace the document and wake every subscriber.
+
+        Returns:
+            True if anything changed (and a new version was published)
+        """
+        ops = diff_documents(self.document, document)
+        if not ops:
+            return False
+        self.version += 1
+        self.document = document
+        self._cache = {}
+        self.deltas.append((self.version, dumps({"type": "delta", "game": self.game_id, "version": self.version,
+                                                 "base": self.version - 1, "ops": ops})))
+        self.published[self.version] = time.perf_counter()
+        while len(self.published) > len(self.deltas):
+            del self.published[next(iter(self.published))]
+        self._wake()
+        return True
+
+    def close(self):
+        """Mark the game as gone and wake every subscriber so their streams end."""
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _cached(self, name: str, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def snapshot(self) -> bytes:
+        return self._cached("snapshot", lambda: dumps(self.document).encode("utf-8"))
+
+    @property
+    def snapshot_gzip(self) -> bytes:
+        return self._cached("gzip", lambda: gzip.compress(self.snapshot, compresslevel=6, mtime=0))
+
+    @property
+    def etag(self) -> str:
+        return self._cached("etag", lambda: '"' + hashlib.blake2b(self.snapshot, digest_size=12).hexdigest() + '"')
+
+    def snapshot_message(self) -> str:
+        return self._cached("message", lambda: dumps({"type": "snapshot", "game": self.game_id,
+                                                      "version": self.version, "document": self.document}))
+
+    def messages_since(self, version: Optional[int]) -> List[Tuple[int, str]]:
+        """
+        What a client at version needs to catch up.
+
+        Returns:
+            (version, message) pairs: the missed deltas, or a single snapshot
+            when the client has nothing or is further behind than the history
+        """
+        if version == self.version:
+            return []
+        if version is None or version > self.version or not self.deltas or self.deltas[0][0] > version + 1:
+            return [(self.version, self.snapshot_message())]
+        return [(v, message) for v, message in self.deltas if v > version]
+
+    async def wait(self, version: int, timeout: Optional[float] = None) -> bool:
+        """Wait until a version newer than `version` is published or the feed closes. Returns False on timeout."""
+        while self.version <= version and not self.closed:
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+class GameStore:
+    """
+    Feeds for every game export, refreshed when the files change.
+
+    Args:
+        exports_dir: Directory of <game>.json sentiment exports
+        scoring_file: scoring_plays.json written by extract_scoring_plays.py
+    """
+
+    def __init__(self, exports_dir: str = "exports", scoring_file: str = "Data/scoring_plays.json"):
+        self.exports_dir = exports_dir
+        self.scoring_file = scoring_file
+        self.feeds: Dict[str, GameFeed] = {}
+        self._mtimes: Dict[str, float] = {}
+
+    def _changed(self, path: str) -> bool:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+        if self._mtimes.get(path) == mtime:
+            return False
+        self._mtimes[path] = mtime
+        return True
+
+    def load_changes(self) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Read and build the documents of games whose export or scoring plays
+        changed. Blocking file I/O only; feeds are not touched.
+
+        Returns:
+            Tuple of (game id -> new document, ids of games whose export is gone)
+        """
+        scoring_changed = self._changed(self.scoring_file)
+        scoring_data = []
+        if os.path.exists(self.scoring_file):
+            try:
+                with open(self.scoring_file, "r", encoding="utf-8") as f:
+                    scoring_data = json.load(f)
+            except json.JSONDecodeError as e:
+                # the pipeline may be mid-write; pick it up on the next refresh
+                print(f"Skipping {self.scoring_file} for now: {e}")
+                self._mtimes.pop(self.scoring_file, None)
+
+        documents = {}
+        paths = sorted(glob.glob(os.path.join(self.exports_dir, "*.json")))
+        for path in paths:
+            game_id = os.path.splitext(os.path.basename(path))[0]
+            if not self._changed(path) and not scoring_changed:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    export = json.load(f)
+            except json.JSONDecodeError as e:
+                print(f"Skipping {path} for now: {e}")
+                self._mtimes.pop(path, None)
+                continue
+
+            away_team, home_team = extract_team_names(os.path.basename(path))
+            documents[game_id] = build_document(game_id, export, find_matching_game(away_team, home_team, scoring_data))
+
+        present = {os.path.splitext(os.path.basename(path))[0] for path in paths}
+        removed = [game_id for game_id in self.feeds if game_id not in present]
+        for game_id in removed:
+            self._mtimes.pop(os.path.join(self.exports_dir, game_id + ".json"), None)
+        return documents, removed
+
+    def publish(self, documents: Dict[str, Dict[str, Any]], removed: Sequence[str] = ()) -> int:
+        """
+        Apply load_changes' results to the feeds (on the event loop's thread).
+
+        Returns:
+            Number of games that got a new version
+        """
+        for game_id in removed:
+            feed = self.feeds.pop(game_id, None)
+            if feed:
+                feed.close()
+        updated = 0
+        for game_id, document in documents.items():
+            if game_id not in self.feeds:
+                self.feeds[game_id] = GameFeed(game_id, document)
+                updated += 1
+            elif self.feeds[game_id].update(document):
+                updated += 1
+        return updated
+
+    def refresh(self) -> int:
+        """
+        Rebuild the documents of games whose export or scoring plays changed,
+        and drop games whose export was deleted.
+
+        Returns:
+            Number of games that got a new version
+        """
+        return self.publish(*self.load_changes())
+
+    async def watch(self, interval: float):
+        """Refresh every interval seconds until cancelled, reading files off the event loop."""
+        while True:
+            await asyncio.sleep(interval)
+            documents, removed = await asyncio.to_thread(self.load_changes)
+            updated = self.publish(documents, removed)
+            if updated:
+                print(f"Published updates for {updated} game(s)")
+            if removed:
+                print(f"Removed {len(removed)} game(s) whose export was deleted")
+
+
+def _since(request: web.Request) -> Optional[int]:
+    value = request.query.get("since") or request.headers.get("Last-Event-ID")
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def make_app(store: GameStore, poll_interval: Optional[float] = 2.0) -> web.Application:
+    """Build the aiohttp application serving the store's games; poll_interval=None disables file watching."""
+    app = web.Application()
+    app["stats"] = {"snapshots": 0, "not_modified": 0, "streams": 0}
+
+    def feed_for(request: web.Request) -> GameFeed:
+        feed = store.feeds.get(request.match_info["game"])
+        if feed is None:
+            raise web.HTTPNotFound(text=f"Unknown game '{request.match_info['game']}'")
+        return feed
+
+    async def games(request: web.Request) -> web.Response:
+        return web.json_response([
+            {"game": game_id, "away_team": feed.document.get("away_team"), "home_team": feed.document.get("home_team"),
+             "version": feed.version, "etag": feed.etag}
+            for game_id, feed in sorted(store.feeds.items())])
+
+    async def snapshot(request: web.Request) -> web.Response:
+        feed = feed_for(request)
+        headers = {"ETag": feed.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding",
+                   "X-Game-Version": str(feed.version)}
+        if_none_match = request.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or feed.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            app["stats"]["not_modified"] += 1
+            return web.Response(status=304, headers=headers)
+
+        app["stats"]["snapshots"] += 1
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return web.Response(body=feed.snapshot_gzip, content_type="application/json", headers=headers)
+        return web.Response(body=feed.snapshot, content_type="application/json", headers=headers)
+
+    async def events(request: web.Request) -> web.StreamResponse:
+        feed = feed_for(request)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache",
+                                               "X-Accel-Buffering": "no"})
+        await response.prepare(request)
+        app["stats"]["streams"] += 1
+        version = _since(request)
+        try:
+            while not feed.closed:
+                for message_version, message in feed.messages_since(version):
+                    await response.write(f"id: {message_version}\ndata: {message}\n\n".encode("utf-8"))
+                    version = message_version
+                if not await feed.wait(version, KEEPALIVE):
+                    await response.write(b": keep-alive\n\n")
+        except ConnectionResetError:
+            pass
+        return response
+
+    async def websocket(request: web.Request) -> web.WebSocketResponse:
+        feed = feed_for(request)
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+        app["stats"]["streams"] += 1
+
+        async def send_updates(version: Optional[int]):
+            while not ws.closed and not feed.closed:
+                for message_version, message in feed.messages_since(version):
+                    await ws.send_str(message)
+                    version = message_version
+                await feed.wait(version)
+            # the game went away; closing ends the receive loop below
+            await ws.close()
+
+        sender = asyncio.create_task(send_updates(_since(request)))
+        try:
+            # the client only sends pings and the close frame
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            sender.cancel()
+            # collect the sender's outcome so a failure is reported, not left on an unawaited task
+            await asyncio.wait([sender])
+            if not sender.cancelled() and sender.exception() and not isinstance(sender.exception(), ConnectionResetError):
+                print(f"Error streaming {feed.game_id}: {sender.exception()!r}")
+        return ws
+
+    async def start_watching(app: web.Application):
+        app["watcher"] = asyncio.create_task(store.watch(poll_interval))
+
+    async def stop_watching(app: web.Application):
+        app["watcher"].cancel()
+
+    if poll_interval:
+        app.on_startup.append(start_watching)
+        app.on_cleanup.append(stop_watching)
+
+    app.router.add_get("/games", games)
+    app.router.add_get("/games/{game}", snapshot)
+    app.router.add_get("/games/{game}/events", events)
+    app.router.add_get("/games/{game}/ws", websocket)
+    return app
+
+
+def replay_documents(game_id: str, export: Dict[str, Any], scoring_game: Optional[Dict[str, Any]],
+                     step: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    The documents a live game would have gone through, one per step minutes of game time.
+
+    Returns:
+        Documents with the comments and scoring plays up to 0, step, 2*step, ... minutes
+    """
+    times, avgs = export.get("times", []), export.get("avgs", [])
+    plays = (scoring_game or {}).get("scoring_plays", [])
+    end = max(times, default=0.0)
+    documents = []
+    t = 0.0
+    while True:
+        rows = [i for i, x in enumerate(times) if x <= t]
+        partial = {
+            "times": [times[i] for i in rows],
+            "avgs": [avgs[i] for i in rows],
+            "worst15": [c for c in export.get("worst15", []) if c[2] <= t],
+            "best5": [c for c in export.get("best5", []) if c[2] <= t],
+        }
+        scoring = {"scoring_plays": [p for p in plays if parse_game_time(p.get("game_time", "")) <= t]}
+        documents.append(build_document(game_id, partial, scoring))
+        if t >= end:
+            return documents
+        t += step
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))] if samples else 0.0
+
+
+async def load_test(clients: int = 2000, transport: str = "ws", game_file: str = "exports/lsuvolemiss.json",
+                    scoring_file: str = "Data/scoring_plays.json", step: float = 1.0, interval: float = 0.1,
+                    port: int = 8766):
+    """
+    Replay one game into a local server and stream it to many simulated clients.
+
+    Every client subscribes, rebuilds the document from the snapshot and
+    deltas, and checks it against the server's final document. Reports
+    connect time, delivery latency from publish to receipt, bytes per delta
+    versus per snapshot, and the ETag hit rate of a round of conditional
+    snapshot requests.
+    """
+    game_id = os.path.splitext(os.path.basename(game_file))[0]
+    with open(game_file, "r", encoding="utf-8") as f:
+        export = json.load(f)
+    with open(scoring_file, "r", encoding="utf-8") as f:
+        scoring_data = json.load(f)
+    away_team, home_team = extract_team_names(os.path.basename(game_file))
+    documents = replay_documents(game_id, export, find_matching_game(away_team, home_team, scoring_data), step)
+
+    store = GameStore()
+    feed = store.feeds[game_id] = GameFeed(game_id, documents[0])
+    runner = web.AppRunner(make_app(store, poll_interval=None))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port, backlog=4096).start()
+    base_url = f"http://127.0.0.1:{port}/games/{game_id}"
+
+    latencies = []
+    received = {"messages": 0, "bytes": 0}
+    mismatched = 0
+    connected = 0
+    all_connected = asyncio.Event()
+
+    async def client(session: ClientSession) -> Dict[str, Any]:
+        document, version = None, 0
+
+        def handle(text: str):
+            nonlocal document, version
+            message = json.loads(text)
+            received["messages"] += 1
+            received["bytes"] += len(text)
+            if message["type"] == "snapshot":
+                document = message["document"]
+            else:
+                apply_delta(document, message["ops"])
+                latencies.append(time.perf_counter() - feed.published[message["version"]])
+            version = message["version"]
+
+        def connected_once():
+            nonlocal connected
+            connected += 1
+            if connected == clients:
+                all_connected.set()
+
+        if transport == "ws":
+            async with session.ws_connect(f"{base_url}/ws") as ws:
+                connected_once()
+                async for message in ws:
+                    handle(message.data)
+                    if version == len(documents):
+                        break
+        else:
+            async with session.get(f"{base_url}/events") as response:
+                connected_once()
+                data = []
+                async for line in response.content:
+                    line = line.decode("utf-8").rstrip("\n")
+                    if line.startswith("data: "):
+                        data.append(line[6:])
+                    elif not line and data:
+                        handle("\n".join(data))
+                        data = []
+                        if version == len(documents):
+                            break
+        return document
+
+    start = time.perf_counter()
+    async with ClientSession(connector=TCPConnector(limit=0), timeout=ClientTimeout(total=None)) as session:
+        tasks = [asyncio.create_task(client(session)) for _ in range(clients)]
+        await all_connected.wait()
+        connect_time = time.perf_counter() - start
+
+        publish_start = time.perf_counter()
+        delta_bytes = []
+        for document in documents[1:]:
+            await asyncio.sleep(interval)
+            if feed.update(document):
+                delta_bytes.append(len(feed.deltas[-1][1]))
+        for document in await asyncio.gather(*tasks):
+            mismatched += document != feed.document
+        stream_time = time.perf_counter() - publish_start
+
+        # every client re-validates its snapshot: gzip first time, 304 afterwards
+        not_modified = 0
+        async def revalidate():
+            nonlocal not_modified
+            async with session.get(base_url, headers={"Accept-Encoding": "gzip"}) as response:
+                etag = response.headers["ETag"]
+                await response.read()
+            async with session.get(base_url, headers={"If-None-Match": etag}) as response:
+                not_modified += response.status == 304
+        revalidate_start = time.perf_counter()
+        await asyncio.gather(*(revalidate() for _ in range(clients)))
+        revalidate_time = time.perf_counter() - revalidate_start
+
+    await runner.cleanup()
+
+    latencies.sort()
+    print(f"{clients} {transport} clients connected in {connect_time:.2f}s; "
+          f"{len(documents) - 1} updates streamed in {stream_time:.2f}s")
+    print(f"Delivered {received['messages']} messages ({received['bytes'] / 1e6:.1f} MB), "
+          f"{mismatched} clients out of sync at the end")
+    print(f"Delivery latency: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+          f"max {latencies[-1] * 1000 if latencies else 0:.1f} ms")
+    print(f"Average delta {statistics.mean(delta_bytes) if delta_bytes else 0:.0f} bytes vs snapshot "
+          f"{len(feed.snapshot)} bytes ({len(feed.snapshot_gzip)} gzipped)")
+    print(f"Snapshot revalidation: {not_modified}/{clients} answered 304 Not Modified, "
+          f"{2 * clients / revalidate_time:.0f} requests/s")
+
+
+def main():
+    """Run the live server, or load-test it."""
+    parser = argparse.ArgumentParser(description="Serve live game documents to the app over HTTP, SSE and WebSocket")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--exports", default="exports", help="directory of game sentiment exports")
+    parser.add_argument("--scoring-file", default="Data/scoring_plays.json")
+    parser.add_argument("--poll", type=float, default=2.0, help="seconds between checks for changed files")
+    parser.add_argument("--loadtest", type=int, metavar="CLIENTS", default=0,
+                        help="instead of serving, replay a game to CLIENTS simulated clients")
+    parser.add_argument("--transport", choices=("ws", "sse"), default="ws", help="load test transport")
+    parser.add_argument("--game", default="exports/lsuvolemiss.json", help="export replayed by the load test")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between replayed updates")
+    args = parser.parse_args()
+
+    if args.loadtest:
+        asyncio.run(load_test(args.loadtest, args.transport, args.game, args.scoring_file,
+                              interval=args.interval, port=args.port))
+        return
+
+    store = GameStore(args.exports, args.scoring_file)
+    store.refresh()
+    print(f"✅ Serving {len(store.feeds)} games on http://{args.host}:{args.port}/games")
+    web.run_app(make_app(store, args.poll), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Per-game play index for CFBD play-by-play data.
+
+A PlayIndex holds one game's plays as NumPy columns, in game (feed) order:
+
+    wall_clock      float64 epoch seconds (NaN where the feed has no wallClock)
+    period          int64 quarter, 5+ for overtime
+    clock_seconds   int64 seconds left on the game clock
+    home_score      int64 home score after the play
+    away_score      int64 away score after the play
+    play_type_id    int64 CFBD playTypeId
+
+Scoring events come from vectorized diffs of the running score maxima, and
+the wall-clock timeline used to map comment times onto the game clock comes
+from the same columns (see GameTimeline), so extract_scoring_plays.py and
+plotsliding.py share one index per game instead of each walking the drives
+themselves.
+"""
+
+import sys
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+from datetime import datetime
+
+from comment_store import iter_json_array
+
+
+# CFBD playTypeIds that put points on the board
+SCORING_PLAY_TYPES = {
+    20: "Safety",
+    32: "Kickoff Return Touchdown",
+    34: "Punt Return Touchdown",
+    36: "Interception Return Touchdown",
+    37: "Blocked Punt Touchdown",
+    38: "Blocked Field Goal Touchdown",
+    39: "Fumble Return Touchdown",
+    59: "Field Goal Good",
+    67: "Passing Touchdown",
+    68: "Rushing Touchdown",
+}
+
+# CFBD playTypeIds that never put points on the board, though the feed
+# sometimes changes the score on them (the next score filed early, or the
+# last one repeated stale)
+NON_SCORING_PLAY_TYPES = {
+    2: "End Period",
+    8: "Penalty",
+    12: "Kickoff Return (Offense)",
+    21: "Timeout",
+    53: "Kickoff",
+    65: "End of Half",
+    66: "End of Game",
+    79: "End of Regulation",
+}
+
+
+class ScoringEvents(NamedTuple):
+    """Scoring plays of a game; rows index the PlayIndex columns."""
+    rows: np.ndarray
+    home_score: np.ndarray
+    away_score: np.ndarray
+
+
+def parse_wall_clock(wall_clock: Optional[str]) -> float:
+    """ISO wallClock ("2025-09-20T16:08:47+00:00" or "...47.000Z") to epoch seconds, NaN if missing."""
+    if not wall_clock:
+        return np.nan
+    try:
+        return datetime.fromisoformat(wall_clock.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return np.nan
+
+
+def parse_clock(clock: Optional[str]) -> int:
+    """Game clock "MM:SS" to seconds remaining in the period."""
+    try:
+        minutes, seconds = clock.split(":")
+        return int(minutes) * 60 + int(seconds)
+    except (AttributeError, ValueError):
+        return 0
+
+
+class PlayIndex:
+    """
+    Columnar index of one game's plays.
+
+    Args:
+        plays: The game's play dictionaries in game order; kept as `plays`
+               so callers can reach the text fields of selected rows
+    """
+
+    def __init__(self, plays: Sequence[Dict[str, Any]]):
+        self.plays = [play for play in plays if isinstance(play, dict)]
+        n = len(self.plays)
+
+        self.wall_clock = np.fromiter((parse_wall_clock(p.get("wallClock")) for p in self.plays), np.float64, n)
+        self.period = np.fromiter((p.get("period") or 0 for p in self.plays), np.int64, n)
+        self.clock_seconds = np.fromiter((parse_clock(p.get("clock")) for p in self.plays), np.int64, n)
+        self.home_score = np.fromiter((p.get("homeScore") or 0 for p in self.plays), np.int64, n)
+        self.away_score = np.fromiter((p.get("awayScore") or 0 for p in self.plays), np.int64, n)
+        self.play_type_id = np.fromiter((p.get("playTypeId") or -1 for p in self.plays), np.int64, n)
+
+    @classmethod
+    def from_game(cls, game: Dict[str, Any]) -> "PlayIndex":
+        """Index every play of a CFBD game dictionary, drive by drive."""
+        plays = []
+        for drive in game.get("drives") or []:
+            if isinstance(drive, dict) and isinstance(drive.get("plays"), list):
+                plays.extend(drive["plays"])
+        return cls(plays)
+
+    def __len__(self) -> int:
+        return len(self.plays)
+
+    def extend(self, plays: Sequence[Dict[str, Any]]):
+        """Append plays to the end of the index, parsing only the new ones."""
+        added = PlayIndex(plays)
+        self.plays.extend(added.plays)
+        for column in ("wall_clock", "period", "clock_seconds", "home_score", "away_score", "play_type_id"):
+            setattr(self, column, np.concatenate((getattr(self, column), getattr(added, column))))
+
+    def scoring_events(self) -> ScoringEvents:
+        """
+        Find the scoring plays.
+
+        A play scores if its playTypeId is a scoring type, or if it raises
+        either team's running maximum score (CFBD sometimes files a
+        touchdown under a plain "Rush"). Running maxima ignore the stale,
+        lower score the feed repeats on a timeout or penalty right after a
+        touchdown; they restart from the score of every scoring-type play,
+        so a glitched score higher than the game ever reached doesn't stick.
+        Plays in NON_SCORING_PLAY_TYPES never score, though their score
+        changes still move the maxima. An increase right before a
+        scoring-type play is that play's score showing up early, and one
+        right after a scoring-type play that didn't move the score is its
+        score showing up late; both are credited to the scoring play rather
+        than reported as separate scores.
+
+        Returns:
+            ScoringEvents with each scoring play's row and the score after it,
+            taken from the play's own columns
+        """
+        home = np.maximum(self.home_score, 0)
+        away = np.maximum(self.away_score, 0)
+        typed = np.isin(self.play_type_id, list(SCORING_PLAY_TYPES))
+        eligible = ~np.isin(self.play_type_id, list(NON_SCORING_PLAY_TYPES))
+
+        # running maxima per stretch starting at a scoring-type play; offsetting
+        # each stretch above the last lets one accumulate restart at every stretch
+        offset = np.cumsum(typed) * (max(home.max(), away.max()) + 1) if len(self) else home
+        best_home = np.maximum.accumulate(home + offset) - offset if len(self) else home
+        best_away = np.maximum.accumulate(away + offset) - offset if len(self) else away
+        increased = (home > np.concatenate(([0], best_home[:-1]))) | (away > np.concatenate(([0], best_away[:-1])))
+
+        candidates = np.flatnonzero(eligible & (typed | increased))
+        # an increase on the play right before a scoring play belongs to that play
+        followed = np.concatenate((typed[1:], [False]))[candidates]
+        candidates = candidates[typed[candidates] | ~followed]
+
+        cand_typed = typed[candidates]
+        cand_increased = increased[candidates]
+        # a score increase on a non-scoring play right after a scoring play that
+        # didn't move the score belongs to that scoring play
+        waiting = np.concatenate(([False], cand_typed[:-1] & ~cand_increased[:-1]))
+        merged = ~cand_typed & waiting
+
+        rows = candidates[~merged]
+        # the score reported for each event is the one after its last merged increase
+        score_rows = candidates.copy()
+        score_rows[np.flatnonzero(merged) - 1] = candidates[merged]
+        score_rows = score_rows[~merged]
+
+        return ScoringEvents(rows, home[score_rows], away[score_rows])
+
+    def increasing_rows(self, values: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Rows whose value is strictly greater than every earlier one.
+
+        Args:
+            values: Column aligned with the plays (default wall_clock); NaNs are skipped
+
+        Returns:
+            Row indices, ascending, along which values increase strictly
+        """
+        values = self.wall_clock if values is None else np.asarray(values, dtype=np.float64)
+        filled = np.where(np.isnan(values), -np.inf, values)
+        previous = np.maximum.accumulate(np.concatenate(([-np.inf], filled[:-1]))) if len(filled) else filled
+        return np.flatnonzero(np.isfinite(filled) & (filled > previous))
+
+
+class GameTimeline:
+    """
+    Maps between wall-clock time and game time for one game.
+
+    The timeline is the game's plays whose wallClock is later than every
+    earlier play's, as epoch seconds, so comment timestamps (Reddit's
+    created_utc, also epoch seconds) are compared on the same absolute
+    scale whatever timezone the script runs in, and games that run past
+    midnight UTC stay in order. Game time is in elapsed minutes,
+    15 * period - minutes left on the clock.
+
+    Args:
+        index: The game's PlayIndex
+    """
+
+    def __init__(self, index: PlayIndex):
+        rows = index.increasing_rows()
+        self.wall_clock = index.wall_clock[rows]
+        clock = index.clock_seconds[rows]
+        self.game_minutes = 15 * index.period[rows] - (clock // 60 + (clock % 60) / 60)
+
+    def __len__(self) -> int:
+        return len(self.wall_clock)
+
+    def game_time(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Game time of the last play before each timestamp, in one np.searchsorted.
+
+        Timestamps are truncated to whole seconds, the resolution of wallClock.
+        Timestamps before the first play, or at or after the second-to-last
+        one (the end-of-game plays), map to NaN.
+
+        Args:
+            timestamps: Epoch seconds, any shape
+
+        Returns:
+            Game minutes aligned with timestamps
+        """
+        ts = np.floor(np.asarray(timestamps, dtype=np.float64))
+        previous = np.searchsorted(self.wall_clock, ts, side="left") - 1
+        valid = (previous >= 0) & (previous < len(self) - 2)
+        return np.where(valid, self.game_minutes[np.clip(previous, 0, max(len(self) - 1, 0))], np.nan)
+
+    def wall_clock_at(self, game_minutes: np.ndarray) -> np.ndarray:
+        """
+        Epoch time of the first play at or after each game time.
+
+        Game time only runs forward, so the timeline's running maximum is
+        searched (stoppages make it flat, never decreasing).
+
+        Args:
+            game_minutes: Elapsed game minutes, any shape
+
+        Returns:
+            Epoch seconds aligned with game_minutes; NaN past the last play
+        """
+        progress = np.maximum.accumulate(self.game_minutes) if len(self) else self.game_minutes
+        rows = np.searchsorted(progress, np.asarray(game_minutes, dtype=np.float64), side="left")
+        valid = rows < len(self)
+        return np.where(valid, self.wall_clock[np.minimum(rows, max(len(self) - 1, 0))], np.nan)
+
+
+def iter_play_indexes(json_file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the games of a CFBD JSON array, one at a time, with their play index.
+
+    Returns:
+        Iterator of the game dictionaries, each with an added "play_index" entry
+    """
+    for game in iter_json_array(json_file_path):
+        if isinstance(game, dict):
+            game["play_index"] = PlayIndex.from_game(game)
+        yield game
+
+
+def load_play_index(json_file_path: str, game_index: int) -> PlayIndex:
+    """
+    Build the play index of one game, parsing only up to that game.
+
+    Args:
+        json_file_path: CFBD JSON array, e.g. Data/live_scores.json
+        game_index: 0-based position of the game in the file
+
+    Returns:
+        The game's PlayIndex
+    """
+    for i, game in enumerate(iter_json_array(json_file_path)):
+        if i == game_index:
+            return PlayIndex.from_game(game)
+    raise IndexError(f"'{json_file_path}' has no game {game_index}")
+
+
+def main():
+    """Print a summary of every game's play index and check that no non-scoring play is reported as a score."""
+    path = sys.argv[1] if len(sys.argv) > 1 else "Data/live_scores.json"
+    games = bad = 0
+    for i, game in enumerate(iter_play_indexes(path)):
+        index = game["play_index"]
+        events = index.scoring_events()
+        final = f"{events.home_score[-1]}-{events.away_score[-1]}" if len(events.rows) else "0-0"
+        print(f"Game {i}: {len(index)} plays, {len(events.rows)} scoring plays, final {final}, "
+              f"{len(index.increasing_rows())} wall-clock timeline points")
+        games += 1
+        typed = np.isin(index.play_type_id[events.rows], list(SCORING_PLAY_TYPES))
+        non_scoring = np.isin(index.play_type_id[events.rows], list(NON_SCORING_PLAY_TYPES))
+        # a score reported on the play right before the scoring play is one score counted twice
+        doubled = np.zeros_like(typed)
+        doubled[:-1] = ~typed[:-1] & typed[1:] & (np.diff(events.rows) == 1)
+        for row in events.rows[non_scoring | doubled]:
+            play = index.plays[row]
+            print(f"Error: game {i} reports {play.get('playType')} at {play.get('clock')} "
+                  f"(period {play.get('period')}) as a scoring play")
+            bad += 1
+
+    if bad:
+        sys.exit(1)
+    print(f"✅ No non-scoring play types reported as scores in {games} games")
+
+
+if __name__ == "__main__":
+    main()
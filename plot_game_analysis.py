@@ -7,14 +7,22 @@ with scoring plays data to create a visualization showing both total score
 and sentiment averages over game time.
 """
 
+import argparse
 import json
-import sys
 import re
 import os
 import glob
-import matplotlib.pyplot as plt
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
 import numpy as np
-from typing import List, Tuple, Dict, Any, Optional
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.layout_engine import TightLayoutEngine
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from series_index import RangeStats, SeriesIndex
 
 
 def parse_game_time(game_time_str: str) -> float:
@@ -148,90 +156,6 @@ def load_scoring_data(scoring_file: str) -> List[Dict[str, Any]]:
         return []
 
 
-def get_sentiment_min_before_scoring(times: List[float], avgs: List[float], scoring_time: float, window_size: float = 0.5) -> float:
-    """
-    Calculate minimum sentiment in the time window BEFORE a scoring play.
-    
-    Args:
-        times: List of time points for sentiment data
-        avgs: List of sentiment averages corresponding to times
-        scoring_time: The time when the scoring play occurred (gt_score)
-        window_size: Size of the time window to look back (default 0.5 for 30 seconds)
-    
-    Returns:
-        Minimum sentiment in the window before scoring, or 0.5 if no data available
-    """
-    if not times or not avgs or len(times) != len(avgs):
-        return 0.5  # Default neutral sentiment
-    
-    # Window is from (scoring_time - window_size) to scoring_time (exclusive)
-    start_time = max(0, scoring_time - window_size)
-    end_time = scoring_time
-    
-    # Find sentiment values within the time window BEFORE the scoring play
-    window_sentiments = []
-    for i, t in enumerate(times):
-        if start_time <= t < end_time:  # Note: < end_time (before scoring, not including scoring moment)
-            window_sentiments.append(avgs[i])
-    
-    # Return minimum sentiment in window, or 0.5 if no data
-    return min(window_sentiments) if window_sentiments else 0.5
-
-def get_sentiment_max_before_scoring(times: List[float], avgs: List[float], scoring_time: float, window_size: float = 0.5) -> float:
-    """
-    Calculate maximum sentiment in the time window BEFORE a scoring play.
-    
-    Args:
-        times: List of time points for sentiment data
-        avgs: List of sentiment averages corresponding to times
-        scoring_time: The time when the scoring play occurred (gt_score)
-        window_size: Size of the time window to look back (default 0.5 for 30 seconds)
-    
-    Returns:
-        Maximum sentiment in the window before scoring, or 0.5 if no data available
-    """
-    if not times or not avgs or len(times) != len(avgs):
-        return 0.5  # Default neutral sentiment
-    
-    # Window is from (scoring_time - window_size) to scoring_time (exclusive)
-    start_time = max(0, scoring_time - window_size)
-    end_time = scoring_time
-    
-    # Find sentiment values within the time window BEFORE the scoring play
-    window_sentiments = []
-    for i, t in enumerate(times):
-        if start_time <= t < end_time:  # Note: < end_time (before scoring, not including scoring moment)
-            window_sentiments.append(avgs[i])
-    
-    # Return maximum sentiment in window, or 0.5 if no data
-    return max(window_sentiments) if window_sentiments else 0.5
-
-def get_sentiment_avg_before_scoring(times: List[float], avgs: List[float], scoring_time: float, window_size: float = 0.5) -> float:
-    """
-    Calculate average sentiment in the time window BEFORE a scoring play.
-    
-    Args:
-        times: List of time points for sentiment data
-        avgs: List of sentiment averages corresponding to times
-        scoring_time: The time when the scoring play occurred (gt_score)
-        window_size: Size of the time window to look back (default 0.5 for 30 seconds)"""
-    if not times or not avgs or len(times) != len(avgs):
-        return 0.5  # Default neutral sentiment
-    
-    # Window is from (scoring_time - window_size) to scoring_time (exclusive)
-    start_time = max(0, scoring_time - window_size)
-    end_time = scoring_time
-    
-    # Find sentiment values within the time window BEFORE the scoring play
-    window_sentiments = []
-    for i, t in enumerate(times):
-        if start_time <= t < end_time:  # Note: < end_time (before scoring, not including scoring moment)
-            window_sentiments.append(avgs[i])
-    
-    # Return average sentiment in window, or 0.5 if no data
-    return sum(window_sentiments) / len(window_sentiments) if window_sentiments else 0.5
-
-
 def calculate_total_scores_over_time(scoring_plays: List[Dict], sentiment_times: List[float] = None, sentiment_avgs: List[float] = None) -> Tuple[List[float], List[int], List[float], List[float], List[float], List[float]]:
     """
     Calculate total score, predicted score, and sentiment-based prediction over game time.
@@ -254,13 +178,23 @@ def calculate_total_scores_over_time(scoring_plays: List[Dict], sentiment_times:
     # Sort scoring plays by game time
     sorted_plays = sorted(scoring_plays, key=lambda x: parse_game_time(x['game_time']))
     
+    # Min/max/avg sentiment in the 0.5 gt window BEFORE every scoring play, in one batch query
+    play_times = [parse_game_time(play['game_time']) for play in sorted_plays]
+    pre_score = None
+    if sentiment_times is not None and sentiment_avgs is not None:
+        if sentiment_times and sentiment_avgs and len(sentiment_times) == len(sentiment_avgs):
+            pre_score = SeriesIndex(sentiment_times, sentiment_avgs).before(play_times, 0.5)
+        else:
+            neutral = np.full(len(play_times), 0.5)  # Default neutral sentiment
+            pre_score = RangeStats(neutral, neutral, neutral, np.zeros(len(play_times), dtype=np.int64))
+    
     # Start with 0-0 at game start
     game_times.append(0.0)
     total_scores.append(0)
     # No prediction at gt=0 (would be division by zero)
     
-    for play in sorted_plays:
-        gt = parse_game_time(play['game_time'])
+    for i, play in enumerate(sorted_plays):
+        gt = play_times[i]
         total_score = play['home_score'] + play['away_score']
         
         game_times.append(gt)
@@ -273,11 +207,11 @@ def calculate_total_scores_over_time(scoring_plays: List[Dict], sentiment_times:
             predicted_scores.append(predicted_score)
             
             # Calculate sentiment-based prediction if sentiment data is available
-            if sentiment_times is not None and sentiment_avgs is not None:
-                # Get minimum sentiment in the 0.5 gt window BEFORE this scoring play
-                min_sentiment = get_sentiment_min_before_scoring(sentiment_times, sentiment_avgs, gt, 0.5)
-                max_sentiment = get_sentiment_max_before_scoring(sentiment_times, sentiment_avgs, gt, 0.5)
-                avg_sentiment = get_sentiment_avg_before_scoring(sentiment_times, sentiment_avgs, gt, 0.5)
+            if pre_score is not None:
+                # Sentiment in the 0.5 gt window BEFORE this scoring play
+                min_sentiment = float(pre_score.min[i])
+                max_sentiment = float(pre_score.max[i])
+                avg_sentiment = float(pre_score.avg[i])
                 # Sentiment prediction: amplify sentiment impact for visibility
                 # Use minimum sentiment to capture most pessimistic moments (more conservative prediction)
                 # Baseline factor is 1.0 (same as green line), sentiment adjusts from 0.5 to 1.5
@@ -325,6 +259,9 @@ def save_data_points_json(score_times: List[float], total_scores: List[int],
         away_team: Away team name
         home_team: Home team name
         output_dir: Directory to save JSON files
+        
+    Returns:
+        Path of the JSON file written
     """
     # Create aligned data arrays - use scoring times as the base timeline
     data_points = {
@@ -385,6 +322,7 @@ def save_data_points_json(score_times: List[float], total_scores: List[int],
         json.dump(data_points, f, indent=2)
     
     print(f"Data points saved as '{output_path}'")
+    return output_path
 
 
 def apply_plot_styling(fig, axes, is_dark_mode=False):
@@ -463,6 +401,198 @@ def get_line_widths(is_dark_mode=False):
         }
 
 
+class Theme(NamedTuple):
+    """
+    One rendered variant of a plot.
+    
+    Attributes:
+        name: "light" or "dark"; picks colours and line widths
+        dpi: Output resolution
+        width_px: Output width in pixels (e.g. an app asset size); overrides dpi
+    """
+    name: str = "light"
+    dpi: float = 300
+    width_px: Optional[int] = None
+    
+    @property
+    def is_dark(self) -> bool:
+        return self.name == "dark"
+    
+    def filename(self, stem: str) -> str:
+        """PNG name for a plot stem, e.g. DARK_game_analysis_lsu_ole_miss_1080px.png"""
+        prefix = "DARK_" if self.is_dark else "LIGHT_"
+        if self.width_px:
+            suffix = f"_{self.width_px}px"
+        elif self.dpi != 300:
+            suffix = f"_{self.dpi:g}dpi"
+        else:
+            suffix = ""
+        return f"{prefix}{stem}{suffix}.png"
+
+
+DEFAULT_THEMES = (Theme("light"), Theme("dark"))
+# width of the graph images bundled with reactiveNativeApp
+APP_ASSET_WIDTH = 1080
+
+
+def parse_themes(spec: str) -> List[Theme]:
+    """
+    Parse a comma-separated theme list.
+    
+    Each entry is light or dark, optionally followed by @<N>dpi or @<N>px;
+    "app" is shorthand for light and dark at the app asset width.
+    
+    Example:
+        "light,dark,app,dark@150dpi"
+    
+    Returns:
+        List of Theme
+    """
+    themes = []
+    for entry in spec.split(','):
+        entry = entry.strip().lower()
+        if not entry:
+            continue
+        if entry == "app":
+            themes.extend([Theme("light", width_px=APP_ASSET_WIDTH), Theme("dark", width_px=APP_ASSET_WIDTH)])
+            continue
+        name, _, size = entry.partition('@')
+        if name not in ("light", "dark"):
+            raise ValueError(f"Unknown theme '{name}' (expected light, dark or app)")
+        if not size:
+            themes.append(Theme(name))
+        elif size.endswith("px"):
+            themes.append(Theme(name, width_px=int(size[:-2])))
+        elif size.endswith("dpi"):
+            themes.append(Theme(name, dpi=float(size[:-3])))
+        else:
+            raise ValueError(f"Bad size '{size}' in theme '{entry}' (expected e.g. 150dpi or 1080px)")
+    return themes
+
+
+def save_themed(fig: Figure, axes, themes: Sequence[Theme], output_dir: str, stem: str,
+                restyle: Optional[Callable[[bool], None]] = None, label: str = "Plot") -> List[str]:
+    """
+    Save one laid-out figure in every theme.
+    
+    The figure is built and laid out once by the caller; each theme only
+    recolours it (restyle, then apply_plot_styling) and rasterizes it. The
+    tight bounding box is computed once at 300 dpi and reused, so variants
+    skip the extra layout pass bbox_inches='tight' costs on every save.
+    Themes change colours and line widths only, never the saved area.
+    
+    Args:
+        fig: Figure with its data, labels and layout in place
+        axes: Axes passed to apply_plot_styling
+        themes: Variants to write
+        output_dir: Directory to save into
+        stem: File name stem, see Theme.filename
+        restyle: Called with is_dark before each save for plot-specific artists
+        label: Used in the progress message
+        
+    Returns:
+        Paths of the plots written
+    """
+    written = []
+    saved_area = None
+    for theme in themes:
+        if restyle:
+            restyle(theme.is_dark)
+        apply_plot_styling(fig, axes, theme.is_dark)
+        
+        if saved_area is None:
+            FigureCanvasAgg(fig)
+            fig.set_dpi(300)
+            fig.draw_without_rendering()
+            saved_area = fig.get_tightbbox(fig.canvas.get_renderer()).padded(matplotlib.rcParams['savefig.pad_inches'])
+        
+        dpi = theme.width_px / saved_area.width if theme.width_px else theme.dpi
+        path = os.path.join(output_dir, theme.filename(stem))
+        fig.savefig(path, dpi=dpi, bbox_inches=saved_area, facecolor=fig.get_facecolor())
+        print(f"{label} saved as '{path}'")
+        written.append(path)
+    return written
+
+
+def create_sentiment_envelope(times: np.ndarray, sentiment: np.ndarray, time_resolution: float = 0.1,
+                              points_per_segment: int = 20, floor_window: float = 0.15) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Smooth upper envelope of a sentiment series, fully vectorized.
+    
+    1. Times are rounded to time_resolution bins and each bin keeps its
+       maximum sentiment (np.maximum.reduceat over the sorted bins).
+    2. Consecutive bin maxima are joined with cosine interpolation, all
+       segments in one broadcast.
+    3. The curve is raised to the maximum original value within
+       floor_window of each point, so it never dips below the data.
+    
+    Args:
+        times: Game times of the sentiment points (any order)
+        sentiment: Sentiment values aligned with times
+        time_resolution: Bin width in minutes (0.1 = 6 seconds)
+        points_per_segment: Interpolated points between consecutive bins
+        floor_window: Half-width in minutes of the never-below-the-data check (0.15 = 9 seconds)
+        
+    Returns:
+        Tuple of (smooth_times, smooth_sentiment); the input itself when it spans fewer than two bins
+    """
+    # 1. maximum sentiment per time bin
+    rounded_times = np.round(times / time_resolution) * time_resolution
+    order = np.argsort(rounded_times, kind="stable")
+    sorted_bins = rounded_times[order]
+    bin_starts = np.flatnonzero(np.concatenate(([True], sorted_bins[1:] != sorted_bins[:-1])))
+    envelope_times = sorted_bins[bin_starts]
+    envelope_values = np.maximum.reduceat(sentiment[order], bin_starts)
+    
+    if len(envelope_times) < 2:
+        # Not enough envelope points, use original data
+        return times, sentiment
+    
+    # 2. cosine interpolation between consecutive bins (each segment excludes its end point)
+    start_time, end_time = envelope_times[:-1, None], envelope_times[1:, None]
+    start_value, end_value = envelope_values[:-1, None], envelope_values[1:, None]
+    segment_times = np.arange(points_per_segment) * ((end_time - start_time) / points_per_segment) + start_time
+    smooth_t = 0.5 * (1 - np.cos(np.pi * ((segment_times - start_time) / (end_time - start_time))))
+    segment_values = start_value + (end_value - start_value) * smooth_t
+    
+    smooth_times = np.append(segment_times.ravel(), envelope_times[-1])
+    smooth_sentiment = np.append(segment_values.ravel(), envelope_values[-1])
+    
+    # 3. never below the original data: windowed max of the points with |time - t| <= floor_window
+    index = SeriesIndex(times, sentiment)
+    lo, hi = rows_within(index.times, smooth_times, floor_window)
+    nearby = index.row_stats(lo, hi, default=-np.inf)
+    return smooth_times, np.maximum(smooth_sentiment, nearby.max)
+
+
+def rows_within(sorted_times: np.ndarray, centers: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row range lo:hi of sorted_times with abs(time - center) <= radius, for every center.
+    
+    Matches the float comparison exactly (game times sit on a 1/60 minute grid,
+    so points often land right on the window edge): searchsorted gives the
+    range up to rounding, then whole runs of equal times are moved in or out
+    of it until the edges satisfy the comparison.
+    
+    Returns:
+        Tuple of (lo, hi) row arrays aligned with centers
+    """
+    n = len(sorted_times)
+    lo = np.searchsorted(sorted_times, centers - radius, side="left")
+    hi = np.searchsorted(sorted_times, centers + radius, side="right")
+    while True:
+        drop_lo = (lo < n) & (np.abs(sorted_times[np.minimum(lo, n - 1)] - centers) > radius) & (lo < hi)
+        add_lo = (lo > 0) & (np.abs(sorted_times[np.maximum(lo - 1, 0)] - centers) <= radius)
+        drop_hi = (hi > 0) & (np.abs(sorted_times[np.maximum(hi - 1, 0)] - centers) > radius) & (hi > lo)
+        add_hi = (hi < n) & (np.abs(sorted_times[np.minimum(hi, n - 1)] - centers) <= radius)
+        if not (drop_lo.any() or add_lo.any() or drop_hi.any() or add_hi.any()):
+            return lo, hi
+        lo = np.where(drop_lo, np.searchsorted(sorted_times, sorted_times[np.minimum(lo, n - 1)], side="right"), lo)
+        lo = np.where(add_lo & ~drop_lo, np.searchsorted(sorted_times, sorted_times[np.maximum(lo - 1, 0)], side="left"), lo)
+        hi = np.where(drop_hi, np.searchsorted(sorted_times, sorted_times[np.maximum(hi - 1, 0)], side="left"), hi)
+        hi = np.where(add_hi & ~drop_hi, np.searchsorted(sorted_times, sorted_times[np.minimum(hi, n - 1)], side="right"), hi)
+
+
 def create_sentiment_plot_data(times: List[float], avgs: List[float]):
     """
     Prepare sentiment data for plotting.
@@ -490,89 +620,17 @@ def create_sentiment_plot_data(times: List[float], avgs: List[float]):
         return None, None, None, None
     
     # Create and plot smoothed sentiment if we have enough points
+    smooth_times, smooth_sentiment = filtered_times, filtered_sentiment
     if len(filtered_times) > 3:
-        # Work with original discrete time points to find exact maxima
-        def create_exact_envelope(times_orig, sentiment_orig, time_window=0.5):
-            """Create envelope using exact maximum sentiment at each discrete time point."""
-            # Round times to create discrete bins
-            time_resolution = 0.1  # 0.1 minute (6 second) resolution
-            rounded_times = np.round(times_orig / time_resolution) * time_resolution
-            
-            # Find unique time points
-            unique_times = np.unique(rounded_times)
-            envelope_times = []
-            envelope_values = []
-            
-            for target_time in unique_times:
-                # Find all sentiment values within this time bin
-                time_mask = np.abs(rounded_times - target_time) < time_resolution/2
-                if np.any(time_mask):
-                    # Get maximum sentiment at this time point
-                    max_sentiment = np.max(sentiment_orig[time_mask])
-                    envelope_times.append(target_time)
-                    envelope_values.append(max_sentiment)
-            
-            return np.array(envelope_times), np.array(envelope_values)
-        
-        # Get exact envelope points
-        envelope_times, envelope_values = create_exact_envelope(filtered_times, filtered_sentiment)
-        
-        if len(envelope_times) > 1:
-            # Create piecewise interpolation between successive time indices
-            def create_piecewise_envelope(env_times, env_values, points_per_segment=20):
-                """Create piecewise smooth curves between consecutive time points."""
-                all_times = []
-                all_values = []
-                
-                # For each pair of consecutive envelope points, create smooth interpolation
-                for i in range(len(env_times) - 1):
-                    start_time = env_times[i]
-                    end_time = env_times[i + 1]
-                    start_value = env_values[i] 
-                    end_value = env_values[i + 1]
-                    
-                    # Create time points for this segment (excluding the end point to avoid duplication)
-                    segment_times = np.linspace(start_time, end_time, points_per_segment, endpoint=False)
-                    
-                    # Simple smooth interpolation between the two points
-                    # Use cosine interpolation for smoothness
-                    t_normalized = (segment_times - start_time) / (end_time - start_time)
-                    # Cosine interpolation creates smooth S-curve
-                    smooth_t = 0.5 * (1 - np.cos(np.pi * t_normalized))
-                    segment_values = start_value + (end_value - start_value) * smooth_t
-                    
-                    all_times.extend(segment_times)
-                    all_values.extend(segment_values)
-                
-                # Add the final point
-                all_times.append(env_times[-1])
-                all_values.append(env_values[-1])
-                
-                return np.array(all_times), np.array(all_values)
-            
-            # Create piecewise smooth envelope
-            smooth_times, smooth_sentiment = create_piecewise_envelope(envelope_times, envelope_values)
-            
-            # Ensure the interpolated curve never goes below any original data point
-            # by checking against the original data at each interpolated time
-            for i, t in enumerate(smooth_times):
-                # Find original sentiment values near this time
-                nearby_mask = np.abs(filtered_times - t) <= 0.15  # Within 9 seconds
-                if np.any(nearby_mask):
-                    max_nearby = np.max(filtered_sentiment[nearby_mask])
-                    smooth_sentiment[i] = max(smooth_sentiment[i], max_nearby)
-                    
-        else:
-            # Not enough envelope points, use original data
-            smooth_times = filtered_times
-            smooth_sentiment = filtered_sentiment
-        
+        smooth_times, smooth_sentiment = create_sentiment_envelope(filtered_times, filtered_sentiment)
+    
     return filtered_times, filtered_sentiment, smooth_times, smooth_sentiment
 
 
-def plot_sentiment_analysis(times: List[float], avgs: List[float], away_team: str, home_team: str, output_dir: str = "outputGraphs"):
+def plot_sentiment_analysis(times: List[float], avgs: List[float], away_team: str, home_team: str, output_dir: str = "outputGraphs",
+                            themes: Sequence[Theme] = DEFAULT_THEMES) -> List[str]:
     """
-    Create sentiment analysis plots in both light and dark modes.
+    Create sentiment analysis plots, one per theme (light and dark by default).
     
     Args:
         times: List of time points for sentiment data
@@ -580,80 +638,79 @@ def plot_sentiment_analysis(times: List[float], avgs: List[float], away_team: st
         away_team: Away team name
         home_team: Home team name
         output_dir: Directory to save output plots
+        themes: Variants to render from the single layout
+        
+    Returns:
+        Paths of the plots written
     """
+    written = []
     if not times or not avgs:
         print("No sentiment data available for sentiment plot")
-        return
+        return written
     
     # Get processed sentiment data
     filtered_times, filtered_sentiment, smooth_times, smooth_sentiment = create_sentiment_plot_data(times, avgs)
     
     if filtered_times is None:
         print("No sentiment data in game time range (0-60 minutes)")
-        return
+        return written
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Generate both light and dark mode plots
-    for is_dark_mode in [False, True]:
-        mode_prefix = "DARK_" if is_dark_mode else "LIGHT_"
-        
-        # Create the sentiment plot
-        fig, ax = plt.subplots(1, 1, figsize=(12, 6))
-        
-        # Get appropriate line widths
-        line_widths = get_line_widths(is_dark_mode)
-        
-        # Fill area under the smoothed sentiment curve
+    # Build and lay out the sentiment plot once (a standalone Figure, no pyplot state)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots(1, 1)
+    
+    # Fill area under the smoothed sentiment curve
+    fill = ax.fill_between(smooth_times, 0, smooth_sentiment, label='Sentiment')
+    
+    # Set labels and formatting
+    ax.set_xlabel('Game Time (minutes)', fontsize=12)
+    ax.set_ylabel('Sentiment (0 = Negative, 1 = Positive)', fontsize=12)
+    ax.set_ylim(0, 1)
+    ax.set_xlim(0, 65)
+    
+    # Add quarter markers
+    quarter_times = [0, 15, 30, 45, 60]
+    quarter_labels = ['Start', 'Q2', 'Q3', 'Q4', 'End']
+    quarter_lines = []
+    for qt, ql in zip(quarter_times, quarter_labels):
+        quarter_lines.append(ax.axvline(x=qt, linestyle='--'))
+        ax.text(qt, 0.95, ql, rotation=90, 
+                verticalalignment='top', fontsize=10, alpha=0.9)
+    
+    # Add horizontal reference lines
+    neutral_line = ax.axhline(y=0.5, linestyle='-', alpha=0.4, linewidth=1)
+    ax.text(2, 0.52, 'Neutral', fontsize=10, alpha=0.9)
+    
+    # Add title
+    ax.set_title(f'{away_team} @ {home_team}\nSentiment Over Game Time', 
+                fontsize=14, fontweight='bold', pad=20)
+    
+    def restyle(is_dark_mode):
         color_fill = '#4a9eff' if is_dark_mode else 'tab:blue'
-        fill_alpha = 0.5 if is_dark_mode else 0.4
-        edge_width = line_widths['secondary_line']
-        
-        ax.fill_between(smooth_times, 0, smooth_sentiment, color=color_fill, alpha=fill_alpha, 
-                       label='Sentiment', edgecolor=color_fill, linewidth=edge_width)
+        fill.set_color(color_fill)
+        fill.set_alpha(0.5 if is_dark_mode else 0.4)
+        fill.set_linewidth(get_line_widths(is_dark_mode)['secondary_line'])
         
-        # Set labels and formatting
-        ax.set_xlabel('Game Time (minutes)', fontsize=12)
-        ax.set_ylabel('Sentiment (0 = Negative, 1 = Positive)', fontsize=12)
-        ax.set_ylim(0, 1)
-        ax.set_xlim(0, 65)
-        
-        # Add quarter markers
-        quarter_times = [0, 15, 30, 45, 60]
-        quarter_labels = ['Start', 'Q2', 'Q3', 'Q4', 'End']
         marker_color = '#cccccc' if is_dark_mode else 'gray'
-        marker_alpha = 0.6 if is_dark_mode else 0.5
-        text_color = '#ffffff' if is_dark_mode else '#000000'
-        
-        for qt, ql in zip(quarter_times, quarter_labels):
-            ax.axvline(x=qt, color=marker_color, linestyle='--', alpha=marker_alpha)
-            ax.text(qt, 0.95, ql, rotation=90, 
-                    verticalalignment='top', fontsize=10, alpha=0.9, color=text_color)
-        
-        # Add horizontal reference lines
-        ax.axhline(y=0.5, color=marker_color, linestyle='-', alpha=0.4, linewidth=1)
-        ax.text(2, 0.52, 'Neutral', fontsize=10, alpha=0.9, color=text_color)
+        for line in quarter_lines:
+            line.set_color(marker_color)
+            line.set_alpha(0.6 if is_dark_mode else 0.5)
+        neutral_line.set_color(marker_color)
         
-        # Add title and legend
-        ax.set_title(f'{away_team} @ {home_team}\nSentiment Over Game Time', 
-                    fontsize=14, fontweight='bold', pad=20)
+        # the legend copies the fill's colours, so rebuild it for each theme
         ax.legend(loc='upper right')
-        
-        # Apply styling
-        apply_plot_styling(fig, ax, is_dark_mode)
-        
-        # Save the sentiment plot
-        sentiment_filename = f"{mode_prefix}sentiment_analysis_{away_team.lower().replace(' ', '_')}_{home_team.lower().replace(' ', '_')}.png"
-        sentiment_path = os.path.join(output_dir, sentiment_filename)
-        plt.savefig(sentiment_path, dpi=300, bbox_inches='tight', facecolor=fig.get_facecolor())
-        print(f"Sentiment plot saved as '{sentiment_path}'")
-        
-        # Close the plot to free memory
-        plt.close()
+    
+    stem = f"sentiment_analysis_{away_team.lower().replace(' ', '_')}_{home_team.lower().replace(' ', '_')}"
+    written.extend(save_themed(fig, ax, themes, output_dir, stem, restyle, label="Sentiment plot"))
+    
+    return written
 
 
-def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays.json", output_dir: str = "outputGraphs"):
+def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays.json", output_dir: str = "outputGraphs",
+                       themes: Sequence[Theme] = DEFAULT_THEMES) -> List[str]:
     """
     Create a plot combining total score and sentiment data over game time.
     
@@ -661,14 +718,20 @@ def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays
         export_file: Path to export JSON file
         scoring_file: Path to scoring_plays.json
         output_dir: Directory to save output plots
+        themes: Variants to render; each plot is built once and saved in all of them
+        
+    Returns:
+        Paths of the files written (empty if the game could not be plotted)
     """
+    written = []
+    
     # Load data
     export_data = load_export_data(export_file)
     scoring_data = load_scoring_data(scoring_file)
     
     if not export_data or not scoring_data:
         print("Error: Could not load required data files")
-        return
+        return written
     
     # Extract team names and find matching game
     filename = export_file.split('/')[-1].split('\\')[-1]  # Handle both / and \ path separators
@@ -676,12 +739,12 @@ def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays
     
     if away_team == "Unknown" or home_team == "Unknown":
         print(f"Error: Could not parse team names from filename '{filename}'")
-        return
+        return written
     
     game = find_matching_game(away_team, home_team, scoring_data)
     if not game:
         print(f"Error: Could not find matching game for {away_team} vs {home_team}")
-        return
+        return written
     
     print(f"Found matching game: {away_team} @ {home_team}")
     
@@ -691,7 +754,7 @@ def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays
     
     if len(times) != len(avgs):
         print("Error: Mismatched lengths of times and avgs arrays")
-        return
+        return written
     
     # Calculate total scores and predictions over time
     score_times, total_scores, prediction_times, predicted_scores, sentiment_prediction_times, sentiment_predicted_scores = calculate_total_scores_over_time(game['scoring_plays'], times, avgs)
@@ -699,8 +762,9 @@ def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays
     # Get final score for error calculations
     final_score = total_scores[-1] if total_scores else 0
     
-    # Create two subplots: main game analysis and prediction errors
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    # Create two subplots: main game analysis and prediction errors (a standalone Figure, no pyplot state)
+    fig = Figure(figsize=(12, 10))
+    ax1, ax2 = fig.subplots(2, 1)
     
     # === FIRST PLOT: Main Game Analysis ===
     # Plot total score on primary y-axis as step function
@@ -775,132 +839,218 @@ def plot_game_analysis(export_file: str, scoring_file: str = "Data/scoring_plays
                  fontsize=12, pad=10)
     ax2.legend(loc='upper right')
     
-    # Tight layout for both plots
-    plt.tight_layout()
+    # Tight layout for both plots, applied once; unlike fig.tight_layout() this leaves
+    # no layout engine on the figure, so saves don't redo the layout for every theme
+    TightLayoutEngine().execute(fig)
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # Save data points as JSON (only once)
-    save_data_points_json(score_times, total_scores, prediction_times, predicted_scores,
-                         sentiment_prediction_times, sentiment_predicted_scores,
-                         final_score, away_team, home_team, output_dir)
-    
-    # Generate both light and dark mode plots
-    for is_dark_mode in [False, True]:
-        mode_prefix = "DARK_" if is_dark_mode else "LIGHT_"
-        
-        # Get appropriate line widths
-        line_widths = get_line_widths(is_dark_mode)
-        
-        # Update line widths for dark mode
-        if is_dark_mode:
-            # Make lines thicker and more visible for dark mode
-            for line in ax1.get_lines():
-                current_width = line.get_linewidth()
-                line.set_linewidth(current_width * 1.2)  # 20% thicker
-                
-            for line in ax2.get_lines():
-                current_width = line.get_linewidth()
-                line.set_linewidth(current_width * 1.2)  # 20% thicker
-        
-        # Apply styling
-        apply_plot_styling(fig, [ax1, ax2], is_dark_mode)
-        
-        # Save the plot
-        output_filename = f"{mode_prefix}game_analysis_{away_team.lower().replace(' ', '_')}_{home_team.lower().replace(' ', '_')}.png"
-        output_path = os.path.join(output_dir, output_filename)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor=fig.get_facecolor())
-        print(f"Plot saved as '{output_path}'")
-        
-        # Reset line widths for next iteration
-        if is_dark_mode:
-            for line in ax1.get_lines():
-                current_width = line.get_linewidth()
-                line.set_linewidth(current_width / 1.2)  # Reset to original
-                
-            for line in ax2.get_lines():
-                current_width = line.get_linewidth()
-                line.set_linewidth(current_width / 1.2)  # Reset to original
+    written.append(save_data_points_json(score_times, total_scores, prediction_times, predicted_scores,
+                                         sentiment_prediction_times, sentiment_predicted_scores,
+                                         final_score, away_team, home_team, output_dir))
     
-    # Generate separate sentiment analysis plot (both modes)
-    plot_sentiment_analysis(times, avgs, away_team, home_team, output_dir)
+    # Dark mode draws every line 20% thicker for visibility
+    lines = ax1.get_lines() + ax2.get_lines()
+    base_widths = [line.get_linewidth() for line in lines]
     
-    # Close the plot to free memory
-    plt.close()
+    def restyle(is_dark_mode):
+        scale = 1.2 if is_dark_mode else 1.0
+        for line, width in zip(lines, base_widths):
+            line.set_linewidth(width * scale)
+    
+    stem = f"game_analysis_{away_team.lower().replace(' ', '_')}_{home_team.lower().replace(' ', '_')}"
+    written.extend(save_themed(fig, [ax1, ax2], themes, output_dir, stem, restyle))
+    
+    # Generate separate sentiment analysis plot (every theme)
+    written.extend(plot_sentiment_analysis(times, avgs, away_team, home_team, output_dir, themes))
+    
+    return written
+
+
+RENDER_MANIFEST = ".render_manifest.json"
+# problematic exports left out of batch runs
+SKIP_FILES = ["fsuvsvirginia.json", "syracusevsclemson.json"]
+
+
+def render_inputs_hash(export_file: str, scoring_data: List[Dict[str, Any]], themes: Sequence[Theme] = DEFAULT_THEMES) -> str:
+    """
+    Content hash of everything a game's plots depend on.
+    
+    Covers the export file, the game's entry in the scoring data, the themes
+    and the source of this script, so a game is re-rendered when any of them change.
+    
+    Args:
+        export_file: Path to export JSON file
+        scoring_data: List of games from scoring_plays.json
+        themes: Variants being rendered
+        
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(export_file, 'rb') as f:
+        digest.update(f.read())
+    away_team, home_team = extract_team_names(os.path.basename(export_file))
+    game = find_matching_game(away_team, home_team, scoring_data)
+    digest.update(json.dumps(game, sort_keys=True).encode('utf-8'))
+    digest.update(repr(list(themes)).encode('utf-8'))
+    with open(os.path.abspath(__file__), 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _init_render_worker():
+    """Pool initializer: render off-screen with Agg."""
+    matplotlib.use("Agg")
+
+
+def render_game(export_file: str, scoring_file: str, output_dir: str, themes: Sequence[Theme] = DEFAULT_THEMES) -> Dict[str, Any]:
+    """
+    Render one game's plots; run in a worker process by render_all.
+    
+    Returns:
+        Dictionary with the export file, elapsed seconds, written outputs and any error
+    """
+    start = time.perf_counter()
+    try:
+        outputs = plot_game_analysis(export_file, scoring_file, output_dir, themes)
+        error = None if outputs else "nothing rendered"
+    except Exception as e:
+        outputs, error = [], str(e)
+    return {"file": export_file, "elapsed": time.perf_counter() - start, "outputs": outputs, "error": error}
+
+
+def render_all(export_files: List[str], scoring_file: str = "Data/scoring_plays.json", output_dir: str = "outputGraphs",
+               jobs: Optional[int] = None, force: bool = False, themes: Sequence[Theme] = DEFAULT_THEMES) -> List[Dict[str, Any]]:
+    """
+    Render many games in parallel, skipping those whose inputs are unchanged.
+    
+    Each game is rendered in its own worker process with the Agg backend.
+    A manifest in output_dir records the input hash and outputs of every
+    rendered game; a game is skipped when its hash matches and all of its
+    outputs still exist.
+    
+    Args:
+        export_files: Export JSON files to render
+        scoring_file: Path to scoring_plays.json
+        output_dir: Directory to save output plots
+        jobs: Worker processes (default: CPU count)
+        force: Re-render every game regardless of the manifest
+        themes: Variants to render for every game
+        
+    Returns:
+        One result dictionary per game (see render_game), with a "status" of
+        "rendered", "skipped" or "error"
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, RENDER_MANIFEST)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    
+    scoring_data = load_scoring_data(scoring_file)
+    results = []
+    todo = {}
+    for export_file in export_files:
+        key = os.path.basename(export_file)
+        digest = render_inputs_hash(export_file, scoring_data, themes)
+        entry = manifest.get(key, {})
+        if not force and entry.get("hash") == digest and all(os.path.exists(p) for p in entry.get("outputs", [])):
+            results.append({"file": export_file, "elapsed": 0.0, "outputs": entry["outputs"], "error": None, "status": "skipped"})
+        else:
+            todo[export_file] = digest
+    
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), initializer=_init_render_worker) as pool:
+            futures = [pool.submit(render_game, export_file, scoring_file, output_dir, themes) for export_file in todo]
+            for future in as_completed(futures):
+                result = future.result()
+                result["status"] = "error" if result["error"] else "rendered"
+                if not result["error"]:
+                    manifest[os.path.basename(result["file"])] = {"hash": todo[result["file"]], "outputs": result["outputs"]}
+                results.append(result)
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    return results
+
+
+def print_timing_report(results: List[Dict[str, Any]], wall_time: float):
+    """
+    Print a per-game timing table for a batch run.
+    
+    Args:
+        results: Results from render_all
+        wall_time: Elapsed seconds for the whole batch
+    """
+    print("\n=== Render report ===")
+    print(f"{'game':<32} {'status':<9} {'seconds':>8} {'files':>6}")
+    for result in sorted(results, key=lambda r: -r["elapsed"]):
+        print(f"{os.path.basename(result['file']):<32} {result['status']:<9} {result['elapsed']:>8.2f} {len(result['outputs']):>6}")
+        if result["error"]:
+            print(f"    Error: {result['error']}")
+    
+    render_time = sum(r["elapsed"] for r in results)
+    counts = {status: sum(r["status"] == status for r in results) for status in ("rendered", "skipped", "error")}
+    print(f"\nRendered: {counts['rendered']}, skipped (unchanged): {counts['skipped']}, errors: {counts['error']}")
+    print(f"Wall time {wall_time:.2f}s for {render_time:.2f}s of rendering"
+          + (f" ({render_time / wall_time:.1f}x parallel speedup)" if wall_time > 0 and render_time > 0 else ""))
 
 
 def main():
     """Main function to run the game analysis plotting."""
-    # Check if user provided specific file or wants to process all files
-    if len(sys.argv) == 2:
+    parser = argparse.ArgumentParser(
+        description="Plot total score, predictions and sentiment for games in exports/",
+        epilog="Examples:\n"
+               "  python plot_game_analysis.py                                 # Process all files\n"
+               "  python plot_game_analysis.py exports/cincinativskansas.json  # Single file",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("export_file", nargs="?", help="single export JSON file (default: every file in exports/)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for batch mode (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render games even if their inputs are unchanged")
+    parser.add_argument("--scoring-file", default="Data/scoring_plays.json", help="scoring plays JSON")
+    parser.add_argument("--output-dir", default="outputGraphs", help="where plots are saved")
+    parser.add_argument("--themes", default="light,dark",
+                        help="comma-separated variants: light, dark, app, or light/dark@<N>dpi / @<N>px")
+    args = parser.parse_args()
+    try:
+        themes = parse_themes(args.themes)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.export_file:
         # Single file mode
-        export_file = sys.argv[1]
-        print(f"Creating game analysis plot for: {export_file}")
-        plot_game_analysis(export_file)
-    elif len(sys.argv) == 1:
-        # Process all files in exports folder
-        exports_pattern = "exports/*.json"
-        all_export_files = glob.glob(exports_pattern)
-        
-        # Skip problematic files
-        skip_files = ["exports/fsuvsvirginia.json", "exports\\fsuvsvirginia.json", 
-                     "exports/syracusevsclemson.json", "exports\\syracusevsclemson.json"]
-        
-        export_files = [f for f in all_export_files if f not in skip_files]
-        
-        if not export_files:
-            print(f"No valid JSON files found in exports folder")
-            return
-        
-        skipped_count = len(all_export_files) - len(export_files)
-        if skipped_count > 0:
-            print(f"Skipping {skipped_count} problematic file(s): fsuvsvirginia.json, syracusevsclemson.json")
-        
-        print(f"Found {len(export_files)} valid export files to process:")
-        for file in export_files:
-            print(f"  - {file}")
-        
-        print("\nProcessing valid export files...")
-        
-        success_count = 0
-        error_count = 0
-        
-        for export_file in export_files:
-            try:
-                print(f"\nProcessing: {export_file}")
-                plot_game_analysis(export_file)
-                success_count += 1
-            except Exception as e:
-                print(f"Error processing {export_file}: {e}")
-                error_count += 1
-        
-        print(f"\n=== Summary ===")
-        print(f"Successfully processed: {success_count} files")
-        print(f"Errors: {error_count} files")
-        print(f"All plots saved in 'outputGraphs' folder")
+        print(f"Creating game analysis plot for: {args.export_file}")
+        plot_game_analysis(args.export_file, args.scoring_file, args.output_dir, themes)
+        return
     
-    else:
-        print("Usage: python plot_game_analysis.py [export_json_file]")
-        print("\nOptions:")
-        print("  No arguments: Process all files in exports/ folder")
-        print("  Single file: Process specific export JSON file")
-        print("\nExamples:")
-        print("  python plot_game_analysis.py                              # Process all files")
-        print("  python plot_game_analysis.py exports/cincinativskansas.json  # Single file")
-        print("\nAvailable export files:")
-        print("  - cincinativskansas.json (Cincinnati @ Kansas)")
-        print("  - dukevsyracuse.json (Duke @ Syracuse)")
-        print("  - fsuvsvirginia.json (Florida State @ Virginia)")
-        print("  - louisvillevspittsburgh.json (Louisville @ Pittsburgh)")
-        print("  - lsuvolemiss.json (LSU @ Ole Miss)")
-        print("  - notredamevsarkansas.json (Notre Dame @ Arkansas)")
-        print("  - syracusevsclemson.json (Syracuse @ Clemson)")
-        print("  - uclavsnorthwestern.json (UCLA @ Northwestern)")
-        print("  - uscvillinois.json (USC @ Illinois)")
-        print("  - utahvsvandy.json (Utah State @ Vanderbilt)")
+    # Process all files in exports folder
+    all_export_files = sorted(glob.glob(os.path.join("exports", "*.json")))
+    export_files = [f for f in all_export_files if os.path.basename(f) not in SKIP_FILES]
+    
+    if not export_files:
+        print("No valid JSON files found in exports folder")
         return
+    
+    skipped_count = len(all_export_files) - len(export_files)
+    if skipped_count > 0:
+        print(f"Skipping {skipped_count} problematic file(s): {', '.join(SKIP_FILES)}")
+    
+    print(f"Found {len(export_files)} valid export files to process:")
+    for file in export_files:
+        print(f"  - {file}")
+    
+    print("\nProcessing valid export files...")
+    start = time.perf_counter()
+    results = render_all(export_files, args.scoring_file, args.output_dir, args.jobs, args.force, themes)
+    print_timing_report(results, time.perf_counter() - start)
+    print(f"All plots saved in '{args.output_dir}' folder")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
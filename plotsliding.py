@@ -5,6 +5,10 @@ from datetime import datetime
 
 import numpy as np
 
+from play_index import GameTimeline, load_play_index
+from scored_dataset import ensure_game, load_game
+from sliding_window import sliding_window_scores
+
 export = {}
 
 window_size = 45
@@ -12,32 +16,20 @@ confidence_min = 2
 
 mins = []
 
-sorted_times = []
 live_time_index = 9
 file_name = "fsuvsvirginia"
 
-with open(f"jsons/{file_name}P.json", "r") as f:
-    data = json.load(f)
-
-for i in range(len(data)):
-    data[i]["time"] = datetime.fromtimestamp(data[i]["timestamp"])
-    # data[i]["prediction"] = 1
-
-data.sort(key=lambda x: x["time"])
+# columnar partition (scored/<game>/), rebuilt from jsons/<game>P.* when stale;
+# rows come back sorted by timestamp
+ensure_game(file_name)
+data = load_game(file_name)
 
 if live_time_index != -1:
-    with open('Data/live_scores.json', 'r') as f:
-        live_scores = json.load(f)
-        for drive in live_scores[live_time_index]['drives']:
-            for play in drive['plays']:
-                if play['wallClock'] is None:
-                    continue
-                time = tuple(map(int, play['wallClock'].split('T')[1].split('.')[0].split('+')[0].split(":")))
-                if not sorted_times or time > sorted_times[-1][0]:
-                    sorted_times.append((time, play['period'], play['clock']))
-
-def print_prompts(data):
-    prompts = [(d["text"], d["prediction"]) for d in data]
+    # wall-clock -> game-clock mapping built from the game's play index
+    timeline = GameTimeline(load_play_index('Data/live_scores.json', live_time_index))
+
+def print_prompts(predictions, texts):
+    prompts = list(zip(texts, predictions.tolist()))
     prompts.sort(key=lambda x: x[1])
     # print top 5 and bottom 5
     print("Negatives")
@@ -47,98 +39,70 @@ def print_prompts(data):
     for p in prompts[-2:]:
         print(p)
 
-def get_score(window_data):
-    return sum(abs(0.5 - s['prediction']) for s in window_data if abs(s['prediction']-0.5) < 0.3) * math.log(1+len(window_data)) * 2
+def get_score(predictions):
+    distance = np.abs(0.5 - predictions.astype(np.float64))
+    return distance[distance < 0.3].sum() * math.log(1+len(predictions)) * 2
 
 to_print = set()
 texts = set()
 
 def compute_sliding_avgs(data, window_size):
 
-    # print_prompts(data)
+    timestamps = data["timestamp"]
+    predictions = data["prediction"]
+    comment_texts = data["text"]
+
+    # print_prompts(predictions, comment_texts)
 
-    # Sort data by time (already sorted but just to be sure)
-    data.sort(key=lambda x: x["time"])
-    
     # Store original data in mins for later use
-    for d in data:
-        mins.append((d["prediction"], d['text']))
+    mins.extend(zip(predictions.tolist(), comment_texts))
 
-    start_time = min(d["time"] for d in data)
-    end_time = max(d["time"] for d in data)
-    
     times, avgs, counts = [], [], []
     
     # Create sliding windows at regular intervals (every 1 second for very smooth curve)
     step_size = window_size // 4  # Step forward 1 second at a time
-    current_time = start_time
     
     num_points_above_40 = 0
     flag = True
 
-    max_score = 0
-    while current_time <= end_time:
-        max_score = max(max_score, get_score([d for d in data if current_time <= d["time"] <= datetime.fromtimestamp(current_time.timestamp() + window_size)]))
-        current_time = datetime.fromtimestamp(current_time.timestamp() + step_size)
-    current_time = start_time
+    # score every window in one pass (partitions are stored sorted by timestamp)
+    windows = sliding_window_scores(timestamps, predictions, window_size, step_size, assume_sorted=True)
+    max_score = windows.scores.max()
 
-    while current_time <= end_time:
-        # Find all data points within the sliding window
-        window_start = current_time
-        window_end = datetime.fromtimestamp(current_time.timestamp() + window_size)
+    if live_time_index != -1:
+        # game time of every window start at once
+        game_times = timeline.game_time(windows.starts)
+
+    for k in np.flatnonzero(windows.counts):
+        current_time = windows.starts[k]
+        window_rows = range(windows.first[k], windows.last[k])
         
-        window_data = [d for d in data if window_start <= d["time"] <= window_end]
+        score = windows.scores[k] / max_score
         
-        if len(window_data) > 0:
-            
-            score = get_score(window_data) / max_score
-            
-            if live_time_index == -1:
-                times.append(current_time)
-                avgs.append(score)
-                counts.append(len(window_data))
+        if live_time_index == -1:
+            times.append(datetime.fromtimestamp(current_time))
+            avgs.append(score)
+            counts.append(len(window_rows))
+        elif not np.isnan(game_times[k]):
+            gt = float(game_times[k])
+
+            for row in window_rows:
+                text = comment_texts[row]
+                if text not in texts:
+                    to_print.add((text, float(predictions[row]), gt))
+                    texts.add(text)
+
+            if score > 0.3:
+                if flag:
+                    num_points_above_40 += 1
+                    flag = False
             else:
-                # Convert to game time (same logic as before)
-                current_seconds = ((current_time.hour+4) * 3600 + current_time.minute * 60 + current_time.second)
-                
-                # Binary search to find corresponding game time
-                lo = 0
-                hi = len(sorted_times) - 1
-                while lo <= hi:
-                    mid = (lo + hi) // 2
-                    mid_time = sorted_times[mid][0]
-                    mid_seconds = mid_time[0] * 3600 + mid_time[1] * 60 + mid_time[2]
-                    
-                    if mid_seconds < current_seconds:
-                        lo = mid + 1
-                    else:
-                        hi = mid - 1
-                
-                if hi != -1 and lo != len(sorted_times)-1 and hi != len(sorted_times)-1:
-                    n = int(sorted_times[hi][1])
-                    t = int(sorted_times[hi][2].split(":")[0]) + int(sorted_times[hi][2].split(":")[1]) / 60
-                    
-                    gt = 15*n - t
-
-                    for s in window_data:
-                        if s['text'] not in texts:
-                            to_print.add((s['text'], s['prediction'], gt))
-                            texts.add(s['text'])
-
-                    if score > 0.3:
-                        if flag:
-                            num_points_above_40 += 1
-                            flag = False
-                    else:
-                        flag = True
-                    
-                    times.append(gt)
-                    avgs.append(score)
-                    counts.append(len(window_data))
-
-        # Move to next step
-        current_time = datetime.fromtimestamp(current_time.timestamp() + step_size)
-    
+                flag = True
+            
+            times.append(gt)
+            avgs.append(score)
+            counts.append(len(window_rows))
+
     print(f"Number of points above 0.4: {num_points_above_40-1}")
 
     return times, avgs, counts
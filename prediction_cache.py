@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Persistent content-hash cache for comment predictions.
+
+Game threads repeat themselves ("LETS GO", copypastas, bot messages) and the
+same comments show up in several datasets, so every rerun of the BERT or
+VADER scorers used to pay for texts it had already scored. PredictionCache
+keeps every result in a single SQLite file keyed by
+
+    (model version, blake2b hash of the normalized text)
+
+so only texts that are new for a given model are ever scored. The least
+recently used entries are evicted once the cache grows past max_entries
+(down to EVICT_TO of it), and hit/miss counts are kept per instance.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+CACHE_PATH = os.path.join("cache", "predictions.sqlite")
+MAX_ENTRIES = 2_000_000
+EVICT_TO = 0.9      # eviction trims to this fraction of max_entries, so it doesn't run on every insert
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for hashing: NFC, runs of whitespace collapsed, ends trimmed.
+
+    Case is kept because VADER scores ALL-CAPS words higher than lowercase ones.
+    """
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def text_key(text: str) -> bytes:
+    """16-byte content hash of a text's normalized form."""
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).digest()
+
+
+def file_fingerprint(paths: Sequence[str]) -> str:
+    """
+    Short content hash of a set of files, for building model version strings.
+
+    Args:
+        paths: Files that define a model (config, weights); missing ones are skipped
+
+    Returns:
+        12-character hex digest
+    """
+    digest = hashlib.blake2b(digest_size=6)
+    for path in sorted(paths):
+        if not os.path.exists(path):
+            continue
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    SQLite-backed prediction cache with LRU eviction.
+
+    Values are stored as JSON, so both BERT floats and VADER score
+    dictionaries fit. Typical use goes through cached():
+
+        cache = PredictionCache()
+        scores = cache.cached("bert:torch:abc123", texts, score_fn)
+
+    Args:
+        path: SQLite file; parent directories are created if needed
+        max_entries: Entries kept before the least recently used are evicted
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                model TEXT NOT NULL,
+                key BLOB NOT NULL,
+                value TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            ) WITHOUT ROWID
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+        self._db.commit()
+        # upper bound on the rows stored: counted once here, then raised by every put
+        (self._count,) = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[int, Any]:
+        """
+        Look up cached predictions and mark them as recently used.
+
+        Args:
+            model: Model version string
+            texts: Texts to look up
+
+        Returns:
+            Dictionary of index into texts to cached value, for the hits only
+        """
+        keys = [text_key(text) for text in texts]
+        return self._get_keys(model, keys)
+
+    def _get_keys(self, model: str, keys: Sequence[bytes]) -> Dict[int, Any]:
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        # stay well under SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            part = unique[i:i + 500]
+            rows = self._db.execute(
+                f"SELECT key, value FROM predictions WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                [model, *part])
+            found.update((key, json.loads(value)) for key, value in rows)
+
+        if found:
+            now = time.time()
+            self._db.executemany("UPDATE predictions SET last_used = ? WHERE model = ? AND key = ?",
+                                 [(now, model, key) for key in found])
+            self._db.commit()
+
+        hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+        self.hits += len(hits)
+        self.misses += len(keys) - len(hits)
+        return hits
+
+    def put_many(self, model: str, texts: Sequence[str], values: Sequence[Any]):
+        """Store predictions for texts, then evict the oldest entries if the cache is over capacity."""
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO predictions (model, key, value, last_used) VALUES (?, ?, ?, ?)",
+            [(model, text_key(text), json.dumps(value), now) for text, value in zip(texts, values)])
+        self._db.commit()
+        # replaced rows and other writers make this an estimate; evict() recounts before deleting anything
+        self._count += min(len(texts), len(values))
+        if self._count > self.max_entries:
+            self.evict()
+
+    def partition(self, model: str, texts: Sequence[str]) -> Tuple[List[Any], List[str], List[List[int]]]:
+        """
+        Split texts into cached predictions and the unique texts still to compute.
+
+        Texts that normalize to the same form appear in todo once.
+
+        Args:
+            model: Model version string
+            texts: Texts to score
+
+        Returns:
+            Tuple of (results aligned with texts, None where missing; texts to
+            compute; for each of those, the indices into texts it fills)
+        """
+        results = [None] * len(texts)
+        keys = [text_key(text) for text in texts]
+        hits = self._get_keys(model, keys)
+        for i, value in hits.items():
+            results[i] = value
+
+        missing = {}
+        for i, key in enumerate(keys):
+            if i not in hits:
+                missing.setdefault(key, []).append(i)
+        rows = list(missing.values())
+        return results, [texts[r[0]] for r in rows], rows
+
+    def complete(self, model: str, results: List[Any], todo: Sequence[str], rows: Sequence[List[int]],
+                 values: Sequence[Any]) -> List[Any]:
+        """Fill the gaps left by partition() with freshly computed values and cache them."""
+        for indices, value in zip(rows, values):
+            for i in indices:
+                results[i] = value
+        if todo:
+            self.put_many(model, todo, values)
+        return results
+
+    def cached(self, model: str, texts: Sequence[str], compute: Callable[[List[str]], Sequence[Any]]) -> List[Any]:
+        """
+        Return predictions for every text, computing only the ones not cached.
+
+        Args:
+            model: Model version string
+            texts: Texts to score
+            compute: Called with the list of missing texts; returns their predictions in order
+
+        Returns:
+            Predictions aligned with texts
+        """
+        results, todo, rows = self.partition(model, texts)
+        if not todo:
+            return results
+        return self.complete(model, results, todo, rows, list(compute(todo)))
+
+    def evict(self) -> int:
+        """
+        If the cache is over max_entries, delete the least recently used
+        entries down to EVICT_TO of it. Returns how many were removed.
+        """
+        (count,) = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()
+        self._count = count
+        if count <= self.max_entries:
+            return 0
+        excess = count - int(self.max_entries * EVICT_TO)
+        self._db.execute("""
+            DELETE FROM predictions WHERE (model, key) IN (
+                SELECT model, key FROM predictions ORDER BY last_used LIMIT ?
+            )
+        """, (excess,))
+        self._db.commit()
+        self._count = count - excess
+        return excess
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts for this instance plus what is stored on disk, per model."""
+        models = dict(self._db.execute("SELECT model, COUNT(*) FROM predictions GROUP BY model").fetchall())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": sum(models.values()),
+            "models": models,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    def summary(self) -> str:
+        """One-line hit-rate report for the scoring scripts."""
+        return f"cache: {self.hits} hits / {self.hits + self.misses} lookups ({self.hit_rate:.1%} hit rate)"
+
+    def clear(self, model: str = None):
+        """Remove every entry, or only those of one model version."""
+        if model is None:
+            self._db.execute("DELETE FROM predictions")
+        else:
+            self._db.execute("DELETE FROM predictions WHERE model = ?", (model,))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> "PredictionCache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    """Print what the cache holds, or clear it."""
+    path = sys.argv[2] if len(sys.argv) > 2 else CACHE_PATH
+    if len(sys.argv) < 2 or sys.argv[1] not in ("stats", "clear"):
+        print("Usage: python prediction_cache.py stats|clear [cache.sqlite]")
+        return
+
+    with PredictionCache(path) as cache:
+        if sys.argv[1] == "clear":
+            cache.clear()
+            print(f"✅ Cleared {path}")
+            return
+        stats = cache.stats()
+        print(f"{path}: {stats['entries']} entries, {stats['size_bytes'] / 1e6:.1f} MB")
+        for model, count in sorted(stats["models"].items()):
+            print(f"  {model}: {count}")
+
+
+if __name__ == "__main__":
+    main()
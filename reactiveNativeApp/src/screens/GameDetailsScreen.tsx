@@ -21,6 +21,7 @@ try {
 }
 import { DrawerActions, useNavigation } from '@react-navigation/native';
 import { useTheme } from '../contexts/ThemeContext';
+import { decodeGamePayload } from '../utils/gamePayload';
 
 interface GameDetailsProps {
   navigation: any;
@@ -43,7 +44,7 @@ interface GameData {
   best5: [string, number, number][];
 }
 
-// Static mapping so Metro bundler can include the JSON assets
+// Static mapping so Metro bundler can include the JSON assets (compact payloads, see app_payload.py)
 const gameJsonMap: Record<string, any> = {
   'cincinativskansas.json': require('../../assets/exports/cincinativskansas.json'),
   'dukevsyracuse.json': require('../../assets/exports/dukevsyracuse.json'),
@@ -148,7 +149,7 @@ const GameDetailsScreen: React.FC<GameDetailsProps> = ({ navigation, route }: Ga
       if (!jsonFile || !gameJsonMap[jsonFile]) {
         throw new Error('JSON file mapping not found');
       }
-      const raw: GameDataRaw = gameJsonMap[jsonFile];
+      const raw: GameDataRaw = decodeGamePayload(gameJsonMap[jsonFile]);
       const normalized = normalizeData(raw);
       setGameData(normalized);
     } catch (e: any) {
@@ -0,0 +1,63 @@
+// Decoder for the compact game payloads written by app_payload.py.
+//
+// assets/exports/*.json hold per-game sentiment as delta-encoded integers:
+//   t: game time in 1/ts minutes, a: sentiment in 1/vs units.
+// Full-format exports ({ times, avgs, ... }) are passed through unchanged.
+
+export type CommentEntry = [string, number, number]; // [comment, sentiment, time]
+
+export interface CompactGamePayload {
+  v: number;
+  ts: number;
+  vs: number;
+  t: number[];
+  a: number[];
+  worst15?: CommentEntry[];
+  best5?: CommentEntry[];
+}
+
+export const isCompactPayload = (raw: any): raw is CompactGamePayload =>
+  !!raw && typeof raw.v === 'number' && Array.isArray(raw.t) && Array.isArray(raw.a);
+
+// Undo the delta encoding (running sum) and scale back to floats in one pass
+const decodeDeltas = (deltas: number[], scale: number): number[] => {
+  const out = new Array<number>(deltas.length);
+  let acc = 0;
+  for (let i = 0; i < deltas.length; i++) {
+    acc += deltas[i];
+    out[i] = acc / scale;
+  }
+  return out;
+};
+
+export const decodeGamePayload = (raw: any): any => {
+  if (!isCompactPayload(raw)) return raw;
+  return {
+    times: decodeDeltas(raw.t, raw.ts),
+    avgs: decodeDeltas(raw.a, raw.vs),
+    worst15: raw.worst15 || [],
+    best5: raw.best5 || [],
+  };
+};
+
+// Live updates from live_server.py: a splice truncates a list at index and
+// appends value; a set replaces the key. The document stays in compact form,
+// so decodeGamePayload still applies after each delta.
+export interface GameDeltaOp {
+  op: 'splice' | 'set';
+  path: string;
+  index?: number;
+  value: any;
+}
+
+export const applyGameDelta = (doc: any, ops: GameDeltaOp[]): any => {
+  for (const op of ops) {
+    if (op.op === 'splice') {
+      const current: any[] = Array.isArray(doc[op.path]) ? doc[op.path] : [];
+      doc[op.path] = current.slice(0, op.index ?? current.length).concat(op.value);
+    } else {
+      doc[op.path] = op.value;
+    }
+  }
+  return doc;
+};
@@ -1,8 +1,13 @@
-from asyncio import sleep
+import asyncio
+import os
+import time
+import aiohttp
+from collections import deque
 import requests
-import json
-from secrets import reddit_client_id, reddit_client_secret
 from requests.auth import HTTPBasicAuth
+from comment_store import NDJSON_EXT, RecordWriter, append_records, iter_records
+
+REDDIT_API = "https://oauth.reddit.com"
 
 def parse_html(html):
     return html.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&#39;', "'").replace('&quot;', '"')\
@@ -19,116 +24,336 @@ def get_access_token(client_id, client_secret, user_agent):
     resp.raise_for_status()
     return resp.json()['access_token']
 
-def fetch_comments(post_id, access_token, user_agent):
-    headers = {
-        'Authorization': f'bearer {access_token}',
-        'User-Agent': user_agent
-    }
-    url = f'https://oauth.reddit.com/comments/{post_id}'
-    resp = requests.get(url, headers=headers)
-    resp.raise_for_status()
-    return resp.json()
 
-def fetch_more_comments(link_id, children_ids, access_token, user_agent):
-    headers = {
-        "Authorization": f"bearer {access_token}",
-        "User-Agent": user_agent
-    }
-    url = "https://oauth.reddit.com/api/morechildren"
+class RateLimiter:
+    """
+    Token bucket shared by every request made with one access token.
+
+    Starts out allowing `rate` requests per second and re-tunes itself from
+    Reddit's X-Ratelimit-Remaining / X-Ratelimit-Reset headers, so whatever
+    budget is left is spread evenly over what is left of the current window.
+    """
+
+    def __init__(self, rate=1.0, capacity=10):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def update(self, headers):
+        remaining = headers.get("X-Ratelimit-Remaining")
+        reset = headers.get("X-Ratelimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = float(remaining)
+            reset = max(float(reset), 1.0)
+        except ValueError:
+            return
+
+        self._refill()
+        if remaining < 1:
+            # window is spent: drain the bucket so the next token shows up at reset
+            self.rate = 1.0 / reset
+            self.tokens = min(self.tokens, 0.0)
+        else:
+            self.rate = remaining / reset
+            self.tokens = min(self.tokens, remaining)
+
+
+class RedditClient:
+    """
+    Pooled aiohttp session plus the rate limiter and concurrency cap for one token.
+
+    Use as `async with RedditClient(token, user_agent) as client:`. Several
+    crawls can share one client so they share the same rate-limit budget.
+    """
+
+    def __init__(self, access_token, user_agent, base_url=REDDIT_API, max_concurrency=8, limiter=None):
+        self.headers = {
+            "Authorization": f"bearer {access_token}",
+            "User-Agent": user_agent
+        }
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter or RateLimiter()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = None
+        self.requests_made = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self.session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def get(self, path, params=None, retries=3):
+        for attempt in range(retries + 1):
+            await self.limiter.acquire()
+            async with self.semaphore:
+                async with self.session.get(self.base_url + path, params=params) as resp:
+                    self.requests_made += 1
+                    self.limiter.update(resp.headers)
+                    if resp.status != 429 or attempt == retries:
+                        resp.raise_for_status()
+                        return await resp.json()
+            # 429: the limiter has already been drained from the headers, but
+            # back off anyway in case the server didn't send any
+            await asyncio.sleep(2 ** attempt)
+
+
+async def fetch_comments(client, post_id):
+    return await client.get(f"/comments/{post_id}")
+
+async def fetch_more_comments(client, link_id, children_ids):
     params = {
         "link_id": f"t3_{link_id}",
         "children": ",".join(children_ids),
         "api_type": "json",
-        "depth": 1
+        "depth": "1"
     }
-    resp = requests.get(url, headers=headers, params=params)
-    resp.raise_for_status()
-    return resp.json()
+    return await client.get("/api/morechildren", params)
 
-async def extract_comments(comments_json, link_id, access_token, user_agent, max_more_calls=5):
+def comment_key(comment_id):
+    # reddit ids are base36; as ints they take half the memory of the strings
+    return int(comment_id, 36)
+
+async def extract_comments(comments_json, link_id, client, max_more_calls=5, batch_size=100, on_progress=None, seen=None):
     """
     - max_more_calls: maximum number of extra children to fetch PER "more" object.
                       (set to 5 to fetch up to 5 extra replies beyond data['replies'])
-    - Each batch sent to /api/morechildren will be at most 700 IDs.
+    - Each batch sent to /api/morechildren will be at most batch_size IDs
+      (Reddit rejects more than 100). IDs from different "more" objects share
+      batches, and up to client.max_concurrency batches are in flight at once.
+    - The tree is expanded breadth-first: replies returned by a batch are
+      parsed as soon as it lands and their "more" IDs join the back of the queue.
+    - on_progress(comment_count) is called after every batch.
+    - seen: optional set of comment_key() values. Comments already in it are
+      skipped (their replies are still walked), "more" ids already in it are
+      never requested, and new comments are added to it and returned with
+      their "id" so a later poll only pays for what's new.
     """
-    # normalize input shape so we accept either the original reddit response
-    # or a synthetic [None, {"data": {"children": things}}] used for recursion
-    queue = comments_json[1]["data"]["children"]
     results = []
+    pending = deque()  # child ids waiting for /api/morechildren, in BFS order
+
+    def walk(things):
+        # replies already present in the payload need no requests, so walk them
+        # in place and only queue the ids behind "more" objects
+        stack = list(reversed(things))
+        while stack:
+            item = stack.pop()
+
+            kind = item.get("kind")
+            if kind == "t1":  # a normal comment
+                data = item["data"]
+                if seen is None:
+                    results.append({
+                        "body_html": parse_html(data.get("body_html", "")),
+                        "created_utc": data.get("created_utc", None)
+                    })
+                elif comment_key(data["id"]) not in seen:
+                    seen.add(comment_key(data["id"]))
+                    results.append({
+                        "id": data["id"],
+                        "body_html": parse_html(data.get("body_html", "")),
+                        "created_utc": data.get("created_utc", None)
+                    })
+
+                replies = data.get("replies")
+                if replies and isinstance(replies, dict):
+                    stack.extend(reversed(replies["data"]["children"]))
+
+            elif kind == "more":
+                children = item["data"].get("children", [])
+                if seen is not None:
+                    children = [c for c in children if comment_key(c) not in seen]
 
-    for item in queue:
-
-        kind = item.get("kind")
-        if kind == "t1":  # a normal comment
-            data = item["data"]
-            results.append({
-                "body_html": parse_html(data.get("body_html", "")),
-                "created_utc": data.get("created_utc", None)
-            })
-
-            # recurse into replies already present in the payload
-            replies = data.get("replies")
-            if replies and isinstance(replies, dict):
-                results.extend(
-                    await extract_comments([None, replies], link_id, access_token, user_agent, max_more_calls)
-                )
-
-        elif kind == "more":
-            children = item["data"].get("children", [])
-            if not children:
-                continue
-
-            # LIMIT: only fetch up to max_more_calls extra children for THIS "more" object
-            children = children[:max_more_calls]
-
-            # batch those children into groups of up to 700 IDs and call /api/morechildren
-            for i in range(0, len(children), 700):
-                batch = children[i:i+700]
-
-                # throttle a bit to avoid rate limits
-                await sleep(0.5)
-
-                try:
-                    resp = fetch_more_comments(link_id, batch, access_token, user_agent)
-                except Exception as e:
-                    print(f"Warning: fetch_more_comments failed for batch (len={len(batch)}): {e}")
-                    continue
-
-                # /api/morechildren returns under resp["json"]["data"]["things"]
-                things = resp.get("json", {}).get("data", {}).get("things", [])
-                if not things:
-                    continue
-
-                # treat the returned 'things' like children and recurse to parse them
-                results.extend(
-                    await extract_comments([None, {"data": {"children": things}}], link_id, access_token, user_agent, max_more_calls)
-                )
+                # LIMIT: only fetch up to max_more_calls extra children for THIS "more" object
+                pending.extend(children[:max_more_calls])
+
+    async def expand(batch):
+        try:
+            resp = await fetch_more_comments(client, link_id, batch)
+        except Exception as e:
+            print(f"Warning: fetch_more_comments failed for batch (len={len(batch)}): {e}")
+            return
+
+        # /api/morechildren returns under resp["json"]["data"]["things"]
+        walk(resp.get("json", {}).get("data", {}).get("things", []))
+        if on_progress:
+            on_progress(len(results))
+
+    walk(comments_json[1]["data"]["children"])
+
+    in_flight = set()
+    while pending or in_flight:
+        # only send a short batch when nothing in flight could still top it up
+        while pending and len(in_flight) < client.max_concurrency and (len(pending) >= batch_size or not in_flight):
+            batch = [pending.popleft() for _ in range(min(batch_size, len(pending)))]
+            in_flight.add(asyncio.create_task(expand(batch)))
+        _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
 
     return results
 
 
 
-async def main():
+class LiveThread:
+    """
+    Follows one game thread while it is live.
+
+    Every poll asks for the thread sorted by new (with the newest logged
+    comment as the `before` cursor), skips everything already in `seen` and
+    appends only the new comments, with their created_utc, to
+    <out_dir>/<file_name>.live.ndjson, one JSON object per line. Restarting
+    rebuilds `seen` from that log.
+    """
+
+    def __init__(self, post_id, file_name, out_dir="jsons"):
+        self.post_id = post_id
+        self.file_name = file_name
+        self.log_path = os.path.join(out_dir, f"{file_name}.live{NDJSON_EXT}")
+        self.seen = set()
+        self.newest = None  # (created_utc, id) of the newest comment logged
+
+        if os.path.exists(self.log_path):
+            for comment in iter_records(self.log_path):
+                self._mark(comment)
+
+    def _mark(self, comment):
+        self.seen.add(comment_key(comment["id"]))
+        created = comment.get("created_utc") or 0
+        if self.newest is None or created > self.newest[0]:
+            self.newest = (created, comment["id"])
+
+    async def poll(self, client, limit=100):
+        params = {"sort": "new", "limit": str(limit)}
+        if self.newest:
+            params["before"] = f"t1_{self.newest[1]}"
+
+        raw = await client.get(f"/comments/{self.post_id}", params)
+        new_comments = await extract_comments(raw, self.post_id, client, max_more_calls=6000, seen=self.seen)
+
+        if new_comments:
+            new_comments.sort(key=lambda c: c.get("created_utc") or 0)
+            append_records(self.log_path, new_comments)
+            for comment in new_comments:
+                self._mark(comment)
+        return len(new_comments)
+
+async def follow_threads(client, threads, interval=30.0, polls=None):
+    """Poll every LiveThread every `interval` seconds (forever unless `polls` is given)."""
+    n = 0
+    while polls is None or n < polls:
+        start = time.perf_counter()
+        requests_before = client.requests_made
+
+        counts = await asyncio.gather(*(thread.poll(client) for thread in threads), return_exceptions=True)
+        for thread, count in zip(threads, counts):
+            if isinstance(count, Exception):
+                print(f"  [{thread.file_name}] poll failed: {count}")
+            else:
+                print(f"  [{thread.file_name}] +{count} new ({len(thread.seen)} total)")
+
+        elapsed = time.perf_counter() - start
+        print(f"Poll #{n + 1}: {client.requests_made - requests_before} requests in {elapsed:.2f}s")
+        n += 1
+        if polls is None or n < polls:
+            await asyncio.sleep(max(0.0, interval - elapsed))
+
+POST_IDS = [
+    ('1nre9o8', "fsuvsvirginia"), 
+    ('1ns2krh', 'uclavsnorthwestern'), 
+    ('1nm0fcx', 'syracusevsclemson'),
+    ('1nrxdyq', 'cincinativskansas'),
+    ('1nrxdy2', 'louisvillevspittsburgh'),
+]
+
+def save_comments(comments, path):
+    with RecordWriter(path, mode="w") as writer:
+        writer.write_many(comments)
+
+async def crawl_thread(client, post_id, file_name, out_dir="jsons", max_more_calls=6000, report_every=5.0):
+    """
+    Fetch and expand one game thread, then write it to <out_dir>/<file_name>.ndjson.
+
+    Prints progress for this thread at most every report_every seconds, so
+    several crawls sharing one client can run side by side.
+    """
+    start = time.perf_counter()
+    last_report = start
+
+    def progress(count):
+        nonlocal last_report
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            print(f"  [{file_name}] {count} comments so far ({count / (now - start):.1f} comments/s)")
+
+    raw = await fetch_comments(client, post_id)
+    all_comments = await extract_comments(raw, post_id, client, max_more_calls=max_more_calls, on_progress=progress)
+    elapsed = time.perf_counter() - start
+
+    # keep the event loop free for the other crawls while this one is written out
+    await asyncio.to_thread(save_comments, all_comments, os.path.join(out_dir, f"{file_name}{NDJSON_EXT}"))
+
+    print(f"✅ Saved {len(all_comments)} comments to {file_name}{NDJSON_EXT} ({len(all_comments) / elapsed:.1f} comments/s)")
+    return len(all_comments)
+
+async def main(parallel=False, max_concurrency=8, live_interval=None):
+    from secrets import reddit_client_id, reddit_client_secret
+
     user_agent = 'myApp/0.1 by Evening_Falcon'
 
     token = get_access_token(reddit_client_id, reddit_client_secret, user_agent)
-    post_ids = [
-        ('1nre9o8', "fsuvsvirginia"), 
-        ('1ns2krh', 'uclavsnorthwestern'), 
-        ('1nm0fcx', 'syracusevsclemson'),
-        ('1nrxdyq', 'cincinativskansas'),
-        ('1nrxdy2', 'louisvillevspittsburgh'),
-    ]
 
-    for subreddit, file_name in post_ids:
-        raw = fetch_comments(subreddit, token, user_agent)
-        all_comments = await extract_comments(raw, subreddit, token, user_agent, max_more_calls=6000)
+    if live_interval is not None:
+        threads = [LiveThread(post_id, file_name) for post_id, file_name in POST_IDS]
+        async with RedditClient(token, user_agent, max_concurrency=max_concurrency) as client:
+            await follow_threads(client, threads, interval=live_interval)
+        return
 
-        with open(f"jsons/{file_name}.json", "w", encoding="utf-8") as f:
-            json.dump(all_comments, f, ensure_ascii=False, indent=2)
+    start = time.perf_counter()
+    async with RedditClient(token, user_agent, max_concurrency=max_concurrency) as client:
+        if parallel:
+            # every thread shares the client, so one token, one rate limit and
+            # one pool of connections covers the whole slate
+            counts = await asyncio.gather(*(crawl_thread(client, post_id, file_name) for post_id, file_name in POST_IDS),
+                                          return_exceptions=True)
+            for (post_id, file_name), count in zip(POST_IDS, counts):
+                if isinstance(count, Exception):
+                    print(f"Error crawling {file_name} ({post_id}): {count}")
+            counts = [c for c in counts if not isinstance(c, Exception)]
+        else:
+            counts = [await crawl_thread(client, post_id, file_name) for post_id, file_name in POST_IDS]
+    elapsed = time.perf_counter() - start
 
-        print(f"✅ Saved {len(all_comments)} comments to {file_name}.json")
+    print(f"Fetched {sum(counts)} comments from {len(counts)} threads in {elapsed:.1f}s "
+          f"({sum(counts) / elapsed:.1f} comments/s, {client.requests_made} requests)")
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Download Reddit game thread comments into jsons/<name>.ndjson")
+    parser.add_argument("--parallel", action="store_true", help="crawl every thread at the same time")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight across all threads")
+    parser.add_argument("--live", type=float, metavar="SECONDS", default=None,
+                        help="keep polling every thread every SECONDS, appending new comments to jsons/<name>.live.ndjson")
+    args = parser.parse_args()
+
+    asyncio.run(main(parallel=args.parallel, max_concurrency=args.concurrency, live_interval=args.live))
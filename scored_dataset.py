@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Columnar on-disk dataset for scored comments.
+
+Each game is stored as its own partition directory, scored/<game>/, holding one
+NumPy file per column:
+
+    timestamp.npy      float64 epoch seconds, sorted ascending
+    prediction.npy     float32 model score
+    text_offsets.npy   int64 byte offsets into text.utf8 (n + 1 entries)
+    text.utf8          every comment's text, UTF-8 encoded, back to back
+    meta.json          row count and the source file the partition was built from
+
+Loading memory-maps the .npy files and reads only the requested columns, so the
+windowing and plotting code works on plain arrays instead of per-row dicts.
+"""
+
+import json
+import os
+import sys
+import glob
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from comment_store import find_records, iter_records
+
+
+SCORED_ROOT = "scored"
+COLUMNS = ("timestamp", "prediction", "text")
+
+
+class TextColumn:
+    """
+    Lazily decoded view of a partition's text column.
+
+    Indexing with an int returns a str; slices and index arrays return a new
+    TextColumn over just those rows. Nothing is decoded until it is accessed.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, rows: Optional[np.ndarray] = None):
+        self._blob = blob
+        self._offsets = offsets
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1 if self._rows is None else len(self._rows)
+
+    def __getitem__(self, key: Any) -> Union[str, "TextColumn"]:
+        if isinstance(key, (int, np.integer)):
+            row = int(key) if self._rows is None else int(self._rows[key])
+            start, end = self._offsets[row], self._offsets[row + 1]
+            return self._blob[start:end].tobytes().decode("utf-8")
+
+        rows = np.arange(len(self._offsets) - 1) if self._rows is None else self._rows
+        return TextColumn(self._blob, self._offsets, rows[key])
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def partition_path(game: str, root: str = SCORED_ROOT) -> str:
+    """Directory holding one game's columns."""
+    return os.path.join(root, game)
+
+
+def write_game(game: str, records: Iterable[Dict[str, Any]], root: str = SCORED_ROOT, source: Optional[str] = None) -> int:
+    """
+    Write scored comment records as a columnar partition, sorted by timestamp.
+
+    Records are consumed one at a time; only the packed numeric columns and
+    the text bytes are kept while building.
+
+    Args:
+        game: Partition name, e.g. "fsuvsvirginia"
+        records: Iterable of {"text", "prediction", "timestamp"} dictionaries
+        root: Dataset root directory
+        source: Optional path of the file the records came from, kept in meta.json
+
+    Returns:
+        Number of rows written
+    """
+    timestamps = array("d")
+    predictions = array("f")
+    lengths = array("q")
+    text = bytearray()
+
+    for record in records:
+        encoded = (record.get("text") or "").encode("utf-8")
+        timestamps.append(float(record["timestamp"]))
+        predictions.append(float(record["prediction"]))
+        lengths.append(len(encoded))
+        text += encoded
+
+    ts = np.frombuffer(timestamps, dtype=np.float64)
+    order = np.argsort(ts, kind="stable")
+
+    # reorder the text blob to match the sorted rows
+    lengths_np = np.frombuffer(lengths, dtype=np.int64)
+    src_offsets = np.zeros(len(lengths_np) + 1, dtype=np.int64)
+    np.cumsum(lengths_np, out=src_offsets[1:])
+    sorted_lengths = lengths_np[order]
+    offsets = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(sorted_lengths, out=offsets[1:])
+    blob = np.frombuffer(bytes(text), dtype=np.uint8)
+    if len(order):
+        # byte index of every output character = its row's source start + position within the row
+        within = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], sorted_lengths)
+        sorted_blob = blob[np.repeat(src_offsets[:-1][order], sorted_lengths) + within]
+    else:
+        sorted_blob = blob
+
+    path = partition_path(game, root)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "timestamp.npy"), ts[order])
+    np.save(os.path.join(path, "prediction.npy"), np.frombuffer(predictions, dtype=np.float32)[order])
+    np.save(os.path.join(path, "text_offsets.npy"), offsets)
+    with open(os.path.join(path, "text.utf8"), "wb") as f:
+        f.write(sorted_blob.tobytes())
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"rows": len(order), "source": source}, f, indent=2)
+
+    return len(order)
+
+
+def load_game(game: str, columns: Sequence[str] = COLUMNS, root: str = SCORED_ROOT, mmap: bool = True) -> Dict[str, Any]:
+    """
+    Load selected columns of one game's partition.
+
+    Args:
+        game: Partition name
+        columns: Any of "timestamp", "prediction", "text"
+        root: Dataset root directory
+        mmap: Memory-map the files instead of reading them into memory
+
+    Returns:
+        Dictionary of column name to np.ndarray ("text" maps to a TextColumn)
+    """
+    path = partition_path(game, root)
+    mode = "r" if mmap else None
+    loaded = {}
+
+    for column in columns:
+        if column == "text":
+            offsets = np.load(os.path.join(path, "text_offsets.npy"), mmap_mode=mode)
+            blob_path = os.path.join(path, "text.utf8")
+            if mmap and os.path.getsize(blob_path) > 0:
+                blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+            else:
+                blob = np.fromfile(blob_path, dtype=np.uint8)
+            loaded["text"] = TextColumn(blob, offsets)
+        elif column in COLUMNS:
+            loaded[column] = np.load(os.path.join(path, f"{column}.npy"), mmap_mode=mode)
+        else:
+            raise ValueError(f"Unknown column '{column}' (expected one of {', '.join(COLUMNS)})")
+
+    return loaded
+
+
+def ensure_game(game: str, root: str = SCORED_ROOT, records_dir: str = "jsons") -> bool:
+    """
+    Build or refresh a game's partition from <records_dir>/<game>P.{ndjson,json}.
+
+    The partition is rebuilt only when it is missing or older than its source.
+
+    Args:
+        game: Partition name
+        root: Dataset root directory
+        records_dir: Directory holding the scored record files
+
+    Returns:
+        True if a partition is available afterwards
+    """
+    source = find_records(os.path.join(records_dir, f"{game}P"))
+    meta = os.path.join(partition_path(game, root), "meta.json")
+
+    if source is None:
+        return os.path.exists(meta)
+    if os.path.exists(meta) and os.path.getmtime(meta) >= os.path.getmtime(source):
+        return True
+
+    rows = write_game(game, iter_records(source), root=root, source=source)
+    print(f"Built columnar partition {partition_path(game, root)} ({rows} rows) from {source}")
+    return True
+
+
+def main():
+    """Build partitions for every scored record file (or the games given as arguments)."""
+    games = sys.argv[1:]
+    if not games:
+        sources = glob.glob("jsons/*P.json") + glob.glob("jsons/*P.ndjson")
+        games = sorted({os.path.basename(s).rsplit(".", 1)[0][:-1] for s in sources})
+
+    for game in games:
+        if not ensure_game(game):
+            print(f"Warning: no scored records found for '{game}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,33 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import json
+from comment_store import RecordWriter, iter_records
+from prediction_cache import PredictionCache
 
 input_file = "reddit2.json"
-output_file = "redditSentiments.json"
+output_file = "redditSentiments.ndjson"
+# the installed VADER's version is part of the cache key, so an upgrade doesn't reuse old scores;
+# bump the suffix whenever get_sentiments' output changes
+MODEL_VERSION = f"vader-{version('vaderSentiment')}:sentiment-v1"
+CHUNK_SIZE = 2000
 
-analyzer = SentimentIntensityAnalyzer()
+# built on first use, so every worker process loads the lexicon once for itself
+analyzer = None
 test = "holy fucking shit the chiefs are so ass. why did taylor swift agree to marry this bum ass travis kelce? his old slow fat ass can’t do shit!"
 
+def init_analyzer():
+    global analyzer
+    if analyzer is None:
+        analyzer = SentimentIntensityAnalyzer()
+
 def get_sentiments(text):
+    if analyzer is None:
+        init_analyzer()
     scores = analyzer.polarity_scores(text)
     denom = scores['pos'] + scores['neg']
 
@@ -20,16 +40,95 @@ def get_sentiments(text):
     return ret
 
 
-if __name__ == "__main__":
-    with open(input_file, "r", encoding="utf-8") as f:
-        comments = json.load(f)
+def score_texts(texts):
+    return [get_sentiments(text) for text in texts]
+
+
+def iter_chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_comments(comments, workers=1, chunk_size=CHUNK_SIZE, cache=None):
+    """
+    Attach a "sentiment" entry to every comment, streaming in chunks.
+
+    With workers > 1 the chunks are scored by a process pool (one analyzer per
+    worker). At most 2 * workers chunks are in flight, and results are yielded
+    in input order as soon as the oldest chunk is done, so memory stays flat.
+
+    Args:
+        comments: Iterable of {"body_html", ...} comment records
+        workers: Worker processes; 1 scores in this process
+        chunk_size: Comments sent to a worker at a time
+        cache: Optional PredictionCache; only texts it doesn't hold are scored
 
-    for comment in comments:
-        text = comment.get("body_html", "")
-        sentiment = get_sentiments(text)
-        comment["sentiment"] = sentiment
+    Returns:
+        Iterator over the comments in input order
+    """
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_analyzer) if workers > 1 else None
+    pending = deque()
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(comments, f, ensure_ascii=False, indent=2)
+    def finish(chunk, results, todo, rows, future):
+        values = future.result() if future is not None else score_texts(todo)
+        if cache is not None:
+            cache.complete(MODEL_VERSION, results, todo, rows, values)
+        else:
+            for indices, value in zip(rows, values):
+                for i in indices:
+                    results[i] = value
+        for comment, sentiment in zip(chunk, results):
+            comment["sentiment"] = sentiment
+        return chunk
 
-    print(f"✅ Sentiment analysis done. Saved to {output_file}")
\ No newline at end of file
+    try:
+        for chunk in iter_chunks(comments, chunk_size):
+            texts = [comment.get("body_html", "") for comment in chunk]
+            if cache is not None:
+                results, todo, rows = cache.partition(MODEL_VERSION, texts)
+            else:
+                results, todo, rows = [None] * len(texts), texts, [[i] for i in range(len(texts))]
+
+            future = pool.submit(score_texts, todo) if pool and todo else None
+            pending.append((chunk, results, todo, rows, future))
+            while len(pending) > (2 * workers if pool else 0):
+                yield from finish(*pending.popleft())
+
+        while pending:
+            yield from finish(*pending.popleft())
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score comments with VADER")
+    parser.add_argument("--input", default=input_file, help="comment file (.ndjson log or .json array)")
+    parser.add_argument("--output", default=output_file, help="where to write the scored comments (NDJSON)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (1 = no pool)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="comments per worker task")
+    parser.add_argument("--no-cache", action="store_true", help="score every comment, ignoring the prediction cache")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else PredictionCache()
+    start = time.perf_counter()
+    # stream comments through the analyzer in chunks so memory stays flat however big the input is;
+    # texts already in the prediction cache are not re-scored
+    with RecordWriter(args.output, mode="w") as writer:
+        writer.write_many(score_comments(iter_records(args.input), args.workers, args.chunk_size, cache))
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Sentiment analysis done. Saved {writer.count} comments to {args.output} "
+          f"in {elapsed:.1f}s ({writer.count / elapsed if elapsed else 0:.0f} comments/s, {args.workers} workers)")
+    if cache is not None:
+        print(f"   {cache.summary()}")
+
+
+if __name__ == "__main__":
+    main()
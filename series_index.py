@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Range queries over a time series of sentiment scores.
+
+SeriesIndex sorts a (times, values) series once and keeps a prefix sum and a
+sparse table of minima and maxima next to it. After that, the min, max and
+average over any time window cost two np.searchsorted lookups plus O(1)
+table reads, and whole batches of windows (one per scoring play, any mix of
+window sizes) are answered in a single vectorized call instead of one scan
+of the series per window.
+"""
+
+from typing import NamedTuple, Sequence, Union
+
+import numpy as np
+
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+class RangeStats(NamedTuple):
+    """Per-window results; windows with no points get the default value."""
+    min: np.ndarray
+    max: np.ndarray
+    avg: np.ndarray
+    count: np.ndarray
+
+
+class SeriesIndex:
+    """
+    Sorted-array, prefix-sum and sparse-table index over a time series.
+
+    Args:
+        times: Time of every point (any order)
+        values: Value of every point, aligned with times
+    """
+
+    def __init__(self, times: Sequence[float], values: Sequence[float]):
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if times.shape != values.shape:
+            raise ValueError(f"times and values differ in length ({len(times)} vs {len(values)})")
+
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.values = values[order]
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+
+        # level k holds the min/max of every run of 2**k consecutive points
+        self._mins = [self.values]
+        self._maxs = [self.values]
+        width = 1
+        while 2 * width <= len(self.values):
+            self._mins.append(np.minimum(self._mins[-1][:-width], self._mins[-1][width:]))
+            self._maxs.append(np.maximum(self._maxs[-1][:-width], self._maxs[-1][width:]))
+            width *= 2
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def range_stats(self, starts: ArrayLike, ends: ArrayLike, default: float = 0.5) -> RangeStats:
+        """
+        Min, max and average of the points with start <= time < end, for many windows at once.
+
+        Args:
+            starts: Inclusive window starts (scalar or array)
+            ends: Exclusive window ends, broadcast against starts
+            default: Value reported for windows that contain no points
+
+        Returns:
+            RangeStats of arrays shaped like the broadcast inputs
+        """
+        starts, ends = np.broadcast_arrays(np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64))
+        lo = np.searchsorted(self.times, starts, side="left")
+        hi = np.searchsorted(self.times, ends, side="left")
+        return self.row_stats(lo, hi, default)
+
+    def row_stats(self, lo: np.ndarray, hi: np.ndarray, default: float = 0.5) -> RangeStats:
+        """
+        Min, max and average of the sorted rows lo:hi, for many row ranges at once.
+
+        Args:
+            lo: First row of each range, indexing the sorted series (self.times)
+            hi: One past the last row, same shape as lo
+            default: Value reported for empty ranges
+
+        Returns:
+            RangeStats shaped like lo
+        """
+        lo, hi = np.asarray(lo, dtype=np.int64), np.asarray(hi, dtype=np.int64)
+        count = np.maximum(hi - lo, 0)
+        empty = count == 0
+
+        mins = np.full(lo.shape, default)
+        maxs = np.full(lo.shape, default)
+        avgs = np.full(lo.shape, default)
+        if not empty.all():
+            l, h, n = lo[~empty], hi[~empty], count[~empty]
+            level = np.floor(np.log2(n)).astype(np.int64)
+            # the two overlapping power-of-two runs [l, l + 2**k) and [h - 2**k, h) cover [l, h)
+            tail = h - (1 << level)
+            for k in np.unique(level):
+                at = level == k
+                mins_k = np.minimum(self._mins[k][l[at]], self._mins[k][tail[at]])
+                maxs_k = np.maximum(self._maxs[k][l[at]], self._maxs[k][tail[at]])
+                idx = np.flatnonzero(~empty)[at]
+                mins.flat[idx] = mins_k
+                maxs.flat[idx] = maxs_k
+            avgs[~empty] = (self.prefix[h] - self.prefix[l]) / n
+
+        return RangeStats(mins, maxs, avgs, count)
+
+    def before(self, times: ArrayLike, window_size: ArrayLike, default: float = 0.5) -> RangeStats:
+        """
+        Stats over the window [max(0, t - window_size), t) leading up to each time t.
+
+        Args:
+            times: Window end times (exclusive), e.g. the game times of scoring plays
+            window_size: Look-back length, a scalar or one per time
+            default: Value reported for windows that contain no points
+
+        Returns:
+            RangeStats aligned with times
+        """
+        times = np.asarray(times, dtype=np.float64)
+        return self.range_stats(np.maximum(0, times - np.asarray(window_size, dtype=np.float64)), times, default)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Vectorized sliding-window sentiment scores.
+
+A window's score is the sum of |0.5 - p| over the predictions p that fall
+within 0.3 of neutral, times 2*log(1 + n) for the n comments in the window
+(see plotsliding.get_score). Here the timestamps are sorted once, every
+window's row range comes from np.searchsorted, and the sums come from one
+prefix sum, so all windows of a game are scored in a single O(n + windows)
+pass instead of rescanning every comment at every step.
+
+StreamingWindowScorer produces the same windows online, one comment at a
+time, for live curves.
+"""
+
+import glob
+import math
+import os
+import sys
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+
+NEUTRAL_BAND = 0.3
+
+
+class WindowScores(NamedTuple):
+    """Per-window results; window k covers rows first[k]:last[k] of the sorted input."""
+    starts: np.ndarray
+    scores: np.ndarray
+    counts: np.ndarray
+    first: np.ndarray
+    last: np.ndarray
+
+
+def comment_weights(predictions: np.ndarray) -> np.ndarray:
+    """Each comment's contribution to a window sum: |0.5 - p| inside the neutral band, else 0."""
+    distance = np.abs(0.5 - np.asarray(predictions, dtype=np.float64))
+    return np.where(distance < NEUTRAL_BAND, distance, 0.0)
+
+
+def sliding_window_scores(timestamps: np.ndarray, predictions: np.ndarray, window_size: float,
+                          step_size: Optional[float] = None, assume_sorted: bool = False) -> WindowScores:
+    """
+    Score every window [start, start + window_size] stepped from the first comment to the last.
+
+    Args:
+        timestamps: Comment times in epoch seconds
+        predictions: Model scores, aligned with timestamps
+        window_size: Window length in seconds
+        step_size: Seconds between window starts (default window_size // 4, as plotsliding uses)
+        assume_sorted: Skip the sort when timestamps are already ascending
+
+    Returns:
+        WindowScores with the raw (unnormalized) score and comment count of every window.
+        first/last index the sorted rows, so when assume_sorted is True they index the input.
+    """
+    if step_size is None:
+        step_size = window_size // 4
+
+    ts = np.asarray(timestamps, dtype=np.float64)
+    weights = comment_weights(predictions)
+    if not assume_sorted:
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        weights = weights[order]
+
+    if len(ts) == 0:
+        empty = np.empty(0)
+        return WindowScores(empty, empty, empty.astype(np.int64), empty.astype(np.int64), empty.astype(np.int64))
+
+    n_windows = int(np.floor((ts[-1] - ts[0]) / step_size)) + 1
+    starts = ts[0] + step_size * np.arange(n_windows, dtype=np.float64)
+
+    # both window edges are inclusive
+    first = np.searchsorted(ts, starts, side="left")
+    last = np.searchsorted(ts, starts + window_size, side="right")
+
+    prefix = np.concatenate(([0.0], np.cumsum(weights)))
+    counts = last - first
+    scores = (prefix[last] - prefix[first]) * np.log1p(counts) * 2
+
+    return WindowScores(starts, scores, counts, first, last)
+
+
+class WindowEmission(NamedTuple):
+    """One finished window from StreamingWindowScorer."""
+    start: float
+    score: float
+    raw_score: float
+    count: int
+
+
+class StreamingWindowScorer:
+    """
+    Online sliding-window scorer for comments that arrive over time.
+
+    Keeps the comments of the current window in a deque together with a
+    running sum of their weights, so each comment costs O(1) amortized work:
+    it is added once and evicted once. Windows start at the first comment and
+    advance by step_size; a window is emitted as soon as a comment past its
+    end arrives (or on flush()), and empty windows are skipped, matching
+    sliding_window_scores.
+
+    Args:
+        window_size: Window length in seconds
+        step_size: Seconds between window starts (default window_size // 4)
+        reference: Fixed score to normalize against; None normalizes against
+                   the running maximum of the raw scores seen so far
+    """
+
+    def __init__(self, window_size: float, step_size: Optional[float] = None, reference: Optional[float] = None):
+        self.window_size = window_size
+        self.step_size = step_size if step_size is not None else window_size // 4
+        self.reference = reference
+        self.max_score = 0.0
+        self.late = 0
+
+        self._window = deque()  # (timestamp, weight) inside the current window
+        self._sum = 0.0
+        self._start = None
+        self._last = None
+
+    def add(self, timestamp: float, prediction: float) -> List[WindowEmission]:
+        """
+        Add one comment. Comments should arrive in time order; ones older than
+        the current window's start are counted in `late` and dropped.
+
+        Returns:
+            Windows that this comment closed, oldest first
+        """
+        emitted = []
+        if self._start is None:
+            self._start = timestamp
+        elif timestamp < self._start:
+            self.late += 1
+            return emitted
+
+        while timestamp > self._start + self.window_size:
+            if not self._window:
+                # nothing to emit in between: jump to the first window that reaches this comment
+                steps = math.ceil((timestamp - self.window_size - self._start) / self.step_size)
+                self._start += steps * self.step_size
+                break
+            window = self._close_window()
+            if window:
+                emitted.append(window)
+
+        distance = abs(0.5 - prediction)
+        weight = distance if distance < NEUTRAL_BAND else 0.0
+        self._window.append((timestamp, weight))
+        self._sum += weight
+        self._last = timestamp if self._last is None else max(self._last, timestamp)
+        return emitted
+
+    def flush(self) -> List[WindowEmission]:
+        """Emit the remaining windows that start at or before the last comment."""
+        emitted = []
+        while self._window and self._start <= self._last:
+            window = self._close_window()
+            if window:
+                emitted.append(window)
+        return emitted
+
+    def _close_window(self) -> Optional[WindowEmission]:
+        emission = None
+        count = len(self._window)
+        if count:
+            raw = self._sum * math.log1p(count) * 2
+            self.max_score = max(self.max_score, raw)
+            reference = self.reference if self.reference else self.max_score
+            emission = WindowEmission(self._start, raw / reference if reference > 0 else 0.0, raw, count)
+
+        self._start += self.step_size
+        while self._window and self._window[0][0] < self._start:
+            self._sum -= self._window.popleft()[1]
+        if not self._window:
+            # reset so rounding from the running subtraction can't accumulate
+            self._sum = 0.0
+        return emission
+
+
+def main():
+    """Score every game in the columnar dataset and report how long it took."""
+    from scored_dataset import SCORED_ROOT, ensure_game, load_game
+
+    window_size = int(sys.argv[1]) if len(sys.argv) > 1 else 45
+
+    games = sorted({os.path.basename(p).rsplit(".", 1)[0][:-1] for p in glob.glob(os.path.join("jsons", "*P.*"))})
+    for game in games:
+        ensure_game(game)
+
+    start = time.perf_counter()
+    total_rows = 0
+    for game in games:
+        columns = load_game(game, columns=("timestamp", "prediction"))
+        result = sliding_window_scores(columns["timestamp"], columns["prediction"], window_size, assume_sorted=True)
+        total_rows += len(columns["timestamp"])
+        print(f"{game}: {len(result.starts)} windows, max score {result.scores.max():.3f}")
+    elapsed = time.perf_counter() - start
+
+    print(f"\nScored {len(games)} games ({total_rows} comments) from '{SCORED_ROOT}/' in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()